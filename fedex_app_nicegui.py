@@ -22,10 +22,10 @@ Features:
 
 import calendar
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Optional
 from loguru import logger
 
-from nicegui import ui, app
+from nicegui import ui, app, run
 import pandas as pd
 
 from src.agents.unified_agent import UnifiedFedExAgent
@@ -233,12 +233,16 @@ class FedExNiceGUIApp:
                                 ui.label('Recommend').classes('text-xs').style('color: #cccccc;')
                                 ui.label(f"{timing.get('generate_recommendation', 0):.0f}ms").classes('text-lg font-semibold').style('color: #ffffff;')
     
-    def process_user_query(self, user_input: str) -> Dict[str, Any]:
-        """Process user query using the unified agent."""
+    def process_user_query(
+        self,
+        user_input: str,
+        on_reflection_chunk: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """Process user query using the unified agent (reflection text is passed to on_reflection_chunk as it streams)."""
         try:
             logger.info(f"📝 Processing query: {user_input}")
             
-            result = self.agent.process_request(user_input)
+            result = self.agent.process_request(user_input, on_reflection_chunk=on_reflection_chunk)
             
             if not result['success']:
                 if result.get('needs_clarification'):
@@ -364,8 +368,20 @@ class FedExNiceGUIApp:
                     self.messages.append(user_msg)
                     self.render_chat_message(user_msg, self.messages_container)
                     
-                    # Process query
-                    result = self.process_user_query(user_input)
+                    # Process query in a worker thread; streamed chain-of-thought
+                    # is collected there and shown by a timer on the UI side
+                    thought_chunks: List[str] = []
+                    with self.messages_container:
+                        live_thought = ui.markdown('').style('color: #cccccc;')
+                        live_timer = ui.timer(
+                            0.2,
+                            lambda: live_thought.set_content('💭 ' + ''.join(thought_chunks)) if thought_chunks else None
+                        )
+                    try:
+                        result = await run.io_bound(self.process_user_query, user_input, thought_chunks.append)
+                    finally:
+                        live_timer.cancel()
+                        live_thought.delete()
                     
                     # Add assistant message
                     if not result['success']:
@@ -23,7 +23,8 @@ This simplifies the workflow while maintaining all functionality.
 import json
 import time
 import re
-from typing import Dict, Any, List, Tuple, Optional
+import string
+from typing import Callable, Dict, Any, List, Tuple, Optional
 from loguru import logger
 
 from langchain_core.messages import HumanMessage
@@ -54,6 +55,66 @@ class UnifiedFedExAgent:
     Uses multiple tools but presents as a single, coherent agent.
     """
     
+    # Reflection phrases that indicate the recommendation needs supervisor review
+    _ESCALATE_RE = re.compile(r"supervisor|escalate|review needed|concern|issue", re.IGNORECASE)
+    
+    # Chain-of-thought reflection prompt; static text is parsed once at class load
+    _COT_TEMPLATE = string.Template("""You are analyzing how the FedEx shipping system made its recommendation.
+Show your complete thought process step-by-step.
+
+**User's Original Question:**
+"$user_question"
+
+**How the System Processed This:**
+
+1. **Parameter Extraction:**
+   - Origin: $origin
+   - Destination: $destination
+   - Zone Mapped: Zone $zone
+   - Weight: $weight lbs
+   - Budget: $$$budget
+   - Urgency: $urgency
+
+2. **SQL Query Generated:**
+   ```sql
+   $sql_query
+   ```
+
+3. **Query Results:**
+   - Rows returned: $row_count
+   - Data: $data
+
+4. **Recommendation Made:**
+   - Service: $service
+   - Cost: $$$estimated_cost
+   - Delivery: $delivery_days days
+   - Reasoning: $reasoning
+
+**Your Task - Show Complete Chain of Thought:**
+
+Think through step-by-step:
+1. Was the user's question understood correctly?
+2. Were origin/destination extracted properly?
+3. Was the zone mapping correct?
+4. Was the SQL query appropriate for the request?
+5. Did the query return the right data?
+6. Was the best service selected from the results?
+7. Does the recommendation meet the user's needs (budget, urgency)?
+8. Are there any concerns or issues?
+
+Provide a detailed step-by-step analysis (5-8 sentences) showing your reasoning process.
+Start with "Let me trace through how this recommendation was made:"
+
+Then, based on that analysis, write a reflection for the user that states
+whether the recommendation is correct, explains why, and names any concerns.
+Decide whether a supervisor should review this recommendation (for example:
+wrong zone, budget or urgency not met, or unreliable data).
+
+End your answer with ONE line of valid JSON with exactly these keys, and
+nothing after it:
+{"reflection": "<2-3 clear sentences for the user>", "escalate": <true|false>, "supervisor_reasoning": "<why a supervisor is or is not needed>"}
+""")
+    
     def __init__(self, model: Optional[str] = None, temperature: Optional[float] = None):
         """
         Initialize the Unified FedEx Agent.
@@ -101,12 +162,18 @@ class UnifiedFedExAgent:
         logger.info(f"✅ All tools initialized with {self.config.llm_provider.upper()} provider")
         logger.info(f"   Model: {model}, Temperature: {temperature}")
     
-    def process_request(self, user_question: str) -> Dict[str, Any]:
+    def process_request(
+        self,
+        user_question: str,
+        on_reflection_chunk: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
         """
         Process a complete shipping request.
         
         Args:
             user_question: User's natural language query
+            on_reflection_chunk: Optional callback receiving chain-of-thought
+                text as it streams from the LLM (for progressive display)
             
         Returns:
             Complete response with recommendation, reflection, etc.
@@ -141,7 +208,7 @@ class UnifiedFedExAgent:
         
         # Step 5: Check if reflection is needed
         if state.get('user_requested_reflection', False):
-            state = self._perform_reflection(state)
+            state = self._perform_reflection(state, on_reflection_chunk)
         
         # Step 6: Check if supervisor is needed
         if state.get('supervisor_required', False):
@@ -743,7 +810,11 @@ Return ONLY valid JSON with exactly these keys, no additional text:
             'is_weekend': delivery_date.weekday() >= 5
         }
     
-    def _perform_reflection(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _perform_reflection(
+        self,
+        state: Dict[str, Any],
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
         """Perform reflection when requested by user."""
         step_start = time.time() * 1000
         logger.info("🤔 Performing reflection")
@@ -754,27 +825,53 @@ Return ONLY valid JSON with exactly these keys, no additional text:
             state['reflection_chain_of_thought'] = ""
             return state
         
-        # Generate chain-of-thought
-        cot_prompt = self._build_chain_of_thought_prompt(state, rec)
+        # Chain-of-thought, user-facing reflection and supervisor decision come
+        # back from one streamed call: free-text analysis, then a JSON line
+        cot_prompt = self._build_chain_of_thought_prompt(self._build_reflection_prompt_vars(state, rec))
         
         try:
-            # Step 1: Generate chain-of-thought reasoning
             logger.info("🧠 Generating chain-of-thought reasoning...")
-            cot_response = self.llm.invoke([HumanMessage(content=cot_prompt)])
-            chain_of_thought = cot_response.content.strip()
-            state['reflection_chain_of_thought'] = chain_of_thought
+            text = ""
+            streamed = 0
+            for chunk in self.llm.stream([HumanMessage(content=cot_prompt)]):
+                text += chunk.content
+                if on_chunk is not None:
+                    # Stream the analysis only: hold back from the last line
+                    # starting with "{" (the verdict, same rule as the parse
+                    # below) and any trailing newline that may precede one
+                    cut = text.rfind("\n{", streamed)
+                    end = cut if cut >= 0 else len(text.rstrip("\n"))
+                    if end > streamed:
+                        on_chunk(text[streamed:end])
+                        streamed = end
+            content = text.strip()
             
-            # Step 2: Generate final reflection
-            final_prompt = self._build_final_reflection_prompt(state, rec, chain_of_thought)
-            response = self.llm.invoke([HumanMessage(content=final_prompt)])
-            reflection_text = response.content.strip()
+            review = None
+            cut = content.rfind("\n{")
+            start = cut + 1 if cut >= 0 else content.find("{")
+            if start >= 0 and "}" in content[start:]:
+                try:
+                    review = json.loads(content[start:content.rindex("}") + 1])
+                except json.JSONDecodeError:
+                    review = None
+            
+            if isinstance(review, dict) and review.get('reflection'):
+                state['reflection_chain_of_thought'] = content[:start].strip().removesuffix("```json").strip()
+                reflection_text = str(review['reflection']).strip()
+                escalate = review.get('escalate') in (True, 'true', 'True', 'yes')
+                if escalate and review.get('supervisor_reasoning'):
+                    state['supervisor_reasoning'] = str(review['supervisor_reasoning']).strip()
+            else:
+                # Model ignored the JSON format - fall back to keyword detection
+                if on_chunk is not None and len(text.rstrip()) > streamed:
+                    on_chunk(text[streamed:].rstrip())
+                state['reflection_chain_of_thought'] = content
+                reflection_text = content
+                escalate = bool(self._ESCALATE_RE.search(reflection_text))
             
             state['reflection'] = reflection_text
             
-            # Check if supervisor is needed based on reflection
-            if any(keyword in reflection_text.lower() for keyword in [
-                'supervisor', 'escalate', 'review needed', 'concern', 'issue'
-            ]):
+            if escalate:
                 state['supervisor_required'] = True
                 logger.warning("⚠️ Reflection suggests supervisor review")
             
@@ -789,81 +886,39 @@ Return ONLY valid JSON with exactly these keys, no additional text:
         state['timing']['reflection'] = (time.time() * 1000) - step_start
         return state
     
-    def _build_chain_of_thought_prompt(self, state: Dict[str, Any], rec: Dict[str, Any]) -> str:
-        """Build chain-of-thought prompt."""
-        return f"""You are analyzing how the FedEx shipping system made its recommendation.
-Show your complete thought process step-by-step.
-
-**User's Original Question:**
-"{state['user_question']}"
-
-**How the System Processed This:**
-
-1. **Parameter Extraction:**
-   - Origin: {state.get('origin', 'Not specified')}
-   - Destination: {state.get('destination', 'Unknown')}
-   - Zone Mapped: Zone {state.get('zone', 'N/A')}
-   - Weight: {state.get('weight', 0)} lbs
-   - Budget: ${state.get('budget', 0)}
-   - Urgency: {state.get('urgency', 'standard')}
-
-2. **SQL Query Generated:**
-   ```sql
-   {state.get('sql_query', 'No SQL generated')}
-   ```
-
-3. **Query Results:**
-   - Rows returned: {state.get('rate_results', {}).get('row_count', 0)}
-   - Data: {state.get('rate_results', {}).get('data', [])}
-
-4. **Recommendation Made:**
-   - Service: {rec.get('service', 'N/A')}
-   - Cost: ${rec.get('estimated_cost', 0):.2f}
-   - Delivery: {rec.get('delivery_days', 0)} days
-   - Reasoning: {rec.get('recommendation', 'N/A')}
-
-**Your Task - Show Complete Chain of Thought:**
-
-Think through step-by-step:
-1. Was the user's question understood correctly?
-2. Were origin/destination extracted properly?
-3. Was the zone mapping correct?
-4. Was the SQL query appropriate for the request?
-5. Did the query return the right data?
-6. Was the best service selected from the results?
-7. Does the recommendation meet the user's needs (budget, urgency)?
-8. Are there any concerns or issues?
-
-Provide a detailed step-by-step analysis (5-8 sentences) showing your reasoning process.
-Start with "Let me trace through how this recommendation was made:"
-"""
+    def _build_reflection_prompt_vars(self, state: Dict[str, Any], rec: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect the per-turn values for the reflection prompt."""
+        rate_results = state.get('rate_results', {})
+        return {
+            'user_question': state['user_question'],
+            'origin': state.get('origin', 'Not specified'),
+            'destination': state.get('destination', 'Unknown'),
+            'zone': state.get('zone', 'N/A'),
+            'weight': state.get('weight', 0),
+            'budget': state.get('budget', 0),
+            'urgency': state.get('urgency', 'standard'),
+            'sql_query': state.get('sql_query', 'No SQL generated'),
+            'row_count': rate_results.get('row_count', 0),
+            'data': rate_results.get('data', []),
+            'service': rec.get('service', 'N/A'),
+            'estimated_cost': f"{rec.get('estimated_cost', 0):.2f}",
+            'delivery_days': rec.get('delivery_days', 0),
+            'reasoning': rec.get('recommendation', 'N/A')
+        }
     
-    def _build_final_reflection_prompt(self, state: Dict[str, Any], rec: Dict[str, Any], chain_of_thought: str) -> str:
-        """Build final reflection prompt."""
-        return f"""Based on your detailed analysis:
-
-{chain_of_thought}
-
-Now provide a clear, concise reflection for the user.
-
-The user asked for verification. Provide confident confirmation:
-- Clearly state if the recommendation is correct
-- Explain WHY it's the best choice
-- Address any potential concerns
-- Reassure the user
-
-Format: 2-3 clear sentences.
-"""
+    def _build_chain_of_thought_prompt(self, prompt_vars: Dict[str, Any]) -> str:
+        """Build chain-of-thought prompt."""
+        return self._COT_TEMPLATE.substitute(prompt_vars)
     
     def _escalate_to_supervisor(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Escalate to supervisor when needed."""
         step_start = time.time() * 1000
         logger.info("👔 Escalating to supervisor")
         
-        # Simple supervisor logic for now
+        # Simple supervisor logic for now; reuse the reflection's reasoning when it flagged the escalation
         state['supervisor_decision'] = {
             'decision': 'Reviewed',
-            'reasoning': 'Supervisor reviewed the recommendation and found it appropriate.',
+            'reasoning': state.get('supervisor_reasoning') or 'Supervisor reviewed the recommendation and found it appropriate.',
             'final_message': 'The recommendation has been reviewed and approved by a supervisor.',
             'reviewed_by': 'FedEx Supervisor Agent',
             'review_complete': True
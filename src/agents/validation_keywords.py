@@ -17,6 +17,7 @@ Central location for all keywords used across agents for:
 - Supervisor escalation triggers
 """
 
+import re
 from typing import List
 
 
@@ -160,6 +161,16 @@ class ValidationKeywords:
         "good",
     ]
     
+    # Single-pass satisfaction classifier. The lookahead reports a match at
+    # every position, and alternatives are ordered by priority so the
+    # strongest category starting at each position wins.
+    _SATISFACTION_RE = re.compile(
+        "(?=(?P<dissatisfied>" + "|".join(map(re.escape, DISSATISFIED_KEYWORDS)) + ")"
+        "|(?P<unsure>" + "|".join(map(re.escape, UNSURE_KEYWORDS)) + ")"
+        "|(?P<satisfied>" + "|".join(map(re.escape, SATISFIED_KEYWORDS)) + "))",
+        re.IGNORECASE
+    )
+    
     # =========================================================================
     # Supervisor Trigger Keywords
     # =========================================================================
@@ -238,16 +249,16 @@ class ValidationKeywords:
         Returns:
             "satisfied", "unsure", "dissatisfied", or "unknown"
         """
-        text_lower = text.lower()
+        # Priority: dissatisfied > unsure > satisfied
+        found = "unknown"
+        for match in cls._SATISFACTION_RE.finditer(text):
+            category = match.lastgroup
+            if category == "dissatisfied":
+                return category
+            if found != "unsure":
+                found = category
         
-        if any(keyword in text_lower for keyword in cls.DISSATISFIED_KEYWORDS):
-            return "dissatisfied"
-        elif any(keyword in text_lower for keyword in cls.UNSURE_KEYWORDS):
-            return "unsure"
-        elif any(keyword in text_lower for keyword in cls.SATISFIED_KEYWORDS):
-            return "satisfied"
-        else:
-            return "unknown"
+        return found
     
     @classmethod
     def needs_supervisor(cls, text: str) -> bool:
@@ -20,10 +20,35 @@ Features:
 - Free API using OpenWeatherMap
 """
 
+import asyncio
 import requests
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+import orjson
+from cachetools import TTLCache
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Weather thresholds used for shipping recommendations (imperial units)
+FREEZING_TEMP_F = 32
+HOT_TEMP_F = 90
+HIGH_WIND_MPH = 25
+POOR_VISIBILITY_MILES = 1
+
+# OpenWeatherMap "main" conditions (lowercased) grouped by shipping impact
+RAIN_CONDITIONS = frozenset({'rain', 'drizzle'})
+SNOW_CONDITIONS = frozenset({'snow', 'mist'})
+STORM_CONDITIONS = frozenset({'thunderstorm'})
+
+# Condition -> recommendation lookup, replacing a chain of membership tests
+CONDITION_RECOMMENDATIONS = {
+    **dict.fromkeys(RAIN_CONDITIONS, "🌧️ **Rainy conditions** - Ensure waterproof packaging for sensitive items"),
+    **dict.fromkeys(SNOW_CONDITIONS, "❄️ **Snow/fog conditions** - Delays possible, consider expedited shipping"),
+    **dict.fromkeys(STORM_CONDITIONS, "⛈️ **Storm conditions** - Significant delays likely, avoid urgent shipments"),
+}
 
 
 class WeatherLookupTool:
@@ -38,7 +63,26 @@ class WeatherLookupTool:
         """Initialize the weather lookup tool."""
         # OpenWeatherMap API key (free tier available)
         self.api_key = os.getenv("OPENWEATHER_API_KEY")
-        self.base_url = "http://api.openweathermap.org/data/2.5"
+        self.base_url = "https://api.openweathermap.org/data/2.5"
+        self._weather_url = f"{self.base_url}/weather"
+        self._static_params = {
+            'appid': self.api_key,
+            'units': 'imperial'  # Fahrenheit and mph
+        }
+        
+        # Shared session so repeated lookups reuse keep-alive connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # Weather changes slowly; unknown ZIPs are remembered briefly to avoid hammering the API
+        self._cache = TTLCache(maxsize=512, ttl=600)
+        self._negative_cache = TTLCache(maxsize=512, ttl=30)
         
         if not self.api_key:
             logger.warning("⚠️ No OpenWeatherMap API key found. Weather features disabled.")
@@ -59,86 +103,151 @@ class WeatherLookupTool:
             Dictionary with weather information or error message
         """
         if not self.enabled:
-            return {
-                'success': False,
-                'error': 'Weather service not available. API key not configured.',
-                'zip_code': zip_code,
-                'weather_info': None
-            }
+            return self._error_result(zip_code, 'Weather service not available. API key not configured.')
+        
+        key = (zip_code, country_code)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
         
         try:
             logger.info(f"🌤️ Looking up weather for ZIP {zip_code}")
             
             # Get current weather
-            current_url = f"{self.base_url}/weather"
-            params = {
-                'zip': f"{zip_code},{country_code}",
-                'appid': self.api_key,
-                'units': 'imperial'  # Fahrenheit and mph
-            }
-            
-            response = requests.get(current_url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                weather_info = {
-                    'location': f"{data['name']}, {data['sys']['country']}",
-                    'current_temp': round(data['main']['temp']),
-                    'feels_like': round(data['main']['feels_like']),
-                    'humidity': data['main']['humidity'],
-                    'wind_speed': round(data['wind']['speed']),
-                    'description': data['weather'][0]['description'].title(),
-                    'main_condition': data['weather'][0]['main'],
-                    'visibility': round(data.get('visibility', 0) / 1609.34, 1) if data.get('visibility') else 'N/A',  # Convert to miles
-                    'pressure': data['main']['pressure'],
-                    'zip_code': zip_code
-                }
-                
-                # Add shipping recommendations based on weather
-                weather_info['shipping_recommendation'] = self._get_shipping_recommendation(weather_info)
-                
-                logger.success(f"✅ Weather retrieved for {weather_info['location']}")
-                
-                return {
-                    'success': True,
-                    'weather_info': weather_info,
-                    'zip_code': zip_code
-                }
-                
-            elif response.status_code == 404:
-                logger.error(f"❌ ZIP code {zip_code} not found")
-                return {
-                    'success': False,
-                    'error': f'ZIP code {zip_code} not found',
-                    'zip_code': zip_code,
-                    'weather_info': None
-                }
-            else:
-                logger.error(f"❌ Weather API error: {response.status_code}")
-                return {
-                    'success': False,
-                    'error': f'Weather service error: {response.status_code}',
-                    'zip_code': zip_code,
-                    'weather_info': None
-                }
+            params = {**self._static_params, 'zip': f"{zip_code},{country_code}"}
+            response = self.session.get(self._weather_url, params=params, timeout=10)
+            result = self._handle_weather_response(response, zip_code)
+            self._store_cached(key, result, response.status_code)
+            return result
                 
         except requests.exceptions.Timeout:
             logger.error("❌ Weather API timeout")
-            return {
-                'success': False,
-                'error': 'Weather service timeout',
-                'zip_code': zip_code,
-                'weather_info': None
-            }
+            return self._error_result(zip_code, 'Weather service timeout')
         except Exception as e:
             logger.error(f"❌ Weather lookup error: {e}")
+            return self._error_result(zip_code, f'Weather lookup failed: {str(e)}')
+    
+    async def get_weather_for_zips(self, zip_codes: List[str], country_code: str = "US") -> List[Dict[str, Any]]:
+        """
+        Get weather information for several ZIP codes concurrently.
+        
+        Lookups share one pooled async client, so N ZIP codes take roughly
+        as long as the slowest single request instead of the sum of all.
+        
+        Args:
+            zip_codes: ZIP codes to look up weather for
+            country_code: Country code (default: US)
+            
+        Returns:
+            List of result dictionaries, in the same order as zip_codes
+        """
+        if not self.enabled:
+            return [self.get_weather_for_zip(zip_code, country_code) for zip_code in zip_codes]
+        
+        async with httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_connections=16)
+        ) as client:
+            return await asyncio.gather(
+                *[self._fetch_weather_async(client, zip_code, country_code) for zip_code in zip_codes]
+            )
+    
+    async def _fetch_weather_async(self, client: httpx.AsyncClient, zip_code: str, country_code: str) -> Dict[str, Any]:
+        """Fetch weather for a single ZIP code using an async HTTP client."""
+        key = (zip_code, country_code)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            logger.info(f"🌤️ Looking up weather for ZIP {zip_code}")
+            params = {**self._static_params, 'zip': f"{zip_code},{country_code}"}
+            response = await client.get(self._weather_url, params=params)
+            result = self._handle_weather_response(response, zip_code)
+            self._store_cached(key, result, response.status_code)
+            return result
+        except httpx.TimeoutException:
+            logger.error("❌ Weather API timeout")
+            return self._error_result(zip_code, 'Weather service timeout')
+        except Exception as e:
+            logger.error(f"❌ Weather lookup error: {e}")
+            return self._error_result(zip_code, f'Weather lookup failed: {str(e)}')
+    
+    def _handle_weather_response(self, response: Any, zip_code: str) -> Dict[str, Any]:
+        """
+        Convert an OpenWeatherMap HTTP response into a result dictionary.
+        
+        Works with both requests and httpx responses.
+        
+        Args:
+            response: HTTP response from the current weather endpoint
+            zip_code: ZIP code the response belongs to
+            
+        Returns:
+            Dictionary with weather information or error message
+        """
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            main = data['main']
+            current = data['weather'][0]
+            visibility = data.get('visibility')
+            
+            weather_info = {
+                'location': f"{data['name']}, {data['sys']['country']}",
+                'current_temp': round(main['temp']),
+                'feels_like': round(main['feels_like']),
+                'humidity': main['humidity'],
+                'wind_speed': round(data['wind']['speed']),
+                'description': current['description'].title(),
+                'main_condition': current['main'],
+                'visibility': round(visibility / 1609.34, 1) if visibility else 'N/A',  # Convert to miles
+                'pressure': main['pressure'],
+                'zip_code': zip_code
+            }
+            
+            # Add shipping recommendations based on weather
+            weather_info['shipping_recommendation'] = self._get_shipping_recommendation(weather_info)
+            
+            logger.success(f"✅ Weather retrieved for {weather_info['location']}")
+            
             return {
-                'success': False,
-                'error': f'Weather lookup failed: {str(e)}',
-                'zip_code': zip_code,
-                'weather_info': None
+                'success': True,
+                'weather_info': weather_info,
+                'zip_code': zip_code
             }
+            
+        elif response.status_code == 404:
+            logger.error(f"❌ ZIP code {zip_code} not found")
+            return self._error_result(zip_code, f'ZIP code {zip_code} not found')
+        else:
+            logger.error(f"❌ Weather API error: {response.status_code}")
+            return self._error_result(zip_code, f'Weather service error: {response.status_code}')
+    
+    def _get_cached(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """Return a cached lookup result for (zip_code, country_code), if still fresh."""
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._negative_cache.get(key)
+        if cached is not None:
+            logger.debug(f"🌤️ Weather cache hit for ZIP {key[0]}")
+        return cached
+    
+    def _store_cached(self, key: Tuple[str, str], result: Dict[str, Any], status_code: int) -> None:
+        """Cache successful lookups and (briefly) ZIP codes the API does not know."""
+        if result['success']:
+            self._cache[key] = result
+        elif status_code == 404:
+            self._negative_cache[key] = result
+    
+    @staticmethod
+    def _error_result(zip_code: str, error: str) -> Dict[str, Any]:
+        """Build a failed lookup result."""
+        return {
+            'success': False,
+            'error': error,
+            'zip_code': zip_code,
+            'weather_info': None
+        }
     
     def _get_shipping_recommendation(self, weather_info: Dict[str, Any]) -> str:
         """
@@ -158,25 +267,22 @@ class WeatherLookupTool:
         recommendations = []
         
         # Temperature recommendations
-        if temp < 32:  # Freezing
+        if temp < FREEZING_TEMP_F:
             recommendations.append("⚠️ **Freezing temperatures** - Consider protective packaging for electronics, liquids, or temperature-sensitive items")
-        elif temp > 90:  # Hot
+        elif temp > HOT_TEMP_F:
             recommendations.append("🌡️ **High temperatures** - Avoid shipping perishable items or electronics without temperature protection")
         
         # Weather condition recommendations
-        if condition in ['rain', 'drizzle']:
-            recommendations.append("🌧️ **Rainy conditions** - Ensure waterproof packaging for sensitive items")
-        elif condition in ['snow', 'mist']:
-            recommendations.append("❄️ **Snow/fog conditions** - Delays possible, consider expedited shipping")
-        elif condition in ['thunderstorm']:
-            recommendations.append("⛈️ **Storm conditions** - Significant delays likely, avoid urgent shipments")
+        condition_recommendation = CONDITION_RECOMMENDATIONS.get(condition)
+        if condition_recommendation:
+            recommendations.append(condition_recommendation)
         
         # Wind recommendations
-        if wind_speed > 25:  # Strong winds
+        if wind_speed > HIGH_WIND_MPH:
             recommendations.append("💨 **High winds** - Possible delivery delays, secure packaging recommended")
         
         # Visibility recommendations
-        if isinstance(visibility, (int, float)) and visibility < 1:  # Poor visibility
+        if isinstance(visibility, (int, float)) and visibility < POOR_VISIBILITY_MILES:
             recommendations.append("🌫️ **Poor visibility** - Delivery delays expected")
         
         # Default recommendation
@@ -247,7 +353,7 @@ class WeatherLookupTool:
         
         # Package-specific checks
         if package_type.lower() in ['perishable', 'food', 'medicine']:
-            if temp < 32 or temp > 90:
+            if temp < FREEZING_TEMP_F or temp > HOT_TEMP_F:
                 issues.append(f"Temperature unsuitable for {package_type} ({temp}°F)")
         
         if package_type.lower() in ['fragile', 'electronics']:
@@ -12,7 +12,9 @@ Extract FedEx U.S. Express Package Rate Tables from PDF pages 13-30.
 Follows COSTAR prompt specifications for clean tabular output.
 """
 
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -35,48 +37,60 @@ class FedExRateExtractor:
         "FedEx_Express_Saver",
     ]
 
+    # (zone, first_page, last_page): zone N occupies pages 13+(N-2)*3 .. +2
+    ZONES = tuple(
+        (zone, 13 + (zone - 2) * 3, 15 + (zone - 2) * 3) for zone in range(2, 9)
+    )
+
+    # Rate tables are ruled grids; explicit settings avoid re-deriving defaults per page
+    TABLE_SETTINGS = {
+        "vertical_strategy": "lines",
+        "horizontal_strategy": "lines",
+    }
+
+    # One-pass cleaner: currency symbols, commas, asterisks and whitespace,
+    # plus a trailing lb/lbs unit or trailing periods
+    _RE_CLEAN = re.compile(r"[$,*\s]|lbs?\.?(?=\s*$)|\.+(?=\s*$)")
+
     def __init__(self, pdf_path: Path) -> None:
         """Initialize extractor with PDF path."""
         self.pdf_path = pdf_path
-        self.data: list[dict[str, Any]] = []
-
-    def _clean_numeric(self, value: str) -> float | None:
-        """Clean and convert string to numeric value."""
-        if not value or value.strip() == "":
-            return None
+        # Column-oriented accumulator (one list per output column)
+        self.data: dict[str, list[Any]] = {col: [] for col in self.COLUMNS}
 
-        # Remove currency, units, commas, spaces, asterisks, and periods at end
-        cleaned = re.sub(r"[$,*\s]", "", str(value))
-        cleaned = re.sub(r"lbs?\.?$", "", cleaned)  # Remove lb/lbs at end
-        cleaned = cleaned.rstrip(".")  # Remove trailing periods
-
-        try:
-            return float(cleaned)
-        except (ValueError, TypeError):
-            return None
+    def _clean_numeric_series(self, values: pd.Series) -> pd.Series:
+        """Clean and convert a column of raw strings to floats (NaN if invalid)."""
+        cleaned = values.astype(str).str.replace(self._RE_CLEAN, "", regex=True)
+        return pd.to_numeric(cleaned, errors="coerce")
 
     def extract_zone_tables(self, start_page: int = 13, end_page: int = 33) -> None:
         """
         Extract rate tables from specified pages.
         Zones 2-8, each spanning 3 pages.
         """
-        zone_mapping = {
-            (13, 15): 2,
-            (16, 18): 3,
-            (19, 21): 4,
-            (22, 24): 5,
-            (25, 27): 6,
-            (28, 30): 7,
-            (31, 33): 8,
-        }
-
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page_range, zone in zone_mapping.items():
-                logger.info(f"Processing Zone {zone}, pages {page_range}")
-                zone_data = self._extract_zone(
-                    pdf, zone, page_range[0], page_range[1]
-                )
-                self.data.extend(zone_data)
+        for zone, start, end in self.ZONES:
+            logger.info(f"Processing Zone {zone}, pages ({start}, {end})")
+
+        # Zones are independent and PDF parsing is CPU-bound, so with several
+        # CPUs each worker process parses a contiguous chunk of zones from one
+        # PDF handle; with a single CPU a pool only adds overhead
+        max_workers = min(len(self.ZONES), os.cpu_count() or 1)
+        if max_workers <= 1:
+            results = _extract_zones_worker(self.pdf_path, self.ZONES)
+        else:
+            size = -(-len(self.ZONES) // max_workers)
+            chunks = [self.ZONES[i:i + size] for i in range(0, len(self.ZONES), size)]
+            with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                futures = [
+                    executor.submit(_extract_zones_worker, self.pdf_path, chunk)
+                    for chunk in chunks
+                ]
+                # Collect in zone order so output is deterministic
+                results = [zone_data for future in futures for zone_data in future.result()]
+
+        for zone_data in results:
+            for col in self.COLUMNS:
+                self.data[col].extend(zone_data[col])
 
     def _parse_multiline_cell(self, cell: str | None) -> list[str]:
         """Parse a cell that may contain multiple values on separate lines."""
@@ -88,26 +102,31 @@ class FedExRateExtractor:
 
     def _extract_zone(
         self, pdf: pdfplumber.PDF, zone: int, start: int, end: int
-    ) -> list[dict[str, Any]]:
+    ) -> dict[str, list[Any]]:
         """Extract data for a single zone across its 3 pages."""
-        zone_rows = []
+        # Raw cell strings per column; cleaned in one vectorized pass below
+        raw_rows: dict[str, list[str]] = {col: [] for col in self.COLUMNS[1:]}
 
         for page_num in range(start, end + 1):
             page = pdf.pages[page_num - 1]  # 0-indexed
-            tables = page.extract_tables()
+            found_tables = page.find_tables(table_settings=self.TABLE_SETTINGS)
+
+            # Skip small or decorative tables before extracting their text;
+            # the main rate table has 8 columns
+            tables = [
+                found_table.extract()
+                for found_table in found_tables
+                if len(found_table.rows) >= 2 and len(found_table.rows[0].cells) >= 8
+            ]
 
-            if not tables:
+            # Release the page's cached layout objects so memory stays flat across pages
+            page.flush_cache()
+
+            if not found_tables:
                 logger.warning(f"No tables found on page {page_num}")
                 continue
 
-            for table_idx, table in enumerate(tables):
-                if not table or len(table) < 2:
-                    continue
-
-                # Look for the main rate table (has 8 columns)
-                if len(table[0]) < 8:
-                    continue
-
+            for table in tables:
                 # Process each row
                 for row_idx, row in enumerate(table):
                     if not row or len(row) < 8:
@@ -133,70 +152,80 @@ class FedExRateExtractor:
                     if any(len(col) != num_values for col in rate_cols):
                         continue
 
-                    # Process each weight/rate combination
-                    for i in range(num_values):
-                        weight = self._clean_numeric(weights[i])
-                        if weight is None or weight < 1 or weight > 150:
-                            continue
-
-                        rates = [
-                            self._clean_numeric(rate_cols[j][i])
-                            for j in range(6)
-                        ]
-
-                        # Only add if we have some valid rate data
-                        # Note: Using standard order as per headers
-                        if any(r is not None for r in rates):
-                            zone_rows.append(
-                                {
-                                    "Zone": zone,
-                                    "Weight": int(weight),
-                                    "FedEx_First_Overnight": rates[0],
-                                    "FedEx_Priority_Overnight": rates[1],
-                                    "FedEx_Standard_Overnight": rates[2],
-                                    "FedEx_2Day_AM": rates[3],
-                                    "FedEx_2Day": rates[4],
-                                    "FedEx_Express_Saver": rates[5],
-                                }
-                            )
-
-        logger.info(f"Zone {zone}: extracted {len(zone_rows)} rows")
-        # Sort by weight and remove duplicates
-        zone_rows.sort(key=lambda x: x["Weight"])
-        return zone_rows
+                    # Collect each weight/rate combination
+                    # Note: Using standard order as per headers
+                    raw_rows["Weight"].extend(weights)
+                    for j, col in enumerate(self.COLUMNS[2:]):
+                        raw_rows[col].extend(rate_cols[j])
+
+        zone_df = pd.DataFrame(
+            {
+                col: self._clean_numeric_series(pd.Series(values, dtype=object))
+                for col, values in raw_rows.items()
+            }
+        )
+
+        # Keep valid weights that have some rate data
+        rate_columns = self.COLUMNS[2:]
+        zone_df = zone_df[
+            zone_df["Weight"].between(1, 150) & zone_df[rate_columns].notna().any(axis=1)
+        ]
+        zone_df = zone_df.assign(Zone=zone, Weight=zone_df["Weight"].astype(int))
+
+        logger.info(f"Zone {zone}: extracted {len(zone_df)} rows")
+        # Sort by weight
+        zone_df = zone_df.sort_values("Weight", kind="stable")
+        return zone_df[self.COLUMNS].to_dict("list")
 
     def validate_against_reference(self, validation_csv: Path) -> None:
         """Validate extracted data against reference CSV."""
-        validation_df = pd.read_csv(validation_csv)
+        # Only the key and rate columns are compared; narrow dtypes keep the frame small
+        validation_df = pd.read_csv(
+            validation_csv,
+            usecols=self.COLUMNS,
+            dtype={
+                "Zone": "int16",
+                "Weight": "int16",
+                **{col: "float32" for col in self.COLUMNS[2:]},
+            },
+        )
         extracted_df = pd.DataFrame(self.data)
 
         logger.info(f"Extracted {len(extracted_df)} rows")
         logger.info(f"Validation set has {len(validation_df)} rows")
 
-        # Check specific validation points
-        for _, val_row in validation_df.iterrows():
-            zone = val_row["Zone"]
-            weight = val_row["Weight"]
-
-            match = extracted_df[
-                (extracted_df["Zone"] == zone) & (extracted_df["Weight"] == weight)
-            ]
-
-            if match.empty:
-                logger.warning(f"Missing: Zone {zone}, Weight {weight}")
-            else:
-                # Compare values
-                for col in self.COLUMNS[2:]:  # Skip Zone and Weight
-                    expected = val_row[col]
-                    actual = match.iloc[0][col]
-
-                    if pd.notna(expected) and pd.notna(actual):
-                        diff = abs(float(expected) - float(actual))
-                        if diff > 0.01:  # Allow small rounding differences
-                            logger.error(
-                                f"Mismatch at Zone {zone}, Weight {weight}, "
-                                f"{col}: expected {expected}, got {actual}"
-                            )
+        # Join validation points to extracted rows (first match per Zone/Weight)
+        rate_columns = self.COLUMNS[2:]
+        merged = validation_df.merge(
+            extracted_df.drop_duplicates(["Zone", "Weight"]),
+            on=["Zone", "Weight"],
+            how="left",
+            suffixes=("_exp", "_act"),
+            indicator=True,
+        )
+
+        missing = merged["_merge"] == "left_only"
+        for zone, weight in merged.loc[missing, ["Zone", "Weight"]].itertuples(index=False):
+            logger.warning(f"Missing: Zone {zone}, Weight {weight}")
+
+        # Compare values; NaN on either side never counts as a mismatch
+        mismatches = pd.DataFrame(
+            {
+                col: (
+                    merged[f"{col}_exp"].astype(float) - merged[f"{col}_act"].astype(float)
+                ).abs() > 0.01  # Allow small rounding differences
+                for col in rate_columns
+            }
+        )
+
+        for idx in mismatches.index[mismatches.any(axis=1)]:
+            row = merged.loc[idx]
+            for col in rate_columns:
+                if mismatches.at[idx, col]:
+                    logger.error(
+                        f"Mismatch at Zone {row['Zone']}, Weight {row['Weight']}, "
+                        f"{col}: expected {row[f'{col}_exp']:.2f}, got {row[f'{col}_act']:.2f}"
+                    )
 
     def save_to_csv(self, output_path: Path) -> None:
         """Save extracted data to CSV in COSTAR format."""
@@ -208,15 +237,20 @@ class FedExRateExtractor:
         # Sort by Zone then Weight
         df = df.sort_values(["Zone", "Weight"])
 
-        # Format numeric columns to 2 decimals
-        for col in self.COLUMNS[2:]:
-            df[col] = df[col].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "")
-
-        # Save without index
-        df.to_csv(output_path, index=False)
+        # Save without index; rate columns formatted to 2 decimals during the write
+        df.to_csv(output_path, index=False, float_format="%.2f", na_rep="")
         logger.info(f"Saved {len(df)} rows to {output_path}")
 
 
+def _extract_zones_worker(
+    pdf_path: Path, zones: tuple[tuple[int, int, int], ...]
+) -> list[dict[str, list[Any]]]:
+    """Process-pool entry point: extract a chunk of zones from one private PDF handle."""
+    extractor = FedExRateExtractor(pdf_path)
+    with pdfplumber.open(pdf_path) as pdf:
+        return [extractor._extract_zone(pdf, zone, start, end) for zone, start, end in zones]
+
+
 def main() -> None:
     """Main extraction workflow."""
     project_root = Path(__file__).parent.parent
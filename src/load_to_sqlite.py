@@ -12,22 +12,74 @@ Load FedEx rate data from CSV into SQLite database.
 Follows COSTAR prompt specifications for data validation.
 """
 
+import csv
 import os
 import sqlite3
+from operator import itemgetter
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
-import pandas as pd
 from loguru import logger
 
+from table_format import format_table
+
 
 class FedExDatabaseLoader:
     """Load and validate FedEx rates in SQLite database."""
 
+    CREATE_TABLE_SQL = """
+        CREATE TABLE fedex_rates (
+            Zone INTEGER,
+            Weight INTEGER,
+            FedEx_First_Overnight REAL,
+            FedEx_Priority_Overnight REAL,
+            FedEx_Standard_Overnight REAL,
+            FedEx_2Day_AM REAL,
+            FedEx_2Day REAL,
+            FedEx_Express_Saver REAL
+        )
+    """
+
+    INSERT_SQL = "INSERT INTO fedex_rates VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+    # Table (and INSERT placeholder) column order
+    COLUMNS = [
+        "Zone",
+        "Weight",
+        "FedEx_First_Overnight",
+        "FedEx_Priority_Overnight",
+        "FedEx_Standard_Overnight",
+        "FedEx_2Day_AM",
+        "FedEx_2Day",
+        "FedEx_Express_Saver",
+    ]
+
     def __init__(self, csv_path: Path, db_path: Path) -> None:
         """Initialize loader with file paths."""
         self.csv_path = csv_path
         self.db_path = db_path
         self.table_name = "fedex_rates"
+        # Kept open from the load through validation so the page cache stays warm
+        self._conn: Optional[sqlite3.Connection] = None
+        # Distinct weights per zone, gathered while streaming the CSV
+        self._coverage: Optional[Dict[int, int]] = None
+
+    def _connect_for_bulk_load(self) -> sqlite3.Connection:
+        """
+        Open a connection tuned for a one-shot bulk load.
+        
+        Durability is traded for write speed: the database is always
+        recreated from the CSV, so a crash mid-load only means re-running.
+        """
+        # Autocommit mode so the whole load is one explicit transaction
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.executescript(
+            "PRAGMA journal_mode=MEMORY;"
+            "PRAGMA synchronous=OFF;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA cache_size=-64000;"
+        )
+        return conn
 
     def remove_existing_database(self) -> None:
         """Remove existing database file if it exists."""
@@ -38,65 +90,118 @@ class FedExDatabaseLoader:
         else:
             logger.info("No existing database found")
 
-    def load_csv_to_dataframe(self) -> pd.DataFrame:
-        """Read CSV file into pandas DataFrame."""
-        logger.info(f"Reading CSV file: {self.csv_path}")
+    def create_database_and_load(self) -> int:
+        """
+        Create SQLite database and stream the CSV straight into it.
+        
+        Rows go from the csv reader to executemany without pandas; the
+        INTEGER/REAL column affinities convert the text values on insert.
+        
+        Returns:
+            Number of records loaded
+        """
+        logger.info(f"Creating database: {self.db_path}")
+        logger.info(f"Streaming CSV file: {self.csv_path}")
         
         try:
-            df = pd.read_csv(self.csv_path)
-            logger.success(f"✅ CSV loaded successfully. Shape: {df.shape}")
+            conn = self._connect_for_bulk_load()
+            self._conn = conn
+            conn.execute("BEGIN")
             
-            # Display column info
-            logger.info(f"Columns: {list(df.columns)}")
-            logger.info(f"Data types:\n{df.dtypes}")
+            # Literal schema on a fresh file (remove_existing_database runs
+            # first), so no DROP is needed; an existing table fails the load
+            conn.execute(self.CREATE_TABLE_SQL)
             
-            return df
+            with open(self.csv_path, newline="") as csv_file:
+                reader = csv.reader(csv_file)
+                header = next(reader, None)
+                if header is None:
+                    raise ValueError("CSV file is empty")
+                logger.info(f"Columns: {header}")
+                
+                # Pick columns by header position; blank cells load as NULL
+                pick = itemgetter(*(header.index(col) for col in self.COLUMNS))
+                zone_weights: Dict[int, Set[float]] = {}
+                rows = self._iter_rows(reader, pick, zone_weights)
+                record_count = conn.executemany(self.INSERT_SQL, rows).rowcount
             
-        except FileNotFoundError:
-            logger.error(f"❌ CSV file not found: {self.csv_path}")
-            raise
-        except pd.errors.EmptyDataError:
-            logger.error("❌ CSV file is empty")
-            raise
-        except Exception as e:
-            logger.error(f"❌ Error reading CSV: {e}")
-            raise
-
-    def create_database_and_load(self, df: pd.DataFrame) -> None:
-        """Create SQLite database and load DataFrame."""
-        logger.info(f"Creating database: {self.db_path}")
-        
-        try:
-            # Create connection
-            conn = sqlite3.connect(self.db_path)
+            self._coverage = {zone: len(weights) for zone, weights in zone_weights.items()}
             
-            # Write DataFrame to SQLite
-            # if_exists='replace' will drop and recreate the table
-            # index=False prevents pandas index from being written
-            df.to_sql(
-                self.table_name,
-                conn,
-                if_exists="replace",
-                index=False,
-                dtype={
-                    "Zone": "INTEGER",
-                    "Weight": "INTEGER",
-                    "FedEx_First_Overnight": "REAL",
-                    "FedEx_Priority_Overnight": "REAL",
-                    "FedEx_Standard_Overnight": "REAL",
-                    "FedEx_2Day_AM": "REAL",
-                    "FedEx_2Day": "REAL",
-                    "FedEx_Express_Saver": "REAL",
-                }
+            conn.execute("COMMIT")
+            # Restore normal durability for anything written after the load
+            conn.execute("PRAGMA synchronous=NORMAL")
+            logger.success(
+                f"✅ Data loaded successfully into table '{self.table_name}' "
+                f"({record_count:,} rows)"
             )
             
-            conn.close()
-            logger.success(f"✅ Data loaded successfully into table '{self.table_name}'")
+            # Index after the bulk insert so rows are not indexed one at a time
+            self.create_indexes(conn)
+            return record_count
             
+        except FileNotFoundError:
+            logger.error(f"❌ CSV file not found: {self.csv_path}")
+            raise
         except Exception as e:
             logger.error(f"❌ Error creating database: {e}")
             raise
 
+    def _get_connection(self) -> sqlite3.Connection:
+        """Return the shared connection, opening one if the load did not."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+        return self._conn
+
+    def close(self) -> None:
+        """Close the shared database connection if open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _iter_rows(
+        reader: Iterator[List[str]],
+        pick: itemgetter,
+        zone_weights: Dict[int, Set[float]]
+    ) -> Iterator[Tuple[Optional[str], ...]]:
+        """
+        Yield insert-ready rows while recording distinct weights per zone.
+        
+        Zones and weights are compared numerically (as the INTEGER columns
+        store them, so "2" and "2.0" are the same zone); rows with a blank
+        or non-numeric zone or weight are loaded but not counted.
+        
+        Args:
+            reader: CSV reader positioned after the header
+            pick: Selects the table columns (in order) from a CSV row
+            zone_weights: Filled with zone -> set of weights seen
+        """
+        for row in reader:
+            if not row:
+                continue
+            values = tuple(value or None for value in pick(row))
+            if values[0] is not None and values[1] is not None:
+                try:
+                    zone_weights.setdefault(int(float(values[0])), set()).add(float(values[1]))
+                except ValueError:
+                    pass
+            yield values
+
+    def create_indexes(self, conn: sqlite3.Connection) -> None:
+        """
+        Index the loaded table on (Zone, Weight) and refresh planner statistics.
+        
+        Args:
+            conn: Open connection to the freshly loaded database
+        """
+        logger.info("Creating index on (Zone, Weight)...")
+        conn.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS idx_zone_weight "
+            f"ON {self.table_name}(Zone, Weight)"
+        )
+        conn.execute("ANALYZE")
+        logger.success("✅ Index idx_zone_weight created")
+
     def run_validation_queries(self) -> None:
         """Execute validation SQL queries and display results."""
         logger.info("\n" + "="*70)
@@ -104,50 +209,51 @@ class FedExDatabaseLoader:
         logger.info("="*70 + "\n")
         
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._get_connection()
+            # Row factory gives named access without building DataFrames
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            # One grouped pass answers queries 1, 3, 4 and 6
+            cursor.execute(
+                f"SELECT Zone, COUNT(*) AS n, MIN(Weight) AS mn, MAX(Weight) AS mx "
+                f"FROM {self.table_name} GROUP BY Zone ORDER BY Zone"
+            )
+            zone_stats = cursor.fetchall()
             
             # Query 1: Total record count
             logger.info("📊 Query 1: Total Record Count")
-            cursor.execute(f"SELECT COUNT(*) FROM {self.table_name}")
-            count = cursor.fetchone()[0]
+            count = sum(row["n"] for row in zone_stats)
             logger.success(f"✅ Total records: {count:,} rows")
             print()
             
             # Query 2: First 5 rows
             logger.info("📊 Query 2: First 5 Rows")
-            df_sample = pd.read_sql_query(
-                f"SELECT * FROM {self.table_name} LIMIT 5",
-                conn
-            )
-            print(df_sample.to_string(index=False))
+            cursor.execute(f"SELECT * FROM {self.table_name} LIMIT 5")
+            self._print_rows(cursor.fetchall())
             print()
             
             # Query 3: Unique zones
             logger.info("📊 Query 3: Unique Zones")
-            cursor.execute(f"SELECT DISTINCT Zone FROM {self.table_name} ORDER BY Zone")
-            zones = [row[0] for row in cursor.fetchall()]
+            zones = [row["Zone"] for row in zone_stats]
             logger.success(f"✅ Zones found: {zones}")
             print()
             
             # Query 4: Weight range
             logger.info("📊 Query 4: Weight Range")
-            cursor.execute(
-                f"SELECT MIN(Weight) as Min_Weight, MAX(Weight) as Max_Weight "
-                f"FROM {self.table_name}"
-            )
-            min_weight, max_weight = cursor.fetchone()
+            min_weight = min((row["mn"] for row in zone_stats), default=None)
+            max_weight = max((row["mx"] for row in zone_stats), default=None)
             logger.success(f"✅ Weight range: {min_weight} lbs to {max_weight} lbs")
             print()
             
             # Query 5: Example rate check (Zone 2, Weight 10)
             logger.info("📊 Query 5: Rate Check for Zone 2, Weight 10 lbs")
-            df_example = pd.read_sql_query(
-                f"SELECT * FROM {self.table_name} WHERE Zone = 2 AND Weight = 10",
-                conn
+            cursor.execute(
+                f"SELECT * FROM {self.table_name} WHERE Zone = 2 AND Weight = 10"
             )
-            if not df_example.empty:
-                print(df_example.to_string(index=False))
+            example_rows = cursor.fetchall()
+            if example_rows:
+                self._print_rows(example_rows)
                 logger.success("✅ Rate data retrieved successfully")
             else:
                 logger.warning("⚠️ No data found for Zone 2, Weight 10")
@@ -155,29 +261,21 @@ class FedExDatabaseLoader:
             
             # Additional Query 6: Records per zone
             logger.info("📊 Query 6: Records Per Zone (Distribution Check)")
-            cursor.execute(
-                f"SELECT Zone, COUNT(*) as Record_Count "
-                f"FROM {self.table_name} GROUP BY Zone ORDER BY Zone"
-            )
-            zone_counts = cursor.fetchall()
-            for zone, cnt in zone_counts:
-                print(f"  Zone {zone}: {cnt:,} records")
+            for row in zone_stats:
+                print(f"  Zone {row['Zone']}: {row['n']:,} records")
             logger.success("✅ Zone distribution verified")
             print()
             
             # Additional Query 7: Sample rates for each zone at weight 50
             logger.info("📊 Query 7: Sample Rates at 50 lbs Across All Zones")
-            df_weight50 = pd.read_sql_query(
+            cursor.execute(
                 f"SELECT Zone, Weight, FedEx_2Day, FedEx_Express_Saver "
-                f"FROM {self.table_name} WHERE Weight = 50 ORDER BY Zone",
-                conn
+                f"FROM {self.table_name} WHERE Weight = 50 ORDER BY Zone"
             )
-            print(df_weight50.to_string(index=False))
+            self._print_rows(cursor.fetchall())
             logger.success("✅ Cross-zone rate comparison complete")
             print()
             
-            conn.close()
-            
             logger.info("="*70)
             logger.success("✅ ALL VALIDATION QUERIES COMPLETED SUCCESSFULLY")
             logger.info("="*70)
@@ -189,6 +287,13 @@ class FedExDatabaseLoader:
             logger.error(f"❌ Error running validation queries: {e}")
             raise
 
+    @staticmethod
+    def _print_rows(rows: List[sqlite3.Row]) -> None:
+        """Print query rows as a right-aligned table with a header line."""
+        if not rows:
+            return
+        print(format_table(rows[0].keys(), rows))
+
     def verify_data_integrity(self) -> None:
         """Additional data integrity checks."""
         logger.info("\n" + "="*70)
@@ -196,7 +301,7 @@ class FedExDatabaseLoader:
         logger.info("="*70 + "\n")
         
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._get_connection()
             
             # Check for NULL values
             logger.info("🔍 Checking for NULL values in rate columns...")
@@ -210,12 +315,17 @@ class FedExDatabaseLoader:
                 "FedEx_Express_Saver"
             ]
             
+            # One scan computes NULL and non-positive counts for every rate column
+            sums = ", ".join(
+                f"SUM({col} IS NULL), SUM({col} <= 0)" for col in rate_columns
+            )
+            cursor.execute(f"SELECT {sums} FROM {self.table_name}")
+            counts = cursor.fetchone()
+            null_counts = [count or 0 for count in counts[0::2]]
+            invalid_counts = [count or 0 for count in counts[1::2]]
+            
             has_nulls = False
-            for col in rate_columns:
-                cursor.execute(
-                    f"SELECT COUNT(*) FROM {self.table_name} WHERE {col} IS NULL"
-                )
-                null_count = cursor.fetchone()[0]
+            for col, null_count in zip(rate_columns, null_counts):
                 if null_count > 0:
                     logger.warning(f"⚠️  {col}: {null_count} NULL values")
                     has_nulls = True
@@ -227,11 +337,7 @@ class FedExDatabaseLoader:
             # Check for negative rates
             logger.info("🔍 Checking for negative or zero rates...")
             has_invalid = False
-            for col in rate_columns:
-                cursor.execute(
-                    f"SELECT COUNT(*) FROM {self.table_name} WHERE {col} <= 0"
-                )
-                invalid_count = cursor.fetchone()[0]
+            for col, invalid_count in zip(rate_columns, invalid_counts):
                 if invalid_count > 0:
                     logger.warning(f"⚠️  {col}: {invalid_count} invalid values")
                     has_invalid = True
@@ -242,11 +348,15 @@ class FedExDatabaseLoader:
             
             # Check weight coverage
             logger.info("🔍 Checking weight coverage (1-150 lbs)...")
-            cursor.execute(
-                f"SELECT Zone, COUNT(DISTINCT Weight) as weight_count "
-                f"FROM {self.table_name} GROUP BY Zone"
-            )
-            weight_coverage = cursor.fetchall()
+            if self._coverage is not None:
+                # Collected during the load; no extra scan needed
+                weight_coverage = sorted(self._coverage.items())
+            else:
+                cursor.execute(
+                    f"SELECT Zone, COUNT(DISTINCT Weight) as weight_count "
+                    f"FROM {self.table_name} GROUP BY Zone"
+                )
+                weight_coverage = cursor.fetchall()
             all_complete = True
             for zone, count in weight_coverage:
                 if count != 150:
@@ -257,8 +367,6 @@ class FedExDatabaseLoader:
                 logger.success("✅ All zones have complete weight coverage (1-150 lbs)")
             print()
             
-            conn.close()
-            
             logger.info("="*70)
             logger.success("✅ DATA INTEGRITY CHECKS COMPLETE")
             logger.info("="*70)
@@ -294,22 +402,17 @@ def main() -> None:
         loader.remove_existing_database()
         print()
         
-        # Step 2: Load CSV into DataFrame
-        logger.info("STEP 2: Loading CSV data")
-        df = loader.load_csv_to_dataframe()
-        print()
-        
-        # Step 3: Create database and load data
-        logger.info("STEP 3: Creating SQLite database and loading data")
-        loader.create_database_and_load(df)
+        # Step 2: Stream CSV into the database
+        logger.info("STEP 2: Creating SQLite database and loading CSV data")
+        record_count = loader.create_database_and_load()
         print()
         
-        # Step 4: Run validation queries
-        logger.info("STEP 4: Running validation queries")
+        # Step 3: Run validation queries
+        logger.info("STEP 3: Running validation queries")
         loader.run_validation_queries()
         
-        # Step 5: Data integrity checks
-        logger.info("STEP 5: Running data integrity checks")
+        # Step 4: Data integrity checks
+        logger.info("STEP 4: Running data integrity checks")
         loader.verify_data_integrity()
         
         # Final summary
@@ -317,12 +420,14 @@ def main() -> None:
         logger.success("✅ DATABASE CREATION COMPLETE!")
         logger.info(f"📁 Database location: {db_path}")
         logger.info(f"📊 Table name: {loader.table_name}")
-        logger.info(f"📈 Total records: {len(df):,}")
+        logger.info(f"📈 Total records: {record_count:,}")
         logger.info("="*70 + "\n")
         
     except Exception as e:
         logger.error(f"\n❌ Process failed: {e}")
         raise
+    finally:
+        loader.close()
 
 
 if __name__ == "__main__":
@@ -6,16 +6,29 @@ Logs agent reasoning, tool calls, and decision trajectories to:
 - JSON files (structured data for analysis)
 """
 
+import atexit
 import json
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, BinaryIO, Callable, Tuple
 from dataclasses import dataclass, asdict, field
 from enum import Enum
+from itertools import islice
+import orjson
 from loguru import logger
 
 
+# Escapes braces in logged data so loguru does not treat them as format fields
+_BRACE_TRANS = str.maketrans({"{": "{{", "}": "}}"})
+
+
+def _format_ns(timestamp_ns: int) -> str:
+    """Format an epoch-nanosecond timestamp as a local ISO string."""
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+
 class StepType(str, Enum):
     """Types of trajectory steps."""
     AGENT_START = "agent_start"
@@ -33,7 +46,7 @@ class StepType(str, Enum):
 @dataclass
 class TrajectoryStep:
     """Single step in agent reasoning trajectory."""
-    timestamp: str
+    timestamp: int  # Epoch nanoseconds; formatted to ISO only when emitted
     step_type: StepType
     agent_name: str
     action: str
@@ -69,6 +82,9 @@ class TrajectoryLogger:
     - Step-by-step reasoning visibility
     """
 
+    # JSONL write buffer size (large enough that a trajectory goes out in one write)
+    FILE_BUFFER_SIZE = 65536
+
     def __init__(
         self,
         log_dir: str = "./logs",
@@ -88,6 +104,8 @@ class TrajectoryLogger:
         self.log_dir = Path(log_dir)
         self.console_enabled = console_enabled
         self.file_enabled = file_enabled
+        # With no sink, per-step records are never read, so skip building them
+        self._active = console_enabled or file_enabled
 
         # Create log directory
         if file_enabled:
@@ -96,27 +114,33 @@ class TrajectoryLogger:
         # Configure loguru for console output
         logger.remove()  # Remove default handler
         if console_enabled:
+            # One sink; the agent column is added only when the record has one
             logger.add(
                 sys.stderr,
-                format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{extra[agent]:15}</cyan> | {message}",
+                format=self._console_format,
                 level=log_level,
-                colorize=True,
-                filter=lambda record: "agent" in record["extra"]
-            )
-            # Also add a default handler for logs without agent
-            logger.add(
-                sys.stderr,
-                format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}",
-                level=log_level,
-                colorize=True,
-                filter=lambda record: "agent" not in record["extra"]
+                colorize=True
             )
 
         # Active trajectories by session
         self._trajectories: Dict[str, Trajectory] = {}
 
+        # JSONL handle for the current day, reopened when the date changes
+        self._log_fh: Optional[BinaryIO] = None
+        self._log_date: Optional[str] = None
+        if file_enabled:
+            # Close the handle on interpreter exit
+            atexit.register(self.close)
+
         logger.info("Trajectory Logger initialized", agent="system")
 
+    @staticmethod
+    def _console_format(record: Dict[str, Any]) -> str:
+        """Loguru format template for a record, with or without an agent."""
+        if "agent" in record["extra"]:
+            return "<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{extra[agent]:15}</cyan> | {message}\n{exception}"
+        return "<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}\n{exception}"
+
     def start_trajectory(
         self,
         session_id: str,
@@ -146,7 +170,7 @@ class TrajectoryLogger:
         self._log_step(
             trajectory,
             TrajectoryStep(
-                timestamp=datetime.now().isoformat(),
+                timestamp=time.time_ns(),
                 step_type=StepType.USER_INPUT,
                 agent_name="user",
                 action="User Query",
@@ -163,12 +187,15 @@ class TrajectoryLogger:
         input_data: Optional[Dict[str, Any]] = None
     ):
         """Log when an agent starts processing."""
+        if not self._active:
+            return
+
         trajectory = self._trajectories.get(request_id)
         if not trajectory:
             return
 
         step = TrajectoryStep(
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             step_type=StepType.AGENT_START,
             agent_name=agent_name,
             action=f"Agent {agent_name} started",
@@ -185,12 +212,15 @@ class TrajectoryLogger:
         duration_ms: Optional[float] = None
     ):
         """Log when an agent finishes processing."""
+        if not self._active:
+            return
+
         trajectory = self._trajectories.get(request_id)
         if not trajectory:
             return
 
         step = TrajectoryStep(
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             step_type=StepType.AGENT_END,
             agent_name=agent_name,
             action=f"Agent {agent_name} completed",
@@ -208,12 +238,15 @@ class TrajectoryLogger:
         input_data: Dict[str, Any]
     ):
         """Log a tool call."""
+        if not self._active:
+            return
+
         trajectory = self._trajectories.get(request_id)
         if not trajectory:
             return
 
         step = TrajectoryStep(
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             step_type=StepType.TOOL_CALL,
             agent_name=agent_name,
             action=f"Calling tool: {tool_name}",
@@ -232,12 +265,15 @@ class TrajectoryLogger:
         duration_ms: Optional[float] = None
     ):
         """Log a tool result."""
+        if not self._active:
+            return
+
         trajectory = self._trajectories.get(request_id)
         if not trajectory:
             return
 
         step = TrajectoryStep(
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             step_type=StepType.TOOL_RESULT,
             agent_name=agent_name,
             action=f"Tool {tool_name} result",
@@ -256,12 +292,15 @@ class TrajectoryLogger:
         metadata: Optional[Dict[str, Any]] = None
     ):
         """Log agent reasoning/thinking."""
+        if not self._active:
+            return
+
         trajectory = self._trajectories.get(request_id)
         if not trajectory:
             return
 
         step = TrajectoryStep(
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             step_type=StepType.REASONING,
             agent_name=agent_name,
             action="Reasoning",
@@ -278,12 +317,15 @@ class TrajectoryLogger:
         reflection: Dict[str, Any]
     ):
         """Log agent reflection (self-assessment)."""
+        if not self._active:
+            return
+
         trajectory = self._trajectories.get(request_id)
         if not trajectory:
             return
 
         step = TrajectoryStep(
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             step_type=StepType.REFLECTION,
             agent_name=agent_name,
             action="Reflection",
@@ -301,12 +343,15 @@ class TrajectoryLogger:
         reason: str
     ):
         """Log agent transfer/handoff."""
+        if not self._active:
+            return
+
         trajectory = self._trajectories.get(request_id)
         if not trajectory:
             return
 
         step = TrajectoryStep(
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             step_type=StepType.TRANSFER,
             agent_name=from_agent,
             action=f"Transfer to {to_agent}",
@@ -328,8 +373,13 @@ class TrajectoryLogger:
         if not trajectory:
             return
 
+        trajectory.success = False
+        trajectory.error_message = error
+        if not self._active:
+            return
+
         step = TrajectoryStep(
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             step_type=StepType.ERROR,
             agent_name=agent_name,
             action="Error",
@@ -338,8 +388,6 @@ class TrajectoryLogger:
         )
 
         self._log_step(trajectory, step)
-        trajectory.success = False
-        trajectory.error_message = error
 
     def end_trajectory(
         self,
@@ -367,7 +415,7 @@ class TrajectoryLogger:
         self._log_step(
             trajectory,
             TrajectoryStep(
-                timestamp=datetime.now().isoformat(),
+                timestamp=time.time_ns(),
                 step_type=StepType.AGENT_OUTPUT,
                 agent_name="system",
                 action="Final Result",
@@ -391,70 +439,138 @@ class TrajectoryLogger:
         if self.console_enabled:
             self._console_log(step)
 
+    # Per-step-type console formatters; each returns (loguru level, message)
+
+    def _fmt_agent_start(self, step: TrajectoryStep) -> Tuple[str, str]:
+        return "INFO", f">>> {step.action}"
+
+    def _fmt_agent_end(self, step: TrajectoryStep) -> Tuple[str, str]:
+        msg = f"<<< {step.action} ({step.duration_ms:.0f}ms)" if step.duration_ms else f"<<< {step.action}"
+        return "INFO", msg
+
+    def _fmt_tool_call(self, step: TrajectoryStep) -> Tuple[str, str]:
+        tool = step.metadata.get("tool_name", "unknown")
+        return "INFO", f"[TOOL] Calling {tool}: {self._safe_str(step.input_data)}"
+
+    def _fmt_tool_result(self, step: TrajectoryStep) -> Tuple[str, str]:
+        tool = step.metadata.get("tool_name", "unknown")
+        return "SUCCESS", f"[TOOL] {tool} returned: {self._safe_str(self._truncate(step.output_data))}"
+
+    def _fmt_reasoning(self, step: TrajectoryStep) -> Tuple[str, str]:
+        return "DEBUG", f"[THINK] {step.reasoning}"
+
+    def _fmt_reflection(self, step: TrajectoryStep) -> Tuple[str, str]:
+        return "INFO", f"[REFLECT] {step.reasoning}"
+
+    def _fmt_transfer(self, step: TrajectoryStep) -> Tuple[str, str]:
+        to_agent = step.metadata.get("to_agent", "unknown")
+        return "WARNING", f"[TRANSFER] -> {to_agent}: {step.reasoning}"
+
+    def _fmt_error(self, step: TrajectoryStep) -> Tuple[str, str]:
+        return "ERROR", f"[ERROR] {step.reasoning}"
+
+    def _fmt_user_input(self, step: TrajectoryStep) -> Tuple[str, str]:
+        query = step.input_data.get('query', '') if step.input_data else ''
+        return "INFO", f"[USER] {query}"
+
+    def _fmt_agent_output(self, step: TrajectoryStep) -> Tuple[str, str]:
+        return "SUCCESS", f"[OUTPUT] {self._safe_str(self._truncate(step.output_data))}"
+
+    _FORMATTERS: Dict[StepType, Callable[["TrajectoryLogger", TrajectoryStep], Tuple[str, str]]] = {
+        StepType.AGENT_START: _fmt_agent_start,
+        StepType.AGENT_END: _fmt_agent_end,
+        StepType.TOOL_CALL: _fmt_tool_call,
+        StepType.TOOL_RESULT: _fmt_tool_result,
+        StepType.REASONING: _fmt_reasoning,
+        StepType.REFLECTION: _fmt_reflection,
+        StepType.TRANSFER: _fmt_transfer,
+        StepType.ERROR: _fmt_error,
+        StepType.USER_INPUT: _fmt_user_input,
+        StepType.AGENT_OUTPUT: _fmt_agent_output,
+    }
+
     def _console_log(self, step: TrajectoryStep):
         """Format and output step to console."""
-        agent = step.agent_name
-
-        # Helper to safely format data (escape braces)
-        def safe_str(data):
-            if data is None:
-                return "None"
-            s = str(data)
-            # Escape braces for logging
-            return s.replace("{", "{{").replace("}", "}}")
-
-        # Color-code by step type
-        if step.step_type == StepType.AGENT_START:
-            logger.bind(agent=agent).info(f">>> {step.action}")
-        elif step.step_type == StepType.AGENT_END:
-            msg = f"<<< {step.action} ({step.duration_ms:.0f}ms)" if step.duration_ms else f"<<< {step.action}"
-            logger.bind(agent=agent).info(msg)
-        elif step.step_type == StepType.TOOL_CALL:
-            tool = step.metadata.get("tool_name", "unknown")
-            logger.bind(agent=agent).info(f"[TOOL] Calling {tool}: {safe_str(step.input_data)}")
-        elif step.step_type == StepType.TOOL_RESULT:
-            tool = step.metadata.get("tool_name", "unknown")
-            logger.bind(agent=agent).success(f"[TOOL] {tool} returned: {safe_str(self._truncate(step.output_data))}")
-        elif step.step_type == StepType.REASONING:
-            logger.bind(agent=agent).debug(f"[THINK] {step.reasoning}")
-        elif step.step_type == StepType.REFLECTION:
-            logger.bind(agent=agent).info(f"[REFLECT] {step.reasoning}")
-        elif step.step_type == StepType.TRANSFER:
-            to_agent = step.metadata.get("to_agent", "unknown")
-            logger.bind(agent=agent).warning(f"[TRANSFER] -> {to_agent}: {step.reasoning}")
-        elif step.step_type == StepType.ERROR:
-            logger.bind(agent=agent).error(f"[ERROR] {step.reasoning}")
-        elif step.step_type == StepType.USER_INPUT:
-            query = step.input_data.get('query', '') if step.input_data else ''
-            logger.bind(agent="user").info(f"[USER] {query}")
-        elif step.step_type == StepType.AGENT_OUTPUT:
-            logger.bind(agent=agent).success(f"[OUTPUT] {safe_str(self._truncate(step.output_data))}")
+        formatter = self._FORMATTERS.get(step.step_type)
+        if formatter is None:
+            return
+
+        # Level color-codes the step type
+        level, msg = formatter(self, step)
+        logger.bind(agent=step.agent_name).log(level, msg)
+
+    @staticmethod
+    def _safe_str(data: Any) -> str:
+        """Stringify data for logging with braces escaped."""
+        if data is None:
+            return "None"
+        return str(data).translate(_BRACE_TRANS)
 
     def _truncate(self, data: Any, max_length: int = 200) -> str:
         """Truncate data for console display."""
         if data is None:
             return "None"
-        s = str(data)
+        s = str(self._clip(data, max_length))
         if len(s) > max_length:
             return s[:max_length] + "..."
         return s
 
+    def _clip(self, data: Any, max_length: int) -> Any:
+        """
+        Bound container sizes before stringifying for display.
+
+        Anything cut here already renders past max_length, so the first
+        max_length characters match str() of the full data while large
+        tool payloads are never fully formatted.
+        """
+        # Every rendered element takes at least 2 characters ("1," or "1:1,")
+        max_items = max_length // 2 + 1
+        if type(data) is dict:
+            return {
+                k: self._clip(v, max_length)
+                for k, v in islice(data.items(), max_items)
+            }
+        if type(data) is list:
+            return [self._clip(v, max_length) for v in data[:max_items]]
+        if type(data) is tuple:
+            return tuple(self._clip(v, max_length) for v in data[:max_items])
+        return data
+
     def _save_trajectory(self, trajectory: Trajectory):
         """Save trajectory to JSON Lines file."""
         date_str = datetime.now().strftime("%Y%m%d")
         log_file = self.log_dir / f"trajectory_{date_str}.jsonl"
 
-        # Convert to dict for JSON serialization
-        trajectory_dict = asdict(trajectory)
+        # Rotate to a new file on date change
+        if date_str != self._log_date:
+            self.close()
+            self._log_fh = open(log_file, "ab", buffering=self.FILE_BUFFER_SIZE)
+            self._log_date = date_str
 
-        # Convert steps to dicts
-        trajectory_dict["steps"] = [asdict(s) for s in trajectory.steps]
+        # asdict already recurses into the steps list
+        trajectory_dict = asdict(trajectory)
+        for step_dict in trajectory_dict["steps"]:
+            step_dict["timestamp"] = _format_ns(step_dict["timestamp"])
 
-        with open(log_file, "a") as f:
-            f.write(json.dumps(trajectory_dict) + "\n")
+        self._log_fh.write(
+            orjson.dumps(
+                trajectory_dict,
+                option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+            )
+        )
+        # Flush every trajectory so a crash loses nothing and each JSONL line
+        # reaches the shared daily file in a single append
+        self._log_fh.flush()
 
         logger.debug(f"Saved trajectory to {log_file}", agent="system")
 
+    def close(self):
+        """Flush and close the JSONL file handle, if open."""
+        if self._log_fh is not None:
+            self._log_fh.close()
+            self._log_fh = None
+            self._log_date = None
+
     def get_trajectory(self, request_id: str) -> Optional[Trajectory]:
         """Get current trajectory by request ID."""
         return self._trajectories.get(request_id)
@@ -477,7 +593,7 @@ class TrajectoryLogger:
             lines.append(f"### Step {i}: {step.action}")
             lines.append(f"- **Agent:** {step.agent_name}")
             lines.append(f"- **Type:** {step.step_type.value}")
-            lines.append(f"- **Time:** {step.timestamp}")
+            lines.append(f"- **Time:** {_format_ns(step.timestamp)}")
 
             if step.input_data:
                 lines.append(f"- **Input:** `{json.dumps(step.input_data)}`")
@@ -13,11 +13,27 @@ Test various SQL queries including joins with fedex_service_tiers table.
 
 import sqlite3
 
-import pandas as pd
+from table_format import format_table
+
+
+def _query(sql: str, params: tuple = ()) -> str:
+    """Run a query on the shared cursor and return its formatted results."""
+    cursor.execute(sql, params)
+    return format_table([d[0] for d in cursor.description], cursor.fetchall())
+
 
 # Connect to SQLite database
 conn = sqlite3.connect("fedex_rates.db")
 
+# Read-only session: map the file instead of read() syscalls, keep pages and
+# sort/temp b-trees in memory, and refuse accidental writes
+conn.executescript("""
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA query_only=1;
+""")
+
 print("="*70)
 print("FEDEX RATES DATABASE - SQL QUERY TESTS")
 print("="*70 + "\n")
@@ -28,36 +44,36 @@ print("="*70 + "\n")
 
 print("📊 BASIC QUERIES\n")
 
-# Example 1: Count rows
 cursor = conn.cursor()
-cursor.execute("SELECT COUNT(*) FROM fedex_rates;")
-count = cursor.fetchone()[0]
+
+# Examples 1, 2, 3 and 5 come from one metadata query
+cursor.execute("""
+    SELECT
+        COUNT(*),
+        MIN(Weight),
+        MAX(Weight),
+        (SELECT group_concat(Zone, ',') FROM (
+            SELECT Zone FROM fedex_rates GROUP BY Zone ORDER BY Zone LIMIT 5
+        ))
+    FROM fedex_rates;
+""")
+count, min_weight, max_weight, sample_zones = cursor.fetchone()
+sample_zones = sample_zones.split(",") if sample_zones else []
+
+# Example 1: Count rows
 print(f"1. Total records in fedex_rates: {count}")
 
 # Example 2: Show distinct zones
-zones = pd.read_sql_query(
-    "SELECT DISTINCT Zone FROM fedex_rates ORDER BY Zone LIMIT 5;",
-    conn
-)
-print(f"\n2. Sample Zones:\n{zones.to_string(index=False)}")
+print(f"\n2. Sample Zones:\n{format_table(['Zone'], [[zone] for zone in sample_zones])}")
 
 # Example 3: Sample weight range
-range_df = pd.read_sql_query(
-    "SELECT MIN(Weight) as MinWeight, MAX(Weight) as MaxWeight FROM fedex_rates;",
-    conn
-)
-print(f"\n3. Weight range:\n{range_df.to_string(index=False)}")
+print(f"\n3. Weight range:\n{format_table(['MinWeight', 'MaxWeight'], [(min_weight, max_weight)])}")
 
 # Example 4: Preview data
-sample = pd.read_sql_query("SELECT * FROM fedex_rates LIMIT 5;", conn)
-print(f"\n4. Sample records:\n{sample.to_string(index=False)}")
+print(f"\n4. Sample records:\n{_query('SELECT * FROM fedex_rates LIMIT 5;')}")
 
 # Example 5: Total count
-total = pd.read_sql_query(
-    "SELECT count(*) as TotalRecords FROM fedex_rates;",
-    conn
-)
-print(f"\n5. Total records:\n{total.to_string(index=False)}")
+print(f"\n5. Total records:\n{format_table(['TotalRecords'], [(count,)])}")
 
 # ============================================================================
 # SERVICE TIERS QUERIES (NEW)
@@ -75,175 +91,102 @@ service_table_exists = cursor.fetchone() is not None
 
 if service_table_exists:
     # Example 6: Show all service tiers
-    services = pd.read_sql_query(
-        "SELECT * FROM fedex_service_tiers ORDER BY id;",
-        conn
-    )
-    print(f"6. All FedEx Service Tiers:\n{services.to_string(index=False)}")
+    services = _query("SELECT * FROM fedex_service_tiers ORDER BY id;")
+    print(f"6. All FedEx Service Tiers:\n{services}")
     
-    # Example 7: Join rates with service descriptions for Zone 2, Weight 10
-    query7 = """
-    SELECT 
-        r.Zone,
-        r.Weight,
-        s.service_name,
-        s.delivery_time_desc,
-        CASE s.column_name
-            WHEN 'FedEx_First_Overnight' THEN r.FedEx_First_Overnight
-            WHEN 'FedEx_Priority_Overnight' THEN r.FedEx_Priority_Overnight
-            WHEN 'FedEx_Standard_Overnight' THEN r.FedEx_Standard_Overnight
-            WHEN 'FedEx_2Day_AM' THEN r.FedEx_2Day_AM
-            WHEN 'FedEx_2Day' THEN r.FedEx_2Day
-            WHEN 'FedEx_Express_Saver' THEN r.FedEx_Express_Saver
-        END as rate
-    FROM fedex_rates r
-    CROSS JOIN fedex_service_tiers s
-    WHERE r.Zone = 2 AND r.Weight = 10
-    ORDER BY rate;
-    """
-    result7 = pd.read_sql_query(query7, conn)
-    print(f"\n7. All services for Zone 2, 10 lbs (sorted by price):\n{result7.to_string(index=False)}")
-    
-    # Example 8: Find cheapest service for Zone 5, 50 lbs
-    query8 = """
-    WITH service_rates AS (
-        SELECT 
-            s.service_name,
-            s.delivery_time_desc,
-            CASE s.column_name
-                WHEN 'FedEx_First_Overnight' THEN r.FedEx_First_Overnight
-                WHEN 'FedEx_Priority_Overnight' THEN r.FedEx_Priority_Overnight
-                WHEN 'FedEx_Standard_overnight' THEN r.FedEx_Standard_Overnight
-                WHEN 'FedEx_2Day_AM' THEN r.FedEx_2Day_AM
-                WHEN 'FedEx_2Day' THEN r.FedEx_2Day
-                WHEN 'FedEx_Express_Saver' THEN r.FedEx_Express_Saver
-            END as rate
-        FROM fedex_rates r
-        CROSS JOIN fedex_service_tiers s
-        WHERE r.Zone = 5 AND r.Weight = 50
-    )
-    SELECT service_name, delivery_time_desc, ROUND(rate, 2) as rate
-    FROM service_rates
-    WHERE rate = (SELECT MIN(rate) FROM service_rates);
-    """
-    result8 = pd.read_sql_query(query8, conn)
-    print(f"\n8. Cheapest service for Zone 5, 50 lbs:\n{result8.to_string(index=False)}")
-    
-    # Example 9: Compare delivery speeds vs cost for Zone 3, 25 lbs
-    query9 = """
-    SELECT 
-        s.delivery_day,
-        s.service_name,
-        s.delivery_deadline,
-        ROUND(
-            CASE s.column_name
-                WHEN 'FedEx_First_Overnight' THEN r.FedEx_First_Overnight
-                WHEN 'FedEx_Priority_Overnight' THEN r.FedEx_Priority_Overnight
-                WHEN 'FedEx_Standard_Overnight' THEN r.FedEx_Standard_Overnight
-                WHEN 'FedEx_2Day_AM' THEN r.FedEx_2Day_AM
-                WHEN 'FedEx_2Day' THEN r.FedEx_2Day
-                WHEN 'FedEx_Express_Saver' THEN r.FedEx_Express_Saver
-            END, 2
-        ) as rate
-    FROM fedex_rates r
-    CROSS JOIN fedex_service_tiers s
-    WHERE r.Zone = 3 AND r.Weight = 25
-    ORDER BY 
-        CASE s.delivery_day
-            WHEN 'Next day' THEN 1
-            WHEN '2nd day' THEN 2
-            WHEN '3rd day' THEN 3
-        END,
-        rate;
-    """
-    result9 = pd.read_sql_query(query9, conn)
-    print(f"\n9. Delivery speed vs cost for Zone 3, 25 lbs:\n{result9.to_string(index=False)}")
-    
-    # Example 10: Average rates by delivery tier across all zones
-    query10 = """
-    SELECT 
-        s.delivery_day,
-        COUNT(DISTINCT r.Zone) as num_zones,
-        ROUND(AVG(
-            CASE s.column_name
-                WHEN 'FedEx_First_Overnight' THEN r.FedEx_First_Overnight
-                WHEN 'FedEx_Priority_Overnight' THEN r.FedEx_Priority_Overnight
-                WHEN 'FedEx_Standard_Overnight' THEN r.FedEx_Standard_Overnight
-                WHEN 'FedEx_2Day_AM' THEN r.FedEx_2Day_AM
-                WHEN 'FedEx_2Day' THEN r.FedEx_2Day
-                WHEN 'FedEx_Express_Saver' THEN r.FedEx_Express_Saver
-            END
-        ), 2) as avg_rate,
-        ROUND(MIN(
-            CASE s.column_name
-                WHEN 'FedEx_First_Overnight' THEN r.FedEx_First_Overnight
-                WHEN 'FedEx_Priority_Overnight' THEN r.FedEx_Priority_Overnight
-                WHEN 'FedEx_Standard_Overnight' THEN r.FedEx_Standard_Overnight
-                WHEN 'FedEx_2Day_AM' THEN r.FedEx_2Day_AM
-                WHEN 'FedEx_2Day' THEN r.FedEx_2Day
-                WHEN 'FedEx_Express_Saver' THEN r.FedEx_Express_Saver
-            END
-        ), 2) as min_rate,
-        ROUND(MAX(
-            CASE s.column_name
-                WHEN 'FedEx_First_Overnight' THEN r.FedEx_First_Overnight
-                WHEN 'FedEx_Priority_Overnight' THEN r.FedEx_Priority_Overnight
-                WHEN 'FedEx_Standard_Overnight' THEN r.FedEx_Standard_Overnight
-                WHEN 'FedEx_2Day_AM' THEN r.FedEx_2Day_AM
-                WHEN 'FedEx_2Day' THEN r.FedEx_2Day
-                WHEN 'FedEx_Express_Saver' THEN r.FedEx_Express_Saver
-            END
-        ), 2) as max_rate
-    FROM fedex_rates r
-    CROSS JOIN fedex_service_tiers s
-    WHERE r.Weight = 50
-    GROUP BY s.delivery_day
-    ORDER BY 
-        CASE s.delivery_day
-            WHEN 'Next day' THEN 1
-            WHEN '2nd day' THEN 2
-            WHEN '3rd day' THEN 3
-        END;
-    """
-    result10 = pd.read_sql_query(query10, conn)
-    print(f"\n10. Average rates by delivery tier (50 lbs across all zones):\n{result10.to_string(index=False)}")
-    
-    # Check for sample_shipments table
+    # Examples 7-11 filter mv_fedex_service_rates, where every zone/weight/service
+    # rate is stored with its service details (built by create_service_tiers.py)
     cursor.execute("""
         SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='sample_shipments';
+        WHERE type='table' AND name='mv_fedex_service_rates';
     """)
-    shipments_exist = cursor.fetchone() is not None
+    service_rates_exist = cursor.fetchone() is not None
     
-    if shipments_exist:
-        # Example 11: Shipments with service details and costs
-        query11 = """
+    if not service_rates_exist:
+        print("\n⚠️  mv_fedex_service_rates table not found (database predates it).")
+        print("   Re-run: uv run python src/create_service_tiers.py")
+    else:
+        # Example 7: Join rates with service descriptions for Zone 2, Weight 10
+        query7 = """
+        SELECT Zone, Weight, service_name, delivery_time_desc, rate
+        FROM mv_fedex_service_rates
+        WHERE Zone = ? AND Weight = ?
+        ORDER BY rate;
+        """
+        result7 = _query(query7, (2, 10))
+        print(f"\n7. All services for Zone 2, 10 lbs (sorted by price):\n{result7}")
+        
+        # Example 8: Find cheapest service for Zone 5, 50 lbs
+        query8 = """
+        SELECT service_name, delivery_time_desc, ROUND(rate, 2) as rate
+        FROM mv_fedex_service_rates
+        WHERE Zone = ? AND Weight = ? AND rate IS NOT NULL
+        ORDER BY mv_fedex_service_rates.rate
+        LIMIT 1;
+        """
+        result8 = _query(query8, (5, 50))
+        print(f"\n8. Cheapest service for Zone 5, 50 lbs:\n{result8}")
+        
+        # Example 9: Compare delivery speeds vs cost for Zone 3, 25 lbs
+        query9 = """
         SELECT 
-            sh.shipment_id,
-            sh.tracking_number,
-            st.service_name,
-            st.delivery_time_desc,
-            sh.weight || ' lbs' as weight,
-            'Zone ' || sh.destination_zone as dest_zone,
-            ROUND(
-                CASE st.column_name
-                    WHEN 'FedEx_First_Overnight' THEN r.FedEx_First_Overnight
-                    WHEN 'FedEx_Priority_Overnight' THEN r.FedEx_Priority_Overnight
-                    WHEN 'FedEx_Standard_Overnight' THEN r.FedEx_Standard_Overnight
-                    WHEN 'FedEx_2Day_AM' THEN r.FedEx_2Day_AM
-                    WHEN 'FedEx_2Day' THEN r.FedEx_2Day
-                    WHEN 'FedEx_Express_Saver' THEN r.FedEx_Express_Saver
-                END, 2
-            ) as cost
-        FROM sample_shipments sh
-        JOIN fedex_service_tiers st ON sh.service_id = st.id
-        LEFT JOIN fedex_rates r ON r.Zone = sh.destination_zone AND r.Weight = sh.weight
-        ORDER BY sh.shipment_id;
+            delivery_day,
+            service_name,
+            delivery_deadline,
+            ROUND(rate, 2) as rate
+        FROM mv_fedex_service_rates
+        WHERE Zone = ? AND Weight = ?
+        ORDER BY delivery_rank, rate;
         """
-        result11 = pd.read_sql_query(query11, conn)
-        print(f"\n11. Sample shipments with costs:\n{result11.to_string(index=False)}")
-    else:
-        print("\n11. Sample shipments table not found. Run create_service_tiers.py first.")
+        result9 = _query(query9, (3, 25))
+        print(f"\n9. Delivery speed vs cost for Zone 3, 25 lbs:\n{result9}")
+        
+        # Example 10: Average rates by delivery tier across all zones
+        query10 = """
+        SELECT 
+            delivery_day,
+            COUNT(DISTINCT Zone) as num_zones,
+            ROUND(AVG(rate), 2) as avg_rate,
+            ROUND(MIN(rate), 2) as min_rate,
+            ROUND(MAX(rate), 2) as max_rate
+        FROM mv_fedex_service_rates
+        WHERE Weight = ?
+        GROUP BY delivery_rank, delivery_day
+        ORDER BY delivery_rank;
+        """
+        result10 = _query(query10, (50,))
+        print(f"\n10. Average rates by delivery tier (50 lbs across all zones):\n{result10}")
+        
+        # Check for sample_shipments table
+        cursor.execute("""
+            SELECT name FROM sqlite_master 
+            WHERE type='table' AND name='sample_shipments';
+        """)
+        shipments_exist = cursor.fetchone() is not None
+        
+        if shipments_exist:
+            # Example 11: Shipments with service details and costs
+            query11 = """
+            SELECT 
+                sh.shipment_id,
+                sh.tracking_number,
+                st.service_name,
+                st.delivery_time_desc,
+                sh.weight || ' lbs' as weight,
+                'Zone ' || sh.destination_zone as dest_zone,
+                ROUND(mv.rate, 2) as cost
+            FROM sample_shipments sh
+            JOIN fedex_service_tiers st ON sh.service_id = st.id
+            LEFT JOIN mv_fedex_service_rates mv
+                ON mv.Zone = sh.destination_zone
+                AND mv.Weight = sh.weight
+                AND mv.service_id = st.id
+            ORDER BY sh.shipment_id;
+            """
+            result11 = _query(query11)
+            print(f"\n11. Sample shipments with costs:\n{result11}")
+        else:
+            print("\n11. Sample shipments table not found. Run create_service_tiers.py first.")
 
 else:
     print("⚠️  fedex_service_tiers table not found!")
@@ -0,0 +1,44 @@
+# =============================================================================
+#  Filename: table_format.py
+#
+#  Short Description: Plain-text table formatting for SQL query results
+#
+#  Creation date: 2025-10-08
+#  Author: Shrinivas Deshpande
+# =============================================================================
+
+"""
+Shared right-aligned text table used by the database scripts to print query results.
+"""
+
+from typing import Iterable, Sequence
+
+
+def format_cell(value: object) -> str:
+    """Format a single result value for display (floats to cents, NULL as blank)."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def format_table(headers: Sequence[str], rows: Iterable[Sequence[object]]) -> str:
+    """
+    Format result rows as a right-aligned text table under a header line.
+
+    Args:
+        headers: Column names
+        rows: Result rows, one value per column
+
+    Returns:
+        Table text, one line per row (no trailing newline)
+    """
+    cells = [[format_cell(value) for value in row] for row in rows]
+    widths = [
+        max([len(header)] + [len(line[i]) for line in cells])
+        for i, header in enumerate(headers)
+    ]
+    lines = [" ".join(h.rjust(w) for h, w in zip(headers, widths))]
+    lines += [" ".join(c.rjust(w) for c, w in zip(line, widths)) for line in cells]
+    return "\n".join(lines)
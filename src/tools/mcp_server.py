@@ -5,9 +5,14 @@ Exposes zone calculation and weight estimation tools via MCP protocol.
 """
 
 import os
-from typing import Dict, Any
+import json
+from typing import Dict, Any, Callable, Optional
 from fastmcp import FastMCP
+from langchain_core.language_models import BaseChatModel
+from langchain_ollama import ChatOllama
+from langchain_openai import ChatOpenAI
 
+from .persistent_cache import PersistentCache
 from .zone_calculator import ZoneCalculator
 from .weight_estimator import WeightEstimator
 
@@ -22,21 +27,41 @@ mcp = FastMCP(
 )
 
 # Initialize tool instances
+_shared_llm = None
 _zone_calc = None
 _weight_est = None
 
+# Persistent result cache shared across server restarts
+_result_cache: Optional[PersistentCache] = None
+
+
+def _get_llm() -> BaseChatModel:
+    """Lazy initialization of the chat model shared by all tools (one connection pool)."""
+    global _shared_llm
+    if _shared_llm is None:
+        llm_provider = os.getenv("LLM_PROVIDER", "openai")
+        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        if llm_provider == "openai":
+            _shared_llm = ChatOpenAI(
+                model=model,
+                temperature=0,
+                api_key=os.getenv("OPENAI_API_KEY")
+            )
+        else:
+            _shared_llm = ChatOllama(
+                model=model,
+                temperature=0
+            )
+    return _shared_llm
+
 
 def _get_zone_calculator() -> ZoneCalculator:
     """Lazy initialization of ZoneCalculator."""
     global _zone_calc
     if _zone_calc is None:
-        llm_provider = os.getenv("LLM_PROVIDER", "openai")
-        api_key = os.getenv("OPENAI_API_KEY")
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         _zone_calc = ZoneCalculator(
-            llm_provider=llm_provider,
-            api_key=api_key,
-            model=model
+            llm_provider=os.getenv("LLM_PROVIDER", "openai"),
+            llm=_get_llm()
         )
     return _zone_calc
 
@@ -45,17 +70,56 @@ def _get_weight_estimator() -> WeightEstimator:
     """Lazy initialization of WeightEstimator."""
     global _weight_est
     if _weight_est is None:
-        llm_provider = os.getenv("LLM_PROVIDER", "openai")
-        api_key = os.getenv("OPENAI_API_KEY")
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         _weight_est = WeightEstimator(
-            llm_provider=llm_provider,
-            api_key=api_key,
-            model=model
+            llm_provider=os.getenv("LLM_PROVIDER", "openai"),
+            llm=_get_llm()
         )
     return _weight_est
 
 
+def _get_cache() -> PersistentCache:
+    """Lazy initialization of the on-disk tool result cache (entries expire after a week)."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = PersistentCache(path=os.getenv("MCP_CACHE_DB", ".mcp_cache.db"))
+    return _result_cache
+
+
+def _cached_call(tool: str, args: list, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Return a tool result from the persistent cache, computing it on a miss.
+
+    Keys are scoped to the LLM provider and model, so switching either never
+    serves answers produced by the other.
+
+    Args:
+        tool: Tool name (cache namespace)
+        args: Tool arguments; normalized (lowercased, stripped) to form the key
+        compute: Produces the result when it isn't cached
+
+    Returns:
+        Tool result dictionary
+    """
+    key = [
+        tool,
+        os.getenv("LLM_PROVIDER", "openai"),
+        os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        *(str(arg).lower().strip() for arg in args)
+    ]
+
+    cached = _get_cache().get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    result = compute()
+
+    # Failed lookups and fallback defaults are retried on the next request
+    # rather than remembered
+    if result.get("success") and result.get("source") != "default":
+        _get_cache().put(key, json.dumps(result))
+    return result
+
+
 @mcp.tool()
 def zone_calculator(origin: str, destination: str) -> Dict[str, Any]:
     """
@@ -79,8 +143,11 @@ def zone_calculator(origin: str, destination: str) -> Dict[str, Any]:
         - trajectory: Step-by-step reasoning log
         - success: Whether calculation succeeded
     """
-    calc = _get_zone_calculator()
-    return calc.calculate_zone(origin, destination)
+    return _cached_call(
+        "zone",
+        [origin, destination],
+        lambda: _get_zone_calculator().calculate_zone(origin, destination)
+    )
 
 
 @mcp.tool()
@@ -109,8 +176,11 @@ def weight_estimator(item_description: str) -> Dict[str, Any]:
         - trajectory: Step-by-step reasoning log
         - success: Whether estimation succeeded
     """
-    est = _get_weight_estimator()
-    return est.estimate_weight(item_description)
+    return _cached_call(
+        "weight",
+        [item_description],
+        lambda: _get_weight_estimator().estimate_weight(item_description)
+    )
 
 
 @mcp.tool()
@@ -0,0 +1,110 @@
+"""
+Persistent Cache for LLM-backed tool lookups.
+
+Keeps deterministic LLM answers in a local SQLite file so a fresh process
+(app restart, CLI invocation) starts warm instead of re-asking the model.
+"""
+
+from typing import Any, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from loguru import logger
+
+
+class PersistentCache:
+    """
+    SQLite-backed key/value cache with a time-to-live.
+
+    Keys and values are stored as JSON; JSON arrays come back as tuples.
+    Expired rows are ignored on read and pruned when the file is opened. If
+    the database can't be opened the cache turns into a no-op.
+    """
+
+    DEFAULT_PATH = os.path.join("~", ".cache", "fedex_zone_cache.sqlite")
+    DEFAULT_TTL = 7 * 24 * 3600
+
+    def __init__(self, path: Optional[str] = None, ttl: int = DEFAULT_TTL):
+        """
+        Initialize Persistent Cache.
+
+        Args:
+            path: SQLite file (default: ZONE_CACHE_DB env var, else ~/.cache/fedex_zone_cache.sqlite)
+            ttl: Seconds an entry stays valid
+        """
+        self.path = os.path.expanduser(path or os.getenv("ZONE_CACHE_DB", self.DEFAULT_PATH))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response TEXT, created_at INTEGER"
+                ")"
+            )
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (int(time.time()) - self.ttl,)
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache unavailable at {self.path}: {e}")
+            self._conn = None
+
+    @staticmethod
+    def _from_json(value: Any) -> Any:
+        """Turn decoded JSON arrays back into (nested) tuples."""
+        if isinstance(value, list):
+            return tuple(PersistentCache._from_json(item) for item in value)
+        return value
+
+    def get(self, key: Any) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: JSON-serializable key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        if self._conn is None:
+            return None
+
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT response FROM llm_cache WHERE key = ? AND created_at >= ?",
+                    (json.dumps(key), int(time.time()) - self.ttl)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent cache read error: {e}")
+                return None
+        return self._from_json(json.loads(row[0])) if row is not None else None
+
+    def put(self, key: Any, value: Any) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: JSON-serializable key
+            value: JSON-serializable value
+        """
+        if self._conn is None:
+            return
+
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, created_at) VALUES (?, ?, ?)",
+                    (json.dumps(key), json.dumps(value), int(time.time()))
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent cache write error: {e}")
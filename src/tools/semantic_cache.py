@@ -0,0 +1,165 @@
+"""
+Semantic Cache for LLM-backed tool lookups.
+
+Reuses a prior LLM answer when a new input is a near-paraphrase of one
+already seen (e.g. "San Fransisco" / "San Francsco"), judged by cosine
+similarity of local MiniLM sentence embeddings.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+
+import numpy as np
+from loguru import logger
+
+
+class SemanticCache:
+    """
+    LRU cache of LLM answers matched exactly or by embedding similarity.
+
+    Entries live in partitions (e.g. one per calling method, or per method and
+    state) so answers are only ever reused between inputs that were asked
+    the same question. The embedding model is loaded on first use; if it
+    can't be loaded the cache degrades to exact matching.
+    """
+
+    MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+    def __init__(self, threshold: float = 0.92, maxsize: int = 10_000):
+        """
+        Initialize Semantic Cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a semantic hit
+            maxsize: Maximum number of entries across all partitions (LRU eviction)
+        """
+        self.threshold = threshold
+        self.maxsize = maxsize
+
+        # (partition, text) -> (unit embedding or None, value), in LRU order
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Optional[np.ndarray], Any]]" = OrderedDict()
+        # partition -> (keys, stacked embeddings), rebuilt lazily after changes
+        self._matrices: Dict[str, Tuple[List[Tuple[str, str]], np.ndarray]] = {}
+        # Embedding of the most recent miss, reused by the put() that follows it
+        self._last_embedding: Optional[Tuple[Tuple[str, str], np.ndarray]] = None
+
+        self._embedder = None
+        self._embedder_failed = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Lowercase and collapse whitespace."""
+        return " ".join(text.lower().split())
+
+    def _embed_many(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Unit-length embeddings (one row per text), or None if no embedding model is available."""
+        if self._embedder is None and not self._embedder_failed:
+            try:
+                from fastembed import TextEmbedding
+                self._embedder = TextEmbedding(model_name=self.MODEL_NAME)
+            except Exception as e:
+                logger.warning(f"Semantic cache embeddings unavailable, using exact matches only: {e}")
+                self._embedder_failed = True
+
+        if self._embedder is None:
+            return None
+
+        vectors = np.asarray(list(self._embedder.embed(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Unit-length embedding of text, or None if no embedding model is available."""
+        vectors = self._embed_many([text])
+        return vectors[0] if vectors is not None else None
+
+    def embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Embed texts with the cache's model (shared so callers don't load it twice).
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Array of unit-length embeddings, one row per text, or None if no
+            embedding model is available
+        """
+        with self._lock:
+            return self._embed_many(texts)
+
+    def _partition_matrix(self, partition: str) -> Optional[Tuple[List[Tuple[str, str]], np.ndarray]]:
+        """Stacked embeddings of one partition (built on demand)."""
+        if partition not in self._matrices:
+            keys = [
+                key for key, (vector, _) in self._entries.items()
+                if key[0] == partition and vector is not None
+            ]
+            if not keys:
+                return None
+            self._matrices[partition] = (keys, np.stack([self._entries[key][0] for key in keys]))
+        return self._matrices[partition]
+
+    def get(self, partition: str, text: str) -> Optional[Any]:
+        """
+        Look up a cached answer.
+
+        Args:
+            partition: Cache partition (question being asked)
+            text: Input text
+
+        Returns:
+            Cached value for an identical or semantically similar input, or None
+        """
+        key = (partition, self._normalize(text))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+            vector = self._embed(key[1])
+            if vector is None:
+                return None
+            self._last_embedding = (key, vector)
+
+            index = self._partition_matrix(partition)
+            if index is None:
+                return None
+
+            keys, matrix = index
+            scores = matrix @ vector
+            best = int(scores.argmax())
+            if scores[best] < self.threshold:
+                return None
+
+            logger.debug(f"Semantic cache hit: '{key[1]}' ~ '{keys[best][1]}' ({scores[best]:.3f})")
+            self._entries.move_to_end(keys[best])
+            return self._entries[keys[best]][1]
+
+    def put(self, partition: str, text: str, value: Any) -> None:
+        """
+        Store an answer.
+
+        Args:
+            partition: Cache partition (question being asked)
+            text: Input text
+            value: Answer to cache
+        """
+        key = (partition, self._normalize(text))
+
+        with self._lock:
+            if self._last_embedding is not None and self._last_embedding[0] == key:
+                vector = self._last_embedding[1]
+            else:
+                vector = self._embed(key[1])
+
+            self._entries[key] = (vector, value)
+            self._entries.move_to_end(key)
+            self._matrices.pop(partition, None)
+
+            while len(self._entries) > self.maxsize:
+                (evicted_partition, _), _ = self._entries.popitem(last=False)
+                self._matrices.pop(evicted_partition, None)
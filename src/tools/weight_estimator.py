@@ -4,13 +4,69 @@ Weight Estimator Tool for FedEx Shipping Assistant.
 Uses LLM to estimate weights of common items when users don't know exact weights.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Literal, Optional, Tuple
+from bisect import bisect_right
+from itertools import accumulate
 import os
+import re
 import json
+from cachetools import LRUCache
 from loguru import logger
 from langchain_openai import ChatOpenAI
 from langchain_ollama import ChatOllama
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import HumanMessage
+from pydantic import BaseModel, Field, field_validator
+
+_RE_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+_LB_TO_KG = 0.453592
+
+# LLM confidence level -> reported percentage
+_CONFIDENCE_PERCENT = {"high": 85, "medium": 65, "low": 40}
+
+
+class WeightEstimate(BaseModel):
+    """Structured LLM answer for one item."""
+
+    weight_lbs: float = Field(description="Estimated shipping weight in pounds, including packaging")
+    confidence: Literal["high", "medium", "low"]
+    reasoning: str = Field(description="Brief explanation of the estimate")
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def _normalize_confidence(cls, value: Any) -> str:
+        """Accept case/whitespace variants ("High ") and treat unknown levels as low."""
+        level = str(value).strip().lower()
+        return level if level in _CONFIDENCE_PERCENT else "low"
+
+
+class ItemWeightEstimate(WeightEstimate):
+    """Structured LLM answer for one item of a batch."""
+
+    item: str = Field(description="The item description exactly as given")
+
+
+class BatchWeightEstimate(BaseModel):
+    """Structured LLM answer for a batch of items."""
+
+    estimates: List[ItemWeightEstimate]
+
+
+def _normalize(text: str) -> str:
+    """
+    Canonical form of an item description for lookups.
+
+    Lowercases, spells out the inch mark, replaces punctuation with spaces
+    and collapses whitespace, so '65" TV' and '65 inch tv' compare equal.
+
+    Args:
+        text: Raw item description
+
+    Returns:
+        Normalized description (tokens joined by single spaces)
+    """
+    return " ".join(_RE_NON_ALNUM.sub(" ", text.lower().replace('"', " inch ")).split())
 
 
 class WeightEstimator:
@@ -35,7 +91,9 @@ class WeightEstimator:
         'water bottle': 1.0,
         'whiskey bottle': 3.0,
 
-        # Electronics
+        # Electronics (sized TVs go through TV_WEIGHTS; these are the size-less default)
+        'tv': 15.0,
+        'television': 15.0,
         'laptop': 5.0,
         'macbook': 4.5,
         'ipad': 1.5,
@@ -44,22 +102,6 @@ class WeightEstimator:
         'xbox': 9.0,
         'nintendo switch': 2.0,
 
-        # TVs by size
-        '32 inch tv': 15.0,
-        '32" tv': 15.0,
-        '40 inch tv': 20.0,
-        '40" tv': 20.0,
-        '50 inch tv': 35.0,
-        '50" tv': 35.0,
-        '55 inch tv': 40.0,
-        '55" tv': 40.0,
-        '65 inch tv': 55.0,
-        '65" tv': 55.0,
-        '75 inch tv': 70.0,
-        '75" tv': 70.0,
-        '85 inch tv': 90.0,
-        '85" tv': 90.0,
-
         # Food
         'chocolate box': 2.0,
         'chocolates': 2.0,
@@ -115,7 +157,36 @@ class WeightEstimator:
         'toaster': 5.0,
     }
 
-    def __init__(self, llm_provider: str = "openai", api_key: Optional[str] = None, model: str = "gpt-4o-mini"):
+    # TV weight (lbs) by screen size (inches); other sizes are interpolated
+    TV_WEIGHTS = ((32, 15.0), (40, 20.0), (50, 35.0), (55, 40.0), (65, 55.0), (75, 70.0), (85, 90.0))
+
+    # "65 inch tv" after _normalize() ('65" TV', '65-inch TV' and '65 inches tv' all land here)
+    _TV_PATTERN = re.compile(r"\b(\d{2,3}) ?inch(?:es)? tv\b")
+
+    # Lookup indexes built once from COMMON_WEIGHTS:
+    # - _NORMALIZED_WEIGHTS maps canonical keys to weights (alias spellings collapse),
+    #   _NORMALIZED_WEIGHTS_KG holds the same weights already converted to kg
+    # - _KEY_PATTERN finds every key occurring in a description in one regex pass
+    #   (lookahead so overlapping keys are all reported, longest first per position)
+    # - _KEY_BLOB/_KEY_OFFSETS answer "description is part of a key" with one find()
+    _NORMALIZED_WEIGHTS = {_normalize(key): weight for key, weight in COMMON_WEIGHTS.items()}
+    _NORMALIZED_WEIGHTS_KG = {
+        key: round(weight * _LB_TO_KG, 2) for key, weight in _NORMALIZED_WEIGHTS.items()
+    }
+    _KEYS = tuple(_NORMALIZED_WEIGHTS)
+    _KEY_PATTERN = re.compile(
+        "(?=(" + "|".join(map(re.escape, sorted(_KEYS, key=len, reverse=True))) + "))"
+    )
+    _KEY_BLOB = "\n".join(_KEYS)
+    _KEY_OFFSETS = tuple(accumulate((len(key) + 1 for key in _KEYS), initial=0))
+
+    def __init__(
+        self,
+        llm_provider: str = "openai",
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        llm: Optional[BaseChatModel] = None
+    ):
         """
         Initialize Weight Estimator.
 
@@ -123,10 +194,14 @@ class WeightEstimator:
             llm_provider: "openai" or "ollama"
             api_key: OpenAI API key (required if llm_provider="openai")
             model: Model name for LLM
+            llm: Pre-built chat model to use instead of creating one
+                (lets several tools share one client and connection pool)
         """
         self.llm_provider = llm_provider
 
-        if llm_provider == "openai":
+        if llm is not None:
+            self.llm = llm
+        elif llm_provider == "openai":
             self.llm = ChatOpenAI(
                 model=model,
                 temperature=0,
@@ -138,6 +213,14 @@ class WeightEstimator:
                 temperature=0
             )
 
+        # Schema-constrained views of the model; responses arrive already parsed
+        self._estimate_llm = self.llm.with_structured_output(WeightEstimate)
+        self._batch_estimate_llm = self.llm.with_structured_output(BatchWeightEstimate)
+
+        # LLM answers keyed by normalized description; whole results keyed by exact input
+        self._llm_cache = LRUCache(maxsize=1024)
+        self._estimate_cache = LRUCache(maxsize=128)
+
         logger.info(f"WeightEstimator initialized with {llm_provider}")
 
     def estimate_weight(self, item_description: str) -> Dict[str, Any]:
@@ -150,10 +233,23 @@ class WeightEstimator:
         Returns:
             Dictionary with estimated weight, confidence, and reasoning
         """
+        cached = self._estimate_cache.get(item_description)
+        if cached is not None:
+            # Fresh containers so callers can't mutate the cached result
+            return dict(cached, trajectory=[dict(step) for step in cached["trajectory"]])
+
+        result = self._estimate_weight(item_description)
+        # The default used when the LLM call fails isn't cached, so it's retried
+        if result["source"] != "default":
+            self._estimate_cache[item_description] = result
+        return dict(result, trajectory=[dict(step) for step in result["trajectory"]])
+
+    def _estimate_weight(self, item_description: str) -> Dict[str, Any]:
+        """Uncached body of estimate_weight."""
         logger.info(f"Estimating weight for: {item_description}")
 
         trajectory = []
-        item_lower = item_description.lower().strip()
+        item_norm = _normalize(item_description)
 
         # Step 1: Check common weights database
         trajectory.append({
@@ -162,21 +258,22 @@ class WeightEstimator:
             "input": item_description
         })
 
-        for key, weight in self.COMMON_WEIGHTS.items():
-            if key in item_lower or item_lower in key:
-                trajectory[-1]["output"] = f"Found: {weight} lbs"
-                trajectory[-1]["reasoning"] = f"Matched '{item_description}' to '{key}' in database"
-
-                return {
-                    "weight_lbs": weight,
-                    "weight_kg": round(weight * 0.453592, 2),
-                    "confidence": "high",
-                    "confidence_percent": 90,
-                    "reasoning": f"'{item_description}' is typically around {weight} lbs based on common item database.",
-                    "source": "database",
-                    "trajectory": trajectory,
-                    "success": True
-                }
+        match = self._lookup_common_weight(item_norm)
+        if match is not None:
+            key, weight = match
+            trajectory[-1]["output"] = f"Found: {weight} lbs"
+            trajectory[-1]["reasoning"] = f"Matched '{item_description}' to '{key}' in database"
+
+            return {
+                "weight_lbs": weight,
+                "weight_kg": self._NORMALIZED_WEIGHTS_KG.get(key) or round(weight * _LB_TO_KG, 2),
+                "confidence": "high",
+                "confidence_percent": 90,
+                "reasoning": f"'{item_description}' is typically around {weight} lbs based on common item database.",
+                "source": "database",
+                "trajectory": trajectory,
+                "success": True
+            }
 
         trajectory[-1]["output"] = "Not found in database"
         trajectory[-1]["reasoning"] = "Item not in quick lookup database, using LLM estimation"
@@ -188,22 +285,78 @@ class WeightEstimator:
             "input": item_description
         })
 
-        weight, confidence, reasoning = self._estimate_with_llm(item_description)
+        weight, confidence, reasoning, estimated = self._estimate_with_llm(item_description)
 
         trajectory[-1]["output"] = f"{weight} lbs ({confidence} confidence)"
         trajectory[-1]["reasoning"] = reasoning
 
         return {
             "weight_lbs": weight,
-            "weight_kg": round(weight * 0.453592, 2),
+            "weight_kg": round(weight * _LB_TO_KG, 2),
             "confidence": confidence,
             "confidence_percent": self._confidence_to_percent(confidence),
             "reasoning": reasoning,
-            "source": "llm_estimation",
+            "source": "llm_estimation" if estimated else "default",
             "trajectory": trajectory,
             "success": True
         }
 
+    @classmethod
+    def _tv_weight(cls, size: int) -> float:
+        """
+        Weight of a TV by screen size, linearly interpolated from TV_WEIGHTS.
+
+        Args:
+            size: Screen size in inches
+
+        Returns:
+            Estimated weight in lbs (extrapolated from the nearest segment
+            outside the table's range)
+        """
+        sizes = [s for s, _ in cls.TV_WEIGHTS]
+        i = min(max(bisect_right(sizes, size), 1), len(sizes) - 1)
+        (s0, w0), (s1, w1) = cls.TV_WEIGHTS[i - 1], cls.TV_WEIGHTS[i]
+        return round(max(w0 + (w1 - w0) * (size - s0) / (s1 - s0), 1.0), 1)
+
+    def _lookup_common_weight(self, item_norm: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the database entry matching a normalized description.
+
+        Args:
+            item_norm: Item description in _normalize() form
+
+        Returns:
+            Tuple of (matched_key, weight_lbs), or None if nothing matches
+        """
+        # Exact hit is a single dict probe
+        weight = self._NORMALIZED_WEIGHTS.get(item_norm)
+        if weight is not None:
+            return item_norm, weight
+
+        # TVs are parametric in screen size
+        tv = self._TV_PATTERN.search(item_norm)
+        if tv is not None:
+            size = int(tv.group(1))
+            return f"{size} inch tv", self._tv_weight(size)
+
+        # Longest key contained in the description
+        key = max(
+            (m.group(1) for m in self._KEY_PATTERN.finditer(item_norm)),
+            key=len,
+            default=None
+        )
+        if key is not None:
+            return key, self._NORMALIZED_WEIGHTS[key]
+
+        # Description contained in a key (e.g. "wine" -> "wine bottle")
+        if item_norm:
+            pos = self._KEY_BLOB.find(item_norm)
+            if pos != -1:
+                key = self._KEYS[bisect_right(self._KEY_OFFSETS, pos) - 1]
+                return key, self._NORMALIZED_WEIGHTS[key]
+
+        return None
+
     def _estimate_with_llm(self, item_description: str) -> tuple:
         """
         Use LLM to estimate weight of an unknown item.
@@ -212,8 +365,15 @@ class WeightEstimator:
             item_description: Item description
 
         Returns:
-            Tuple of (weight_lbs, confidence, reasoning)
+            Tuple of (weight_lbs, confidence, reasoning, estimated), where
+            estimated is False for the default used when the LLM call fails
         """
+        # Case/punctuation variants of the same item share one LLM answer
+        key = _normalize(item_description)
+        cached = self._llm_cache.get(key)
+        if cached is not None:
+            return cached + (True,)
+
         prompt = f"""You are a shipping expert. Estimate the weight of this item in pounds (lbs).
 
 Item: "{item_description}"
@@ -223,53 +383,61 @@ Consider:
 2. Packaging weight (add 10-20% for standard shipping box)
 3. Common variations in size/model
 
-Respond in this exact JSON format:
-{{
-    "weight_lbs": <number>,
-    "confidence": "<high/medium/low>",
-    "reasoning": "<brief explanation>"
-}}
-
 Examples:
 - "laptop" -> {{"weight_lbs": 5.0, "confidence": "high", "reasoning": "Standard laptop weighs 4-6 lbs with packaging"}}
 - "vintage vase" -> {{"weight_lbs": 8.0, "confidence": "medium", "reasoning": "Ceramic vases vary widely, estimating medium size with protective packaging"}}
-- "handmade craft item" -> {{"weight_lbs": 3.0, "confidence": "low", "reasoning": "Handmade items vary significantly, using generic small package estimate"}}
-
-Return ONLY the JSON, no additional text."""
+- "handmade craft item" -> {{"weight_lbs": 3.0, "confidence": "low", "reasoning": "Handmade items vary significantly, using generic small package estimate"}}"""
 
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            content = response.content.strip()
+            result = self._estimate_llm.invoke([HumanMessage(content=prompt)])
+            weight, confidence, reasoning = result.weight_lbs, result.confidence, result.reasoning
+
+            # Only successful estimates are cached so failures are retried
+            self._llm_cache[key] = (weight, confidence, reasoning)
+            return weight, confidence, reasoning, True
 
-            # Parse JSON response
-            # Handle potential markdown code blocks
-            if content.startswith('```'):
-                content = content.split('```')[1]
-                if content.startswith('json'):
-                    content = content[4:]
-                content = content.strip()
+        except Exception as e:
+            logger.warning(f"LLM weight estimation error: {e}")
+            # Return default estimate
+            return 5.0, "low", f"Unable to estimate precisely for '{item_description}', using default 5 lbs", False
 
-            result = json.loads(content)
+    def _estimate_batch_with_llm(self, item_descriptions: List[str]) -> None:
+        """
+        Estimate several unknown items with a single LLM call.
 
-            weight = float(result.get("weight_lbs", 5.0))
-            confidence = result.get("confidence", "medium").lower()
-            reasoning = result.get("reasoning", "Estimated based on item description")
+        Parsed estimates are stored in the LLM cache; items the response
+        doesn't cover (or a failed call) fall back to per-item estimation.
 
-            return weight, confidence, reasoning
+        Args:
+            item_descriptions: Unique item descriptions not in the database
+        """
+        prompt = f"""You are a shipping expert. Estimate the weight of each item in pounds (lbs).
+
+Items: {json.dumps(item_descriptions)}
+
+Consider:
+1. Standard product weights for this category
+2. Packaging weight (add 10-20% for standard shipping box)
+3. Common variations in size/model
+
+Return one estimate per item, with each item exactly as given."""
+
+        try:
+            results = self._batch_estimate_llm.invoke([HumanMessage(content=prompt)]).estimates
+
+            for result in results:
+                self._llm_cache[_normalize(result.item)] = (
+                    result.weight_lbs, result.confidence, result.reasoning
+                )
+
+            logger.info(f"Batch LLM estimation covered {len(results)}/{len(item_descriptions)} items")
 
         except Exception as e:
-            logger.warning(f"LLM weight estimation error: {e}")
-            # Return default estimate
-            return 5.0, "low", f"Unable to estimate precisely for '{item_description}', using default 5 lbs"
+            logger.warning(f"Batch LLM weight estimation error, falling back per item: {e}")
 
     def _confidence_to_percent(self, confidence: str) -> int:
-        """Convert confidence level to percentage."""
-        confidence_map = {
-            "high": 85,
-            "medium": 65,
-            "low": 40
-        }
-        return confidence_map.get(confidence.lower(), 50)
+        """Convert an (already lowercased) confidence level to percentage."""
+        return _CONFIDENCE_PERCENT.get(confidence, 50)
 
     def estimate_multiple_items(self, items: list) -> Dict[str, Any]:
         """
@@ -282,21 +450,40 @@ Return ONLY the JSON, no additional text."""
             Dictionary with total weight and individual item estimates
         """
         total_weight = 0.0
+        total_weight_kg = 0.0
         item_estimates = []
         trajectory = []
 
+        # Handle both string and dict formats; repeated descriptions are merged
+        # (quantities summed, first-seen order kept) so each is estimated once
+        quantities: Dict[str, int] = {}
         for item in items:
-            # Handle both string and dict formats
             if isinstance(item, str):
-                description = item
-                quantity = 1
+                description, quantity = item, 1
             else:
                 description = item.get("description", item.get("item", ""))
                 quantity = item.get("quantity", 1)
-
+            quantities[description] = quantities.get(description, 0) + quantity
+
+        # Items that would each need an LLM call are estimated together in one request
+        misses = {}
+        for description in quantities:
+            key = _normalize(description)
+            if (
+                key not in misses
+                and description not in self._estimate_cache
+                and key not in self._llm_cache
+                and self._lookup_common_weight(key) is None
+            ):
+                misses[key] = description
+        if len(misses) > 1:
+            self._estimate_batch_with_llm(list(misses.values()))
+
+        for description, quantity in quantities.items():
             estimate = self.estimate_weight(description)
             item_weight = estimate["weight_lbs"] * quantity
             total_weight += item_weight
+            total_weight_kg += estimate["weight_kg"] * quantity
 
             item_estimates.append({
                 "item": description,
@@ -310,7 +497,7 @@ Return ONLY the JSON, no additional text."""
 
         return {
             "total_weight_lbs": round(total_weight, 2),
-            "total_weight_kg": round(total_weight * 0.453592, 2),
+            "total_weight_kg": round(total_weight_kg, 2),
             "items": item_estimates,
             "reasoning": f"Total estimated weight for {len(items)} item(s): {round(total_weight, 2)} lbs",
             "trajectory": trajectory,
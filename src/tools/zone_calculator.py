@@ -7,12 +7,368 @@ Handles:
 - City nicknames (Big Apple, Windy City, etc.)
 """
 
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Callable
+from bisect import bisect_right
+from itertools import accumulate
+from types import MappingProxyType
+import asyncio
+import functools
+import hashlib
 import os
+import re
+import sys
+import threading
+import numpy as np
+from cachetools import LRUCache
 from loguru import logger
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Levenshtein
 from langchain_openai import ChatOpenAI
 from langchain_ollama import ChatOllama
-from langchain_core.messages import HumanMessage
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field
+
+from .persistent_cache import PersistentCache
+from .semantic_cache import SemanticCache
+
+
+class ResolvedLocation(BaseModel):
+    """Structured LLM answer for one location."""
+
+    city: str = Field(description="Correctly spelled US city name")
+    state: str = Field(description="2-letter US state abbreviation")
+
+
+class ResolvedLocationPair(BaseModel):
+    """Structured LLM answer for an origin/destination pair."""
+
+    origin: ResolvedLocation
+    destination: ResolvedLocation
+
+
+# Static instructions go in a fixed system message ahead of the per-call
+# input, so the identical prefix can be served from provider prompt caches
+_CITY_CORRECT_SYSTEM_PROMPT = """Correct US city names that have typos.
+
+Examples:
+- "San Fransisco" -> "San Francisco"
+- "Los Angels" -> "Los Angeles"
+- "Denvar" -> "Denver"
+- "Chicgo" -> "Chicago"
+- "Bostun" -> "Boston"
+
+Return ONLY the correctly spelled city name. If the city seems correct, return it as-is."""
+
+_INFER_LOCATION_SYSTEM_PROMPT = """Identify US locations and return the city name and state abbreviation.
+
+Consider:
+- Major US cities (Denver, Boston, Miami, etc.)
+- Common misspellings
+- Regional references
+
+Return in this exact format: City, ST
+For example: Denver, CO or Boston, MA
+
+If you cannot determine the location, return: Unknown, CA"""
+
+# Chat clients shared by every ZoneCalculator in the process, keyed by
+# (provider, model, api key fingerprint)
+_LLM_CLIENT_CACHE: Dict[Tuple[str, str, str], BaseChatModel] = {}
+_LLM_CLIENT_LOCK = threading.Lock()
+
+
+def _get_llm_client(llm_provider: str, model: str, api_key: Optional[str]) -> BaseChatModel:
+    """
+    Return the shared chat client for a provider/model/key, creating it once.
+
+    Args:
+        llm_provider: "openai" or "ollama"
+        model: Model name for LLM
+        api_key: OpenAI API key (ignored for ollama)
+
+    Returns:
+        Temperature-0 chat model
+    """
+    api_key = (api_key or os.getenv("OPENAI_API_KEY")) if llm_provider == "openai" else None
+    key = (llm_provider, model, hashlib.sha1(str(api_key).encode()).hexdigest()[:8])
+
+    with _LLM_CLIENT_LOCK:
+        client = _LLM_CLIENT_CACHE.get(key)
+        if client is None:
+            if llm_provider == "openai":
+                client = ChatOpenAI(
+                    model=model,
+                    temperature=0,
+                    api_key=api_key
+                )
+            else:
+                client = ChatOllama(
+                    model=model,
+                    temperature=0
+                )
+            _LLM_CLIENT_CACHE[key] = client
+        return client
+
+
+_RE_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Leading-word spellings that ZONE_DATABASE stores abbreviated or expanded
+_CITY_PREFIX_ALIASES = {"saint": "st", "ft": "fort"}
+
+
+def _normalize_city(city: str) -> str:
+    """
+    Canonical city spelling for ZONE_DATABASE comparisons.
+
+    Lowercases, turns punctuation into spaces, collapses whitespace and maps
+    leading 'Saint'/'Ft' to the database's 'st'/'fort' forms.
+
+    Args:
+        city: Raw city name
+
+    Returns:
+        Normalized city name
+    """
+    words = _RE_NON_ALNUM.sub(" ", city.lower()).split()
+    if words:
+        words[0] = _CITY_PREFIX_ALIASES.get(words[0], words[0])
+    return " ".join(words)
+
+
+def _canon(text: str) -> Tuple[str, str, str]:
+    """
+    Canonical forms of an input string, computed once per call site.
+
+    Args:
+        text: Raw input
+
+    Returns:
+        Tuple of (stripped, stripped lowercase (interned), stripped uppercase)
+    """
+    stripped = text.strip()
+    return stripped, sys.intern(stripped.lower()), stripped.upper()
+
+
+def _max_typo_distance(name: str) -> int:
+    """Edit distance tolerated when correcting a city name (stricter for short names)."""
+    return 1 if len(name) <= 5 else 2
+
+
+def _memo_key(method_name: str, *args: str) -> Tuple[str, ...]:
+    """Memo key for a method call: name plus lowercased, whitespace-collapsed arguments."""
+    return (method_name,) + tuple(" ".join(arg.lower().split()) for arg in args)
+
+
+def _memoized(method: Callable) -> Callable:
+    """
+    Memoize a string-argument ZoneCalculator method on its normalized arguments.
+
+    Arguments are lowercased and whitespace-collapsed to form the key. Results
+    are only stored when the LLM is deterministic (temperature 0) and no LLM
+    call failed while computing them, so fallback answers are retried.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args: str):
+        if not self._memo_enabled:
+            return method(self, *args)
+
+        key = _memo_key(method.__name__, *args)
+        cached = self._memo_get(key)
+        if cached is not None:
+            with self._lock:
+                self.cache_stats["hits"] += 1
+            return cached
+
+        with self._lock:
+            self.cache_stats["misses"] += 1
+        errors = self._llm_errors
+        result = method(self, *args)
+        if self._llm_errors == errors:
+            self._memo_put(key, result)
+        return result
+
+    return wrapper
+
+
+# Airport code to city mapping
+AIRPORT_CODES = MappingProxyType({
+    'SFO': ('San Francisco', 'CA'),
+    'LAX': ('Los Angeles', 'CA'),
+    'SAN': ('San Diego', 'CA'),
+    'OAK': ('Oakland', 'CA'),
+    'SJC': ('San Jose', 'CA'),
+    'JFK': ('New York', 'NY'),
+    'LGA': ('New York', 'NY'),
+    'EWR': ('Newark', 'NJ'),
+    'NYC': ('New York', 'NY'),
+    'ORD': ('Chicago', 'IL'),
+    'MDW': ('Chicago', 'IL'),
+    'DFW': ('Dallas', 'TX'),
+    'IAH': ('Houston', 'TX'),
+    'HOU': ('Houston', 'TX'),
+    'DEN': ('Denver', 'CO'),
+    'PHX': ('Phoenix', 'AZ'),
+    'SEA': ('Seattle', 'WA'),
+    'ATL': ('Atlanta', 'GA'),
+    'BOS': ('Boston', 'MA'),
+    'MIA': ('Miami', 'FL'),
+    'FLL': ('Fort Lauderdale', 'FL'),
+    'TPA': ('Tampa', 'FL'),
+    'MCO': ('Orlando', 'FL'),
+    'MSP': ('Minneapolis', 'MN'),
+    'DTW': ('Detroit', 'MI'),
+    'PHL': ('Philadelphia', 'PA'),
+    'CLT': ('Charlotte', 'NC'),
+    'DCA': ('Washington', 'DC'),
+    'IAD': ('Washington', 'DC'),
+    'BWI': ('Baltimore', 'MD'),
+    'SLC': ('Salt Lake City', 'UT'),
+    'PDX': ('Portland', 'OR'),
+    'LAS': ('Las Vegas', 'NV'),
+    'AUS': ('Austin', 'TX'),
+    'SAT': ('San Antonio', 'TX'),
+    'MSY': ('New Orleans', 'LA'),
+    'BNA': ('Nashville', 'TN'),
+    'RDU': ('Raleigh', 'NC'),
+    'STL': ('St Louis', 'MO'),
+    'MKE': ('Milwaukee', 'WI'),
+    'CLE': ('Cleveland', 'OH'),
+    'CMH': ('Columbus', 'OH'),
+    'IND': ('Indianapolis', 'IN'),
+    'PIT': ('Pittsburgh', 'PA'),
+    'CVG': ('Cincinnati', 'OH'),
+    'OKC': ('Oklahoma City', 'OK'),
+    'ABQ': ('Albuquerque', 'NM'),
+})
+
+
+# City nicknames to actual city mapping
+CITY_NICKNAMES = MappingProxyType({
+    'big apple': ('New York', 'NY'),
+    'the big apple': ('New York', 'NY'),
+    'nyc': ('New York', 'NY'),
+    'la': ('Los Angeles', 'CA'),
+    'windy city': ('Chicago', 'IL'),
+    'the windy city': ('Chicago', 'IL'),
+    'chi-town': ('Chicago', 'IL'),
+    'bay area': ('San Francisco', 'CA'),
+    'sf': ('San Francisco', 'CA'),
+    'frisco': ('San Francisco', 'CA'),
+    'silicon valley': ('San Jose', 'CA'),
+    'motor city': ('Detroit', 'MI'),
+    'motown': ('Detroit', 'MI'),
+    'mile high city': ('Denver', 'CO'),
+    'sin city': ('Las Vegas', 'NV'),
+    'vegas': ('Las Vegas', 'NV'),
+    'philly': ('Philadelphia', 'PA'),
+    'hotlanta': ('Atlanta', 'GA'),
+    'atl': ('Atlanta', 'GA'),
+    'bean town': ('Boston', 'MA'),
+    'beantown': ('Boston', 'MA'),
+    'big d': ('Dallas', 'TX'),
+    'space city': ('Houston', 'TX'),
+    'h-town': ('Houston', 'TX'),
+    'emerald city': ('Seattle', 'WA'),
+    'queen city': ('Charlotte', 'NC'),
+    'twin cities': ('Minneapolis', 'MN'),
+    'valley of the sun': ('Phoenix', 'AZ'),
+    'magic city': ('Miami', 'FL'),
+    'music city': ('Nashville', 'TN'),
+    'big easy': ('New Orleans', 'LA'),
+    'the big easy': ('New Orleans', 'LA'),
+    'nola': ('New Orleans', 'LA'),
+    'rose city': ('Portland', 'OR'),
+    'city of angels': ('Los Angeles', 'CA'),
+    'city by the bay': ('San Francisco', 'CA'),
+    'charm city': ('Baltimore', 'MD'),
+    'steel city': ('Pittsburgh', 'PA'),
+    'alamo city': ('San Antonio', 'TX'),
+    'circle city': ('Indianapolis', 'IN'),
+    'gateway city': ('St Louis', 'MO'),
+    'brew city': ('Milwaukee', 'WI'),
+    'cream city': ('Milwaukee', 'WI'),
+})
+
+
+# Zone database (origin: San Francisco Bay Area)
+ZONE_DATABASE = MappingProxyType({
+    # Zone 2 - California and nearby
+    'san francisco, ca': 2, 'oakland, ca': 2, 'san jose, ca': 2,
+    'fremont, ca': 2, 'sacramento, ca': 2, 'fresno, ca': 2,
+    'los angeles, ca': 2, 'san diego, ca': 2, 'santa barbara, ca': 2,
+    'bakersfield, ca': 2, 'stockton, ca': 2, 'modesto, ca': 2,
+    'irvine, ca': 2, 'long beach, ca': 2, 'anaheim, ca': 2,
+
+    # Zone 3 - Pacific Northwest, Southwest
+    'phoenix, az': 3, 'tucson, az': 3, 'mesa, az': 3,
+    'las vegas, nv': 3, 'reno, nv': 3, 'henderson, nv': 3,
+    'portland, or': 3, 'eugene, or': 3, 'salem, or': 3,
+    'seattle, wa': 3, 'spokane, wa': 3, 'tacoma, wa': 3,
+    'salt lake city, ut': 3, 'provo, ut': 3, 'ogden, ut': 3,
+    'denver, co': 3, 'colorado springs, co': 3, 'aurora, co': 3,
+    'boulder, co': 3, 'fort collins, co': 3,
+    'boise, id': 3, 'albuquerque, nm': 3, 'santa fe, nm': 3,
+
+    # Zone 4 - South Central
+    'dallas, tx': 4, 'houston, tx': 4, 'austin, tx': 4,
+    'san antonio, tx': 4, 'fort worth, tx': 4, 'el paso, tx': 4,
+    'oklahoma city, ok': 4, 'tulsa, ok': 4, 'norman, ok': 4,
+    'kansas city, mo': 4, 'st louis, mo': 4, 'springfield, mo': 4,
+    'omaha, ne': 4, 'lincoln, ne': 4, 'wichita, ks': 4,
+    'little rock, ar': 4, 'des moines, ia': 4, 'sioux falls, sd': 4,
+
+    # Zone 5 - Midwest
+    'chicago, il': 5, 'springfield, il': 5, 'peoria, il': 5,
+    'detroit, mi': 5, 'grand rapids, mi': 5, 'ann arbor, mi': 5,
+    'milwaukee, wi': 5, 'madison, wi': 5, 'green bay, wi': 5,
+    'indianapolis, in': 5, 'fort wayne, in': 5, 'evansville, in': 5,
+    'columbus, oh': 5, 'cleveland, oh': 5, 'cincinnati, oh': 5,
+    'minneapolis, mn': 5, 'st paul, mn': 5, 'duluth, mn': 5,
+
+    # Zone 6 - Southeast
+    'atlanta, ga': 6, 'savannah, ga': 6, 'augusta, ga': 6,
+    'nashville, tn': 6, 'memphis, tn': 6, 'knoxville, tn': 6,
+    'charlotte, nc': 6, 'raleigh, nc': 6, 'durham, nc': 6,
+    'miami, fl': 6, 'tampa, fl': 6, 'orlando, fl': 6,
+    'jacksonville, fl': 6, 'tallahassee, fl': 6, 'pensacola, fl': 6,
+    'fort lauderdale, fl': 6, 'west palm beach, fl': 6,
+    'new orleans, la': 6, 'baton rouge, la': 6, 'shreveport, la': 6,
+    'birmingham, al': 6, 'montgomery, al': 6, 'mobile, al': 6,
+    'jackson, ms': 6, 'charleston, sc': 6, 'columbia, sc': 6,
+
+    # Zone 7 - Mid-Atlantic
+    'boston, ma': 7, 'worcester, ma': 7, 'cambridge, ma': 7,
+    'philadelphia, pa': 7, 'pittsburgh, pa': 7, 'harrisburg, pa': 7,
+    'baltimore, md': 7, 'annapolis, md': 7, 'frederick, md': 7,
+    'washington, dc': 7, 'richmond, va': 7, 'norfolk, va': 7,
+    'buffalo, ny': 7, 'rochester, ny': 7, 'syracuse, ny': 7,
+    'albany, ny': 7, 'hartford, ct': 7, 'new haven, ct': 7,
+    'providence, ri': 7, 'portland, me': 7, 'manchester, nh': 7,
+
+    # Zone 8 - New York City Metro
+    'new york, ny': 8, 'manhattan, ny': 8, 'brooklyn, ny': 8,
+    'queens, ny': 8, 'bronx, ny': 8, 'staten island, ny': 8,
+    'newark, nj': 8, 'jersey city, nj': 8, 'paterson, nj': 8,
+})
+
+
+# State abbreviations
+STATE_ABBREVIATIONS = MappingProxyType({
+    'alabama': 'AL', 'alaska': 'AK', 'arizona': 'AZ', 'arkansas': 'AR',
+    'california': 'CA', 'colorado': 'CO', 'connecticut': 'CT', 'delaware': 'DE',
+    'florida': 'FL', 'georgia': 'GA', 'hawaii': 'HI', 'idaho': 'ID',
+    'illinois': 'IL', 'indiana': 'IN', 'iowa': 'IA', 'kansas': 'KS',
+    'kentucky': 'KY', 'louisiana': 'LA', 'maine': 'ME', 'maryland': 'MD',
+    'massachusetts': 'MA', 'michigan': 'MI', 'minnesota': 'MN', 'mississippi': 'MS',
+    'missouri': 'MO', 'montana': 'MT', 'nebraska': 'NE', 'nevada': 'NV',
+    'new hampshire': 'NH', 'new jersey': 'NJ', 'new mexico': 'NM', 'new york': 'NY',
+    'north carolina': 'NC', 'north dakota': 'ND', 'ohio': 'OH', 'oklahoma': 'OK',
+    'oregon': 'OR', 'pennsylvania': 'PA', 'rhode island': 'RI', 'south carolina': 'SC',
+    'south dakota': 'SD', 'tennessee': 'TN', 'texas': 'TX', 'utah': 'UT',
+    'vermont': 'VT', 'virginia': 'VA', 'washington': 'WA', 'west virginia': 'WV',
+    'wisconsin': 'WI', 'wyoming': 'WY', 'district of columbia': 'DC'
+})
 
 
 class ZoneCalculator:
@@ -26,183 +382,106 @@ class ZoneCalculator:
     - Zone calculation based on origin/destination
     """
 
-    # Airport code to city mapping
-    AIRPORT_CODES = {
-        'SFO': ('San Francisco', 'CA'),
-        'LAX': ('Los Angeles', 'CA'),
-        'SAN': ('San Diego', 'CA'),
-        'OAK': ('Oakland', 'CA'),
-        'SJC': ('San Jose', 'CA'),
-        'JFK': ('New York', 'NY'),
-        'LGA': ('New York', 'NY'),
-        'EWR': ('Newark', 'NJ'),
-        'NYC': ('New York', 'NY'),
-        'ORD': ('Chicago', 'IL'),
-        'MDW': ('Chicago', 'IL'),
-        'DFW': ('Dallas', 'TX'),
-        'IAH': ('Houston', 'TX'),
-        'HOU': ('Houston', 'TX'),
-        'DEN': ('Denver', 'CO'),
-        'PHX': ('Phoenix', 'AZ'),
-        'SEA': ('Seattle', 'WA'),
-        'ATL': ('Atlanta', 'GA'),
-        'BOS': ('Boston', 'MA'),
-        'MIA': ('Miami', 'FL'),
-        'FLL': ('Fort Lauderdale', 'FL'),
-        'TPA': ('Tampa', 'FL'),
-        'MCO': ('Orlando', 'FL'),
-        'MSP': ('Minneapolis', 'MN'),
-        'DTW': ('Detroit', 'MI'),
-        'PHL': ('Philadelphia', 'PA'),
-        'CLT': ('Charlotte', 'NC'),
-        'DCA': ('Washington', 'DC'),
-        'IAD': ('Washington', 'DC'),
-        'BWI': ('Baltimore', 'MD'),
-        'SLC': ('Salt Lake City', 'UT'),
-        'PDX': ('Portland', 'OR'),
-        'LAS': ('Las Vegas', 'NV'),
-        'AUS': ('Austin', 'TX'),
-        'SAT': ('San Antonio', 'TX'),
-        'MSY': ('New Orleans', 'LA'),
-        'BNA': ('Nashville', 'TN'),
-        'RDU': ('Raleigh', 'NC'),
-        'STL': ('St Louis', 'MO'),
-        'MKE': ('Milwaukee', 'WI'),
-        'CLE': ('Cleveland', 'OH'),
-        'CMH': ('Columbus', 'OH'),
-        'IND': ('Indianapolis', 'IN'),
-        'PIT': ('Pittsburgh', 'PA'),
-        'CVG': ('Cincinnati', 'OH'),
-        'OKC': ('Oklahoma City', 'OK'),
-        'ABQ': ('Albuquerque', 'NM'),
+    __slots__ = (
+        "llm_provider", "llm", "_semantic_cache", "_memo", "_memo_enabled",
+        "_llm_errors", "_lock", "_disk_cache", "_disk_key_prefix", "cache_stats", "_location_llm", "_pair_llm",
+        "_city_matrix", "_city_matrix_loaded"
+    )
+
+    # Read-only location tables (module constants, kept here for existing callers)
+    AIRPORT_CODES = AIRPORT_CODES
+    CITY_NICKNAMES = CITY_NICKNAMES
+    ZONE_DATABASE = ZONE_DATABASE
+    STATE_ABBREVIATIONS = STATE_ABBREVIATIONS
+
+    # ZONE_DATABASE re-keyed and indexed once at class load:
+    # - _ZONE_BY_CITY_STATE: (city, state) -> zone, no per-lookup key formatting
+    # - _CITY_STATES / _STATE_CITIES: city -> STATES and STATE -> cities, for
+    #   no-LLM spelling checks and local typo correction
+    # - _CITY_TITLES: display spelling of each city
+    _ZONE_BY_CITY_STATE: Dict[Tuple[str, str], int] = {}
+    _CITY_STATES: Dict[str, Tuple[str, ...]] = {}
+    _STATE_CITIES: Dict[str, Tuple[str, ...]] = {}
+    _CITY_TITLES: Dict[str, str] = {}
+    for _key, _zone in ZONE_DATABASE.items():
+        _city, _state = _key.rsplit(", ", 1)
+        _ZONE_BY_CITY_STATE[(_city, _state)] = _zone
+        _CITY_STATES[_city] = _CITY_STATES.get(_city, ()) + (_state.upper(),)
+        _STATE_CITIES[_state.upper()] = _STATE_CITIES.get(_state.upper(), ()) + (_city,)
+        _CITY_TITLES[_city] = _city.title()
+    del _key, _zone, _city, _state
+    _KNOWN_CITIES = frozenset(_CITY_STATES)
+    _KNOWN_CITY_NAMES = tuple(_CITY_STATES)
+
+    # All ZONE_DATABASE keys joined, so "which key contains this text" is one
+    # find() plus a bisect over the key start offsets
+    _ZONE_KEYS = tuple(ZONE_DATABASE)
+    _ZONE_KEY_BLOB = "\n".join(_ZONE_KEYS)
+    _ZONE_KEY_OFFSETS = tuple(accumulate((len(key) + 1 for key in _ZONE_KEYS), initial=0))
+
+    # Single-probe lookups built once from the tables above, keyed by the
+    # stripped, lowercased input:
+    # - _LOCATION_LOOKUP: whole location -> (kind, city, state), kind being
+    #   "airport", "nickname" or "db" (an exact "city, st" database entry);
+    #   airport codes win over nicknames as in the original check order
+    # - _STATE_LOOKUP: state code or full name -> 2-letter code
+    _LOCATION_LOOKUP: Dict[str, Tuple[str, str, str]] = {}
+    for _key, (_city, _state) in AIRPORT_CODES.items():
+        _LOCATION_LOOKUP[_key.lower()] = ("airport", _city, _state)
+    for _key, (_city, _state) in CITY_NICKNAMES.items():
+        _LOCATION_LOOKUP.setdefault(_key, ("nickname", _city, _state))
+    for (_city, _state) in _ZONE_BY_CITY_STATE:
+        _LOCATION_LOOKUP.setdefault(f"{_city}, {_state}", ("db", _CITY_TITLES[_city], _state.upper()))
+    # Longer inputs can't be a key, so they skip lowercasing and hashing
+    _LOCATION_KEY_MAX_LEN = max(map(len, _LOCATION_LOOKUP))
+    del _key, _city, _state
+    _STATE_CODES = frozenset(STATE_ABBREVIATIONS.values())
+    _STATE_LOOKUP = {**STATE_ABBREVIATIONS, **{code.lower(): code for code in STATE_ABBREVIATIONS.values()}}
+    _STATE_NAMES = tuple(STATE_ABBREVIATIONS)
+
+    # Nearest-neighbour city inference over "City, ST" embeddings (see
+    # _nearest_city); the matrix is cached on disk under a name derived from
+    # the labels, so edits to ZONE_DATABASE never reuse stale vectors
+    _CITY_LABELS: Tuple[Tuple[str, str], ...] = ()
+    for (_city, _state) in _ZONE_BY_CITY_STATE:
+        _CITY_LABELS += ((_CITY_TITLES[_city], _state.upper()),)
+    del _city, _state
+    _CITY_MATCH_THRESHOLD = 0.55
+    _CITY_EMBEDDINGS_PATH = os.path.join(
+        "~", ".cache",
+        "fedex_zone_cities_" + hashlib.sha1(repr(_CITY_LABELS).encode()).hexdigest()[:12] + ".npy"
+    )
+
+    # Version of the lookup tables, part of every disk-cache key so edits to
+    # them never reuse answers resolved against the old tables
+    _TABLES_VERSION = hashlib.sha1(
+        repr((AIRPORT_CODES, CITY_NICKNAMES, ZONE_DATABASE, STATE_ABBREVIATIONS)).encode()
+    ).hexdigest()[:12]
+
+    # Zone (and its reasoning) when neither the city nor the state is known
+    _DEFAULT_ZONE_REASONING = "Default zone estimate"
+
+    # Rough zone by destination state, for cities missing from ZONE_DATABASE
+    _STATE_ZONES = {
+        'CA': 2, 'OR': 3, 'WA': 3, 'NV': 3, 'AZ': 3, 'UT': 3, 'CO': 3,
+        'ID': 3, 'NM': 3, 'MT': 4, 'WY': 4,
+        'TX': 4, 'OK': 4, 'KS': 4, 'NE': 4, 'SD': 4, 'ND': 4,
+        'MO': 4, 'AR': 4, 'LA': 5, 'IA': 4,
+        'IL': 5, 'MI': 5, 'IN': 5, 'WI': 5, 'MN': 5, 'OH': 5,
+        'GA': 6, 'FL': 6, 'SC': 6, 'NC': 6, 'TN': 6, 'AL': 6, 'MS': 6,
+        'KY': 6, 'WV': 6, 'VA': 6,
+        'PA': 7, 'MA': 7, 'CT': 7, 'RI': 7, 'MD': 7, 'DE': 7,
+        'DC': 7, 'ME': 7, 'NH': 7, 'VT': 7,
+        'NY': 8, 'NJ': 8
     }
 
-    # City nicknames to actual city mapping
-    CITY_NICKNAMES = {
-        'big apple': ('New York', 'NY'),
-        'the big apple': ('New York', 'NY'),
-        'nyc': ('New York', 'NY'),
-        'la': ('Los Angeles', 'CA'),
-        'windy city': ('Chicago', 'IL'),
-        'the windy city': ('Chicago', 'IL'),
-        'chi-town': ('Chicago', 'IL'),
-        'bay area': ('San Francisco', 'CA'),
-        'sf': ('San Francisco', 'CA'),
-        'frisco': ('San Francisco', 'CA'),
-        'silicon valley': ('San Jose', 'CA'),
-        'motor city': ('Detroit', 'MI'),
-        'motown': ('Detroit', 'MI'),
-        'mile high city': ('Denver', 'CO'),
-        'sin city': ('Las Vegas', 'NV'),
-        'vegas': ('Las Vegas', 'NV'),
-        'philly': ('Philadelphia', 'PA'),
-        'hotlanta': ('Atlanta', 'GA'),
-        'atl': ('Atlanta', 'GA'),
-        'bean town': ('Boston', 'MA'),
-        'beantown': ('Boston', 'MA'),
-        'big d': ('Dallas', 'TX'),
-        'space city': ('Houston', 'TX'),
-        'h-town': ('Houston', 'TX'),
-        'emerald city': ('Seattle', 'WA'),
-        'queen city': ('Charlotte', 'NC'),
-        'twin cities': ('Minneapolis', 'MN'),
-        'valley of the sun': ('Phoenix', 'AZ'),
-        'magic city': ('Miami', 'FL'),
-        'music city': ('Nashville', 'TN'),
-        'big easy': ('New Orleans', 'LA'),
-        'the big easy': ('New Orleans', 'LA'),
-        'nola': ('New Orleans', 'LA'),
-        'rose city': ('Portland', 'OR'),
-        'city of angels': ('Los Angeles', 'CA'),
-        'city by the bay': ('San Francisco', 'CA'),
-        'charm city': ('Baltimore', 'MD'),
-        'steel city': ('Pittsburgh', 'PA'),
-        'alamo city': ('San Antonio', 'TX'),
-        'circle city': ('Indianapolis', 'IN'),
-        'gateway city': ('St Louis', 'MO'),
-        'brew city': ('Milwaukee', 'WI'),
-        'cream city': ('Milwaukee', 'WI'),
-    }
-
-    # Zone database (origin: San Francisco Bay Area)
-    ZONE_DATABASE = {
-        # Zone 2 - California and nearby
-        'san francisco, ca': 2, 'oakland, ca': 2, 'san jose, ca': 2,
-        'fremont, ca': 2, 'sacramento, ca': 2, 'fresno, ca': 2,
-        'los angeles, ca': 2, 'san diego, ca': 2, 'santa barbara, ca': 2,
-        'bakersfield, ca': 2, 'stockton, ca': 2, 'modesto, ca': 2,
-        'irvine, ca': 2, 'long beach, ca': 2, 'anaheim, ca': 2,
-
-        # Zone 3 - Pacific Northwest, Southwest
-        'phoenix, az': 3, 'tucson, az': 3, 'mesa, az': 3,
-        'las vegas, nv': 3, 'reno, nv': 3, 'henderson, nv': 3,
-        'portland, or': 3, 'eugene, or': 3, 'salem, or': 3,
-        'seattle, wa': 3, 'spokane, wa': 3, 'tacoma, wa': 3,
-        'salt lake city, ut': 3, 'provo, ut': 3, 'ogden, ut': 3,
-        'denver, co': 3, 'colorado springs, co': 3, 'aurora, co': 3,
-        'boulder, co': 3, 'fort collins, co': 3,
-        'boise, id': 3, 'albuquerque, nm': 3, 'santa fe, nm': 3,
-
-        # Zone 4 - South Central
-        'dallas, tx': 4, 'houston, tx': 4, 'austin, tx': 4,
-        'san antonio, tx': 4, 'fort worth, tx': 4, 'el paso, tx': 4,
-        'oklahoma city, ok': 4, 'tulsa, ok': 4, 'norman, ok': 4,
-        'kansas city, mo': 4, 'st louis, mo': 4, 'springfield, mo': 4,
-        'omaha, ne': 4, 'lincoln, ne': 4, 'wichita, ks': 4,
-        'little rock, ar': 4, 'des moines, ia': 4, 'sioux falls, sd': 4,
-
-        # Zone 5 - Midwest
-        'chicago, il': 5, 'springfield, il': 5, 'peoria, il': 5,
-        'detroit, mi': 5, 'grand rapids, mi': 5, 'ann arbor, mi': 5,
-        'milwaukee, wi': 5, 'madison, wi': 5, 'green bay, wi': 5,
-        'indianapolis, in': 5, 'fort wayne, in': 5, 'evansville, in': 5,
-        'columbus, oh': 5, 'cleveland, oh': 5, 'cincinnati, oh': 5,
-        'minneapolis, mn': 5, 'st paul, mn': 5, 'duluth, mn': 5,
-
-        # Zone 6 - Southeast
-        'atlanta, ga': 6, 'savannah, ga': 6, 'augusta, ga': 6,
-        'nashville, tn': 6, 'memphis, tn': 6, 'knoxville, tn': 6,
-        'charlotte, nc': 6, 'raleigh, nc': 6, 'durham, nc': 6,
-        'miami, fl': 6, 'tampa, fl': 6, 'orlando, fl': 6,
-        'jacksonville, fl': 6, 'tallahassee, fl': 6, 'pensacola, fl': 6,
-        'fort lauderdale, fl': 6, 'west palm beach, fl': 6,
-        'new orleans, la': 6, 'baton rouge, la': 6, 'shreveport, la': 6,
-        'birmingham, al': 6, 'montgomery, al': 6, 'mobile, al': 6,
-        'jackson, ms': 6, 'charleston, sc': 6, 'columbia, sc': 6,
-
-        # Zone 7 - Mid-Atlantic
-        'boston, ma': 7, 'worcester, ma': 7, 'cambridge, ma': 7,
-        'philadelphia, pa': 7, 'pittsburgh, pa': 7, 'harrisburg, pa': 7,
-        'baltimore, md': 7, 'annapolis, md': 7, 'frederick, md': 7,
-        'washington, dc': 7, 'richmond, va': 7, 'norfolk, va': 7,
-        'buffalo, ny': 7, 'rochester, ny': 7, 'syracuse, ny': 7,
-        'albany, ny': 7, 'hartford, ct': 7, 'new haven, ct': 7,
-        'providence, ri': 7, 'portland, me': 7, 'manchester, nh': 7,
-
-        # Zone 8 - New York City Metro
-        'new york, ny': 8, 'manhattan, ny': 8, 'brooklyn, ny': 8,
-        'queens, ny': 8, 'bronx, ny': 8, 'staten island, ny': 8,
-        'newark, nj': 8, 'jersey city, nj': 8, 'paterson, nj': 8,
-    }
-
-    # State abbreviations
-    STATE_ABBREVIATIONS = {
-        'alabama': 'AL', 'alaska': 'AK', 'arizona': 'AZ', 'arkansas': 'AR',
-        'california': 'CA', 'colorado': 'CO', 'connecticut': 'CT', 'delaware': 'DE',
-        'florida': 'FL', 'georgia': 'GA', 'hawaii': 'HI', 'idaho': 'ID',
-        'illinois': 'IL', 'indiana': 'IN', 'iowa': 'IA', 'kansas': 'KS',
-        'kentucky': 'KY', 'louisiana': 'LA', 'maine': 'ME', 'maryland': 'MD',
-        'massachusetts': 'MA', 'michigan': 'MI', 'minnesota': 'MN', 'mississippi': 'MS',
-        'missouri': 'MO', 'montana': 'MT', 'nebraska': 'NE', 'nevada': 'NV',
-        'new hampshire': 'NH', 'new jersey': 'NJ', 'new mexico': 'NM', 'new york': 'NY',
-        'north carolina': 'NC', 'north dakota': 'ND', 'ohio': 'OH', 'oklahoma': 'OK',
-        'oregon': 'OR', 'pennsylvania': 'PA', 'rhode island': 'RI', 'south carolina': 'SC',
-        'south dakota': 'SD', 'tennessee': 'TN', 'texas': 'TX', 'utah': 'UT',
-        'vermont': 'VT', 'virginia': 'VA', 'washington': 'WA', 'west virginia': 'WV',
-        'wisconsin': 'WI', 'wyoming': 'WY', 'district of columbia': 'DC'
-    }
-
-    def __init__(self, llm_provider: str = "openai", api_key: Optional[str] = None, model: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        llm_provider: str = "openai",
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        llm: Optional[BaseChatModel] = None
+    ):
         """
         Initialize Zone Calculator.
 
@@ -210,20 +489,38 @@ class ZoneCalculator:
             llm_provider: "openai" or "ollama"
             api_key: OpenAI API key (required if llm_provider="openai")
             model: Model name for LLM
+            llm: Pre-built chat model to use instead of creating one
+                (lets several tools share one client and connection pool)
         """
         self.llm_provider = llm_provider
 
-        if llm_provider == "openai":
-            self.llm = ChatOpenAI(
-                model=model,
-                temperature=0,
-                api_key=api_key or os.getenv("OPENAI_API_KEY")
-            )
-        else:
-            self.llm = ChatOllama(
-                model=model,
-                temperature=0
-            )
+        self.llm = llm if llm is not None else _get_llm_client(llm_provider, model, api_key)
+
+        # Paraphrased/typo'd inputs reuse earlier LLM corrections
+        self._semantic_cache = SemanticCache()
+
+        # Exact-input memo of the resolve steps (see _memoized); a temperature-0
+        # model makes each answer a pure function of its input
+        self._memo = LRUCache(maxsize=4096)
+        self._memo_enabled = getattr(self.llm, "temperature", None) == 0
+        self._llm_errors = 0
+        # acalculate_zone resolves both locations in worker threads, so the
+        # memo (a cachetools LRU, not thread-safe) and counters share a lock
+        self._lock = threading.Lock()
+        # On-disk copy of the memo so new processes start warm; keys are
+        # scoped to the provider, model and lookup tables that produced them
+        self._disk_cache = PersistentCache() if self._memo_enabled else None
+        model_name = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or model
+        self._disk_key_prefix = (llm_provider, str(model_name), self._TABLES_VERSION)
+        self.cache_stats = {"hits": 0, "misses": 0}
+
+        # Schema-constrained views of the model for one-call city+state and pair resolution
+        self._location_llm = self.llm.with_structured_output(ResolvedLocation)
+        self._pair_llm = self.llm.with_structured_output(ResolvedLocationPair)
+
+        # City embedding matrix for _nearest_city, loaded on first use
+        self._city_matrix: Optional[np.ndarray] = None
+        self._city_matrix_loaded = False
 
         logger.info(f"ZoneCalculator initialized with {llm_provider}")
 
@@ -249,48 +546,236 @@ class ZoneCalculator:
         """
         logger.info(f"Calculating zone: {origin} -> {destination}")
 
-        trajectory = []
-
-        # Step 1: Resolve origin
-        trajectory.append({
-            "step": "resolve_origin",
-            "input": origin,
-            "action": "Resolving origin location"
-        })
-        origin_city, origin_state, origin_reasoning = self._resolve_location(origin)
-        trajectory[-1]["output"] = f"{origin_city}, {origin_state}"
-        trajectory[-1]["reasoning"] = origin_reasoning
-
-        # Step 2: Resolve destination
-        trajectory.append({
-            "step": "resolve_destination",
-            "input": destination,
-            "action": "Resolving destination location"
-        })
-        dest_city, dest_state, dest_reasoning = self._resolve_location(destination)
-        trajectory[-1]["output"] = f"{dest_city}, {dest_state}"
-        trajectory[-1]["reasoning"] = dest_reasoning
-
-        # Step 3: Calculate zone
-        trajectory.append({
-            "step": "calculate_zone",
-            "action": "Looking up zone in database"
-        })
+        # Both are airport codes, nicknames or exact database entries: no
+        # memo, disk cache or LLM involved
+        origin_fast, dest_fast = self._try_fast_resolve(origin), self._try_fast_resolve(destination)
+        if origin_fast is not None and dest_fast is not None:
+            return self._zone_result(origin, destination, origin_fast, dest_fast)
+
+        # When neither location resolves without the LLM, resolve both in one call
+        errors = self._llm_errors
+        resolved = {}
+        if not self._resolves_locally(origin) and not self._resolves_locally(destination):
+            resolved = self._resolve_pair(origin, destination)
+
+        return self._zone_result(
+            origin,
+            destination,
+            resolved.get("origin") or self._resolve_location(origin),
+            resolved.get("destination") or self._resolve_location(destination),
+            degraded=self._llm_errors != errors
+        )
+
+    async def acalculate_zone(
+        self,
+        origin: str,
+        destination: str
+    ) -> Dict[str, Any]:
+        """
+        Async variant of calculate_zone.
+
+        If the single pair call isn't made (or fails), origin and destination
+        are resolved concurrently, so two LLM round-trips overlap instead of
+        running back to back.
+
+        Args:
+            origin: Origin location (city, airport code, or nickname)
+            destination: Destination location (city, airport code, or nickname)
+
+        Returns:
+            Dictionary with zone, reasoning, and resolved locations
+        """
+        logger.info(f"Calculating zone (async): {origin} -> {destination}")
+
+        origin_fast, dest_fast = self._try_fast_resolve(origin), self._try_fast_resolve(destination)
+        if origin_fast is not None and dest_fast is not None:
+            return self._zone_result(origin, destination, origin_fast, dest_fast)
+
+        errors = self._llm_errors
+        resolved = {}
+        if not self._resolves_locally(origin) and not self._resolves_locally(destination):
+            resolved = await asyncio.to_thread(self._resolve_pair, origin, destination)
+
+        origin_resolved, dest_resolved = resolved.get("origin"), resolved.get("destination")
+        if origin_resolved is None or dest_resolved is None:
+            # Sync resolve paths run in worker threads so they share the caches
+            origin_resolved, dest_resolved = await asyncio.gather(
+                asyncio.to_thread(self._resolve_location, origin),
+                asyncio.to_thread(self._resolve_location, destination)
+            )
+
+        return self._zone_result(
+            origin, destination, origin_resolved, dest_resolved, degraded=self._llm_errors != errors
+        )
+
+    def _zone_result(
+        self,
+        origin: str,
+        destination: str,
+        origin_resolved: Tuple[str, str, str],
+        dest_resolved: Tuple[str, str, str],
+        degraded: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Look up the zone for resolved locations and build the result with its trajectory.
+
+        Args:
+            origin: Raw origin location string
+            destination: Raw destination location string
+            origin_resolved: (city, state, reasoning) for the origin
+            dest_resolved: (city, state, reasoning) for the destination
+            degraded: An LLM call failed while resolving, so a location may
+                be a fallback guess
+
+        Returns:
+            Dictionary with zone, reasoning, and resolved locations; "source"
+            is "default" when the zone rests on a fallback rather than a lookup
+        """
+        origin_city, origin_state, origin_reasoning = origin_resolved
+        dest_city, dest_state, dest_reasoning = dest_resolved
+        origin_label = f"{origin_city}, {origin_state}"
+        dest_label = f"{dest_city}, {dest_state}"
         zone, zone_reasoning = self._get_zone(dest_city, dest_state)
-        trajectory[-1]["output"] = f"Zone {zone}"
-        trajectory[-1]["reasoning"] = zone_reasoning
+
+        trajectory = [
+            # Step 1: Resolve origin
+            {
+                "step": "resolve_origin",
+                "input": origin,
+                "action": "Resolving origin location",
+                "output": origin_label,
+                "reasoning": origin_reasoning
+            },
+            # Step 2: Resolve destination
+            {
+                "step": "resolve_destination",
+                "input": destination,
+                "action": "Resolving destination location",
+                "output": dest_label,
+                "reasoning": dest_reasoning
+            },
+            # Step 3: Calculate zone
+            {
+                "step": "calculate_zone",
+                "action": "Looking up zone in database",
+                "output": f"Zone {zone}",
+                "reasoning": zone_reasoning
+            }
+        ]
 
         return {
             "zone": zone,
-            "origin": f"{origin_city}, {origin_state}",
-            "destination": f"{dest_city}, {dest_state}",
+            "origin": origin_label,
+            "destination": dest_label,
             "original_origin": origin,
             "original_destination": destination,
-            "reasoning": f"Shipping from {origin_city}, {origin_state} to {dest_city}, {dest_state} is Zone {zone}. {zone_reasoning}",
+            "reasoning": f"Shipping from {origin_label} to {dest_label} is Zone {zone}. {zone_reasoning}",
             "trajectory": trajectory,
+            "source": "default" if degraded or zone_reasoning == self._DEFAULT_ZONE_REASONING else "lookup",
             "success": zone is not None
         }
 
+    def _resolves_locally(self, location: str) -> bool:
+        """Whether _resolve_location can answer without calling the LLM."""
+        if self._memo_enabled and self._memo_get(_memo_key("_resolve_location", location)) is not None:
+            return True
+
+        if self._known_location(location) is not None:
+            return True
+
+        if ',' in location:
+            parts = location.split(',')
+            state = self._local_state(parts[1].strip() if len(parts) > 1 else '')
+            return state is not None and self._local_city(parts[0].strip(), state) is not None
+
+        return self._local_inference(location) is not None
+
+    def _known_location(self, location: str) -> Optional[Tuple[str, str, str]]:
+        """_LOCATION_LOOKUP entry for an airport code, nickname or exact database key."""
+        location_clean = location.strip()
+        if len(location_clean) > self._LOCATION_KEY_MAX_LEN:
+            return None
+        return self._LOCATION_LOOKUP.get(location_clean.lower())
+
+    def _try_fast_resolve(self, location: str) -> Optional[Tuple[str, str, str]]:
+        """(city, state, reasoning) for an airport code, nickname or exact database entry, else None."""
+        known = self._known_location(location)
+        if known is None:
+            return None
+        kind, city, state = known
+        if kind == "airport":
+            return city, state, f"Recognized '{location}' as airport code for {city}, {state}"
+        if kind == "nickname":
+            return city, state, f"Recognized '{location}' as nickname for {city}, {state}"
+        return city, state, f"Parsed as {city}, {state}"
+
+    def _resolve_pair(self, origin: str, destination: str) -> Dict[str, Tuple[str, str, str]]:
+        """
+        Resolve origin and destination with a single LLM call.
+
+        Args:
+            origin: Raw origin location string
+            destination: Raw destination location string
+
+        Returns:
+            {"origin": (city, state, reasoning), "destination": (...)}, or an
+            empty dict if the call fails or returns a state that isn't a US
+            state (callers then resolve one by one)
+        """
+        prompt = f"""Identify these two US locations. Correct any typos in the city names and give each state's 2-letter abbreviation.
+
+Origin: "{origin}"
+Destination: "{destination}"
+"""
+
+        try:
+            pair = self._pair_llm.invoke([HumanMessage(content=prompt)])
+        except Exception as e:
+            self._count_llm_error()
+            logger.warning(f"Location pair resolution error: {e}")
+            return {}
+
+        resolved = {}
+        for role, location, answer in (
+            ("origin", origin, pair.origin),
+            ("destination", destination, pair.destination),
+        ):
+            city, state = answer.city.strip().title(), self._local_state(answer.state)
+            if state is None:
+                logger.warning(f"Location pair resolution gave an invalid state: '{answer.state}'")
+                return {}
+            resolved[role] = (city, state, f"Resolved '{location}' as {city}, {state}")
+
+        # Only memoize once both answers carry a valid state code
+        if self._memo_enabled:
+            for role, location in (("origin", origin), ("destination", destination)):
+                self._memo_put(_memo_key("_resolve_location", location), resolved[role])
+        return resolved
+
+    def _count_llm_error(self) -> None:
+        """Record a failed LLM call (results computed meanwhile aren't memoized)."""
+        with self._lock:
+            self._llm_errors += 1
+
+    def _memo_get(self, key: Tuple[str, ...]) -> Optional[Any]:
+        """Memoized result for key from memory, else from disk (promoted to memory)."""
+        with self._lock:
+            cached = self._memo.get(key)
+        if cached is None and self._disk_cache is not None:
+            cached = self._disk_cache.get(self._disk_key_prefix + key)
+            if cached is not None:
+                with self._lock:
+                    self._memo[key] = cached
+        return cached
+
+    def _memo_put(self, key: Tuple[str, ...], result: Any) -> None:
+        """Store a memoized result in memory and on disk."""
+        with self._lock:
+            self._memo[key] = result
+        if self._disk_cache is not None:
+            self._disk_cache.put(self._disk_key_prefix + key, result)
+
+    @_memoized
     def _resolve_location(self, location: str) -> Tuple[str, str, str]:
         """
         Resolve a location string to city and state.
@@ -303,19 +788,10 @@ class ZoneCalculator:
         Returns:
             Tuple of (city, state, reasoning)
         """
-        location_clean = location.strip()
-        location_upper = location_clean.upper()
-        location_lower = location_clean.lower()
-
-        # Check airport codes first
-        if location_upper in self.AIRPORT_CODES:
-            city, state = self.AIRPORT_CODES[location_upper]
-            return city, state, f"Recognized '{location}' as airport code for {city}, {state}"
-
-        # Check city nicknames
-        if location_lower in self.CITY_NICKNAMES:
-            city, state = self.CITY_NICKNAMES[location_lower]
-            return city, state, f"Recognized '{location}' as nickname for {city}, {state}"
+        # Airport code, nickname or exact database entry: one hash probe
+        fast = self._try_fast_resolve(location)
+        if fast is not None:
+            return fast
 
         # Check if it's in "City, State" format
         if ',' in location:
@@ -323,6 +799,13 @@ class ZoneCalculator:
             city = parts[0].strip()
             state = parts[1].strip() if len(parts) > 1 else ''
 
+            # Neither part resolvable locally: fix both with one LLM call
+            if self._local_state(state) is None and self._local_city(city, '') is None:
+                resolved = self._resolve_city_state(city, state)
+                if resolved is not None:
+                    corrected_city, state = resolved
+                    return corrected_city, state, f"Resolved '{location}' as {corrected_city}, {state}"
+
             # Normalize state
             state = self._normalize_state(state)
 
@@ -338,125 +821,237 @@ class ZoneCalculator:
         corrected_city, inferred_state = self._infer_location(location)
         return corrected_city, inferred_state, f"Inferred location as {corrected_city}, {inferred_state}"
 
-    def _normalize_state(self, state: str) -> str:
-        """Normalize state name to 2-letter abbreviation."""
-        state_upper = state.upper().strip()
-
-        # Already an abbreviation
-        if len(state_upper) == 2 and state_upper in self.STATE_ABBREVIATIONS.values():
-            return state_upper
-
-        # Full state name
-        state_lower = state.lower().strip()
-        if state_lower in self.STATE_ABBREVIATIONS:
-            return self.STATE_ABBREVIATIONS[state_lower]
+    def _resolve_city_state(self, city: str, state: str) -> Optional[Tuple[str, str]]:
+        """
+        Correct a city name and normalize its state with a single LLM call.
 
-        # Try LLM correction
-        prompt = f"""Convert this US state to its 2-letter abbreviation.
+        Args:
+            city: Raw city name
+            state: Raw state text (not a known code or state name)
 
-Input: "{state}"
+        Returns:
+            Tuple of (city, 2-letter state), or None if the call fails or
+            the state returned isn't a US state code
+        """
+        prompt = f"""Correct any typos in this US city name and give its state's 2-letter abbreviation.
 
-Return ONLY the 2-letter state code (e.g., CA, NY, TX).
-If you cannot determine the state, return "UNKNOWN"."""
+City: "{city}"
+State: "{state}"
+"""
 
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            normalized = response.content.strip().upper()[:2]
-            if normalized in self.STATE_ABBREVIATIONS.values():
-                return normalized
+            answer = self._location_llm.invoke([HumanMessage(content=prompt)])
         except Exception as e:
-            logger.warning(f"State normalization error: {e}")
+            self._count_llm_error()
+            logger.warning(f"City/state resolution error: {e}")
+            return None
 
-        return state_upper
+        state_code = answer.state.strip().upper()
+        if state_code not in self._STATE_CODES:
+            return None
+        return answer.city.strip().title(), state_code
+
+    def _normalize_state(self, state: str) -> str:
+        """Normalize state name to 2-letter abbreviation."""
+        local = self._local_state(state)
+        return local if local is not None else state.upper().strip()
+
+    def _local_state(self, state: str) -> Optional[str]:
+        """2-letter abbreviation for a state code or (possibly misspelled) full name, without the LLM."""
+        state_lower = _canon(state)[1]
+        code = self._STATE_LOOKUP.get(state_lower)
+        if code is not None:
+            return code
+
+        # Misspelled full name, e.g. "Califronia" or "Pensylvania"
+        match = process.extractOne(state_lower, self._STATE_NAMES, scorer=fuzz.ratio, score_cutoff=80)
+        return STATE_ABBREVIATIONS[match[0]] if match else None
+
+    def _local_city(self, city: str, state: str) -> Optional[str]:
+        """Database spelling of a city (exact, normalized, or small typo), without the LLM."""
+        _, city_lower, _ = _canon(city)
+        _, state_lower, state_upper = _canon(state)
 
-    def _correct_city_name(self, city: str, state: str) -> str:
-        """Correct city name typos using LLM."""
         # Check if city exists in database as-is
-        lookup_key = f"{city.lower()}, {state.lower()}"
-        if lookup_key in self.ZONE_DATABASE:
-            return city.title()
+        if (city_lower, state_lower) in self._ZONE_BY_CITY_STATE:
+            return self._CITY_TITLES[city_lower]
 
-        # Use LLM to correct
-        prompt = f"""Correct this US city name if it has typos.
+        # Correctly spelled database city (modulo case, punctuation, Saint/St)
+        city_norm = _normalize_city(city_lower)
+        if city_norm in self._KNOWN_CITIES:
+            return self._CITY_TITLES[city_norm]
 
-City: "{city}"
-State: {state}
+        # Typo within a small edit distance of a database city in this state
+        match = self._closest_city(city_norm, self._STATE_CITIES.get(state_upper, ()))
+        if match is not None:
+            return self._CITY_TITLES[match]
 
-Examples:
-- "San Fransisco" -> "San Francisco"
-- "Los Angels" -> "Los Angeles"
-- "Denvar" -> "Denver"
-- "Chicgo" -> "Chicago"
-- "Bostun" -> "Boston"
+        return None
 
-Return ONLY the correctly spelled city name. If the city seems correct, return it as-is."""
+    def _local_inference(self, location: str) -> Optional[Tuple[str, str]]:
+        """City and state for a database city (or close misspelling) found in only one state."""
+        city = self._closest_city(_normalize_city(location), self._KNOWN_CITY_NAMES)
+        if city is not None and len(self._CITY_STATES[city]) == 1:
+            return self._CITY_TITLES[city], self._CITY_STATES[city][0]
+        return None
+
+    @_memoized
+    def _correct_city_name(self, city: str, state: str) -> str:
+        """Correct city name typos using LLM."""
+        local = self._local_city(city, state)
+        if local is not None:
+            return local
+
+        # Reuse a correction for the same or a near-identical spelling in this state
+        partition = f"correct_city:{state.upper()}"
+        cached = self._semantic_cache.get(partition, city)
+        if cached is not None:
+            return cached
 
+        # Use LLM to correct
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content.strip().title()
+            response = self.llm.invoke([
+                SystemMessage(content=_CITY_CORRECT_SYSTEM_PROMPT),
+                HumanMessage(content=f'City: "{city}"\nState: {state}')
+            ])
+            corrected = response.content.strip().title()
+            self._semantic_cache.put(partition, city, corrected)
+            return corrected
         except Exception as e:
+            self._count_llm_error()
             logger.warning(f"City correction error: {e}")
             return city.title()
 
-    def _infer_location(self, location: str) -> Tuple[str, str]:
-        """Infer city and state from a single location name."""
-        prompt = f"""Identify this US location and return the city name and state abbreviation.
+    @staticmethod
+    def _closest_city(city_norm: str, candidates: Tuple[str, ...]) -> Optional[str]:
+        """
+        Closest candidate city by Levenshtein distance.
 
-Location: "{location}"
+        Args:
+            city_norm: City name in _normalize_city() form
+            candidates: Normalized database city names to choose from
 
-Consider:
-- Major US cities (Denver, Boston, Miami, etc.)
-- Common misspellings
-- Regional references
+        Returns:
+            Best candidate within _max_typo_distance(), or None
+        """
+        if not city_norm or not candidates:
+            return None
+        match = process.extractOne(
+            city_norm,
+            candidates,
+            scorer=Levenshtein.distance,
+            score_cutoff=_max_typo_distance(city_norm)
+        )
+        return match[0] if match is not None else None
+
+    @_memoized
+    def _infer_location(self, location: str) -> Tuple[str, str]:
+        """Infer city and state from a single location name."""
+        local = self._local_inference(location)
+        if local is not None:
+            return local
 
-Return in this exact format: City, ST
-For example: Denver, CO or Boston, MA
+        cached = self._semantic_cache.get("infer_location", location)
+        if cached is not None:
+            return cached
 
-If you cannot determine the location, return: Unknown, CA"""
+        nearest = self._nearest_city(location)
+        if nearest is not None:
+            return nearest
 
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
+            response = self.llm.invoke([
+                SystemMessage(content=_INFER_LOCATION_SYSTEM_PROMPT),
+                HumanMessage(content=f'Location: "{location}"')
+            ])
             result = response.content.strip()
 
             if ',' in result:
                 parts = result.split(',')
                 city = parts[0].strip().title()
                 state = parts[1].strip().upper()[:2]
+                self._semantic_cache.put("infer_location", location, (city, state))
                 return city, state
+
+            # An answer that isn't "City, ST" counts as a failure (not memoized)
+            self._count_llm_error()
+            logger.warning(f"Unparseable location inference for '{location}': {result!r}")
         except Exception as e:
+            self._count_llm_error()
             logger.warning(f"Location inference error: {e}")
 
         return location.title(), "CA"
 
+    def _city_embeddings(self) -> Optional[np.ndarray]:
+        """Unit embeddings of _CITY_LABELS, read from or written to the .npy cache."""
+        if not self._city_matrix_loaded:
+            self._city_matrix_loaded = True
+            path = os.path.expanduser(self._CITY_EMBEDDINGS_PATH)
+            try:
+                matrix = np.load(path)
+                if matrix.shape[0] == len(self._CITY_LABELS):
+                    self._city_matrix = matrix
+            except (OSError, ValueError):
+                pass
+
+            if self._city_matrix is None:
+                self._city_matrix = self._semantic_cache.embed(
+                    [f"{city}, {state}" for city, state in self._CITY_LABELS]
+                )
+                if self._city_matrix is not None:
+                    try:
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        np.save(path, self._city_matrix)
+                    except OSError as e:
+                        logger.warning(f"Could not cache city embeddings at {path}: {e}")
+        return self._city_matrix
+
+    def _nearest_city(self, location: str) -> Optional[Tuple[str, str]]:
+        """
+        Database city whose "City, ST" embedding is closest to a location.
+
+        Args:
+            location: Raw location string
+
+        Returns:
+            Tuple of (city, state), or None if embeddings are unavailable or
+            the best cosine similarity is below _CITY_MATCH_THRESHOLD
+        """
+        matrix = self._city_embeddings()
+        if matrix is None:
+            return None
+        query = self._semantic_cache.embed([location])
+        if query is None:
+            return None
+
+        scores = matrix @ query[0]
+        best = int(scores.argmax())
+        if scores[best] < self._CITY_MATCH_THRESHOLD:
+            return None
+        logger.debug(f"Inferred '{location}' as {self._CITY_LABELS[best]} by embedding ({scores[best]:.3f})")
+        return self._CITY_LABELS[best]
+
     def _get_zone(self, city: str, state: str) -> Tuple[Optional[int], str]:
         """Look up zone for a city/state combination."""
-        lookup_key = f"{city.lower()}, {state.lower()}"
-
-        if lookup_key in self.ZONE_DATABASE:
-            zone = self.ZONE_DATABASE[lookup_key]
+        _, city_lower, _ = _canon(city)
+        _, state_lower, state_upper = _canon(state)
+
+        # Exact key, then the database spelling of e.g. "St. Louis" / "Saint Louis"
+        zone = self._ZONE_BY_CITY_STATE.get((city_lower, state_lower))
+        if zone is None:
+            zone = self._ZONE_BY_CITY_STATE.get((_normalize_city(city_lower), state_lower))
+        if zone is not None:
             return zone, f"Found {city}, {state} in zone database"
 
-        # Try partial match
-        for key, zone in self.ZONE_DATABASE.items():
-            if city.lower() in key:
-                return zone, f"Matched {city} approximately in zone database"
+        # Try partial match (first key, in database order, containing the city)
+        pos = self._ZONE_KEY_BLOB.find(city_lower) if "\n" not in city_lower else -1
+        if pos != -1:
+            key = self._ZONE_KEYS[bisect_right(self._ZONE_KEY_OFFSETS, pos) - 1]
+            return ZONE_DATABASE[key], f"Matched {city} approximately in zone database"
 
         # Fallback: estimate by state
-        state_zones = {
-            'CA': 2, 'OR': 3, 'WA': 3, 'NV': 3, 'AZ': 3, 'UT': 3, 'CO': 3,
-            'ID': 3, 'NM': 3, 'MT': 4, 'WY': 4,
-            'TX': 4, 'OK': 4, 'KS': 4, 'NE': 4, 'SD': 4, 'ND': 4,
-            'MO': 4, 'AR': 4, 'LA': 5, 'IA': 4,
-            'IL': 5, 'MI': 5, 'IN': 5, 'WI': 5, 'MN': 5, 'OH': 5,
-            'GA': 6, 'FL': 6, 'SC': 6, 'NC': 6, 'TN': 6, 'AL': 6, 'MS': 6,
-            'KY': 6, 'WV': 6, 'VA': 6,
-            'PA': 7, 'MA': 7, 'CT': 7, 'RI': 7, 'MD': 7, 'DE': 7,
-            'DC': 7, 'ME': 7, 'NH': 7, 'VT': 7,
-            'NY': 8, 'NJ': 8
-        }
-
-        if state.upper() in state_zones:
-            zone = state_zones[state.upper()]
+        zone = self._STATE_ZONES.get(state_upper)
+        if zone is not None:
             return zone, f"Estimated zone based on state {state}"
 
-        return 5, "Default zone estimate"
+        return 5, self._DEFAULT_ZONE_REASONING
@@ -12,24 +12,256 @@ Use Vanna.AI with Ollama (qwen3 model) and Qdrant for local text-to-SQL queries.
 No cloud calls, fully local LLM and vector store.
 """
 
+from __future__ import annotations
+
+import gzip
+import json
+import os
 import sqlite3
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from functools import cache
+from itertools import batched
+from typing import TYPE_CHECKING, Sequence
 
-import pandas as pd
+from cachetools import LRUCache
 from loguru import logger
-from vanna.ollama import Ollama
-from vanna.qdrant import Qdrant_VectorStore
 
+# pandas, vanna and qdrant_client are imported where first used so that
+# importing this module (or running --help) stays fast
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Every service rate column, in table order
+_ALL_COLS = "FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver"
+
+# Known fedex_rates key column types, applied to results instead of pandas'
+# per-query inference. Rate columns stay float64 so cent values print exactly
+_SCHEMA_DTYPES = {
+    "Zone": "int16",
+    "Weight": "int16"
+}
+
+# Examples per Qdrant upsert when batch training (also the fastembed batch size)
+_UPSERT_CHUNK = 32
+
+# Question/SQL pairs for train_on_examples (from vanna.md), split into two
+# parallel tuples so training walks plain string sequences. The per-zone and
+# per-weight "all rates" examples come from templates; the rest are one-offs
+_TRAIN_EXAMPLES = (
+    # Zone-based queries
+    (
+        "Show all available FedEx shipping zones",
+        "SELECT DISTINCT Zone FROM fedex_rates ORDER BY Zone;"
+    ),
+    (
+        "Show rates for Zone 3 under 10 lbs",
+        f"SELECT Zone, Weight, {_ALL_COLS} FROM fedex_rates WHERE Zone = 3 AND Weight <= 10;"
+    ),
+    *(
+        (
+            f"Show all rates for Zone {zone}",
+            f"SELECT Zone, Weight, {_ALL_COLS} FROM fedex_rates WHERE Zone = {zone} ORDER BY Weight;"
+        )
+        for zone in range(2, 9)
+    ),
+
+    # Weight-based queries
+    (
+        "List all available weight categories",
+        "SELECT DISTINCT Weight FROM fedex_rates ORDER BY Weight;"
+    ),
+    (
+        "Show rates for packages between 10 and 20 lbs",
+        f"SELECT Zone, Weight, {_ALL_COLS} FROM fedex_rates WHERE Weight BETWEEN 10 AND 20;"
+    ),
+    *(
+        (
+            f"What are the rates for {weight} lb packages?",
+            f"SELECT Zone, Weight, {_ALL_COLS} FROM fedex_rates WHERE Weight = {weight} ORDER BY Zone;"
+        )
+        for weight in (5, 10, 15, 20, 25, 50)
+    ),
+
+    # Service-tier comparisons
+    (
+        "Compare FedEx 2Day rates across all zones for 10 lbs",
+        "SELECT Zone, Weight, FedEx_2Day FROM fedex_rates WHERE Weight = 10 ORDER BY Zone;"
+    ),
+    (
+        "Show FedEx Priority Overnight rates for Zone 5",
+        "SELECT Zone, Weight, FedEx_Priority_Overnight FROM fedex_rates WHERE Zone = 5 ORDER BY Weight;"
+    ),
+    (
+        "What's the cheapest service for Zone 6, 15 lbs?",
+        f"SELECT Zone, Weight, MIN({_ALL_COLS}) as Cheapest_Rate FROM fedex_rates WHERE Zone = 6 AND Weight = 15;"
+    ),
+    (
+        "Show FedEx Express Saver rates for all zones at 20 lbs",
+        "SELECT Zone, Weight, FedEx_Express_Saver FROM fedex_rates WHERE Weight = 20 ORDER BY Zone;"
+    ),
+    (
+        "Compare overnight services for Zone 3",
+        "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight FROM fedex_rates WHERE Zone = 3 ORDER BY Weight;"
+    ),
+
+    # Rate analysis queries
+    (
+        "Show average rates by zone for FedEx 2Day service",
+        "SELECT Zone, AVG(FedEx_2Day) as Avg_Rate FROM fedex_rates GROUP BY Zone ORDER BY Zone;"
+    ),
+    (
+        "Find the most expensive rates for each zone",
+        "SELECT Zone, MAX(FedEx_First_Overnight) as Max_First_Overnight, MAX(FedEx_Priority_Overnight) as Max_Priority_Overnight, MAX(FedEx_Standard_Overnight) as Max_Standard_Overnight, MAX(FedEx_2Day_AM) as Max_2Day_AM, MAX(FedEx_2Day) as Max_2Day, MAX(FedEx_Express_Saver) as Max_Express_Saver FROM fedex_rates GROUP BY Zone;"
+    ),
+    (
+        "Show rates between $20 and $40 for Zone 2",
+        f"SELECT Zone, Weight, {_ALL_COLS} FROM fedex_rates WHERE Zone = 2 AND (FedEx_First_Overnight BETWEEN 20 AND 40 OR FedEx_Priority_Overnight BETWEEN 20 AND 40 OR FedEx_Standard_Overnight BETWEEN 20 AND 40 OR FedEx_2Day_AM BETWEEN 20 AND 40 OR FedEx_2Day BETWEEN 20 AND 40 OR FedEx_Express_Saver BETWEEN 20 AND 40);"
+    ),
+    (
+        "What are the average rates for each zone?",
+        "SELECT Zone, ROUND(AVG(FedEx_2Day), 2) as avg_2day_rate, ROUND(AVG(FedEx_Express_Saver), 2) as avg_express_saver FROM fedex_rates GROUP BY Zone ORDER BY Zone;"
+    ),
+    (
+        "Show the cheapest rate for each zone at 15 lbs",
+        f"SELECT Zone, Weight, MIN({_ALL_COLS}) as Cheapest_Rate FROM fedex_rates WHERE Weight = 15 GROUP BY Zone ORDER BY Zone;"
+    ),
+
+    # Complex multi-condition queries
+    (
+        "Show all rates for Zone 4, 25 lbs",
+        "SELECT Zone, Weight, FedEx_First_Overnight as 'First Overnight', FedEx_Priority_Overnight as 'Priority Overnight', FedEx_Standard_Overnight as 'Standard Overnight', FedEx_2Day_AM as '2Day AM', FedEx_2Day as '2Day', FedEx_Express_Saver as 'Express Saver' FROM fedex_rates WHERE Zone = 4 AND Weight = 25;"
+    ),
+    (
+        "Find the top 3 cheapest 2Day rates across all zones",
+        "SELECT Zone, Weight, FedEx_2Day FROM fedex_rates ORDER BY FedEx_2Day ASC LIMIT 3;"
+    ),
+    (
+        "Show rate differences between Priority Overnight and 2Day for Zone 7",
+        "SELECT Zone, Weight, FedEx_Priority_Overnight, FedEx_2Day, (FedEx_Priority_Overnight - FedEx_2Day) as Price_Difference FROM fedex_rates WHERE Zone = 7 ORDER BY Weight;"
+    ),
+    (
+        "Compare all service rates for Zone 5, 50 lbs",
+        f"SELECT Zone, Weight, {_ALL_COLS} FROM fedex_rates WHERE Zone = 5 AND Weight = 50;"
+    ),
+    (
+        "Show all rates for 10 lbs in Zone 2",
+        f"SELECT Zone, Weight, {_ALL_COLS} FROM fedex_rates WHERE Zone = 2 AND Weight = 10;"
+    ),
+
+    # Additional comprehensive examples
+    (
+        "How many total records are in the database?",
+        "SELECT COUNT(*) as total_records FROM fedex_rates;"
+    ),
+    (
+        "Show me the first 5 records",
+        "SELECT * FROM fedex_rates LIMIT 5;"
+    ),
+    (
+        "What's the FedEx 2Day rate for a 10 lb package in Zone 2?",
+        "SELECT Zone, Weight, FedEx_2Day FROM fedex_rates WHERE Zone = 2 AND Weight = 10;"
+    ),
+    (
+        "Find the cheapest Express Saver rate for Zone 3",
+        "SELECT MIN(FedEx_Express_Saver) as cheapest_rate FROM fedex_rates WHERE Zone = 3;"
+    ),
+    (
+        "How many weight options are available per zone?",
+        "SELECT Zone, COUNT(DISTINCT Weight) as weight_options FROM fedex_rates GROUP BY Zone;"
+    ),
+    (
+        "What's the most expensive rate in the entire database?",
+        "SELECT Zone, Weight, FedEx_First_Overnight as highest_rate FROM fedex_rates ORDER BY FedEx_First_Overnight DESC LIMIT 1;"
+    ),
+    (
+        "Show rates for all zones at 25 pounds",
+        "SELECT Zone, Weight, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Weight = 25 ORDER BY Zone;"
+    ),
+    (
+        "FedEx Priority Overnight rates for Zone 2",
+        "SELECT FedEx_Priority_Overnight FROM fedex_rates WHERE Zone = 2 ORDER BY Weight;"
+    ),
+    (
+        "What is the cheapest rate for Zone 3?",
+        "SELECT MIN(FedEx_Express_Saver) FROM fedex_rates WHERE Zone = 3;"
+    ),
+    (
+        "What is rate for 4 lbs package to zone 6 that delivers next day 9 am?",
+        "SELECT FedEx_First_Overnight FROM fedex_rates WHERE Zone = 6 AND Weight = 4 AND FedEx_First_Overnight IS NOT NULL;"
+    ),
+)
+_TRAIN_QUESTIONS, _TRAIN_SQLS = zip(*_TRAIN_EXAMPLES)
+
+
+# Example questions shown by the interactive "help" command
+_HELP_TEXT = """
+📚 Comprehensive Example Questions:
+
+  Zone-based Queries:
+    • Show all available FedEx shipping zones
+    • What are all the rates for Zone 2?
+    • Show rates for Zone 3 under 10 lbs
+    • Show all rates for Zone 4
+    • List all rates for Zone 8
 
-class VannaQdrantOllama(Qdrant_VectorStore, Ollama):
-    """
-    Custom Vanna class combining Qdrant vector store with Ollama LLM.
-    This provides both embedding storage and local LLM inference.
-    """
-    def __init__(self, config: dict = None):
-        """Initialize with Qdrant and Ollama configurations."""
-        Qdrant_VectorStore.__init__(self, config=config)
-        Ollama.__init__(self, config=config)
+  Weight-based Queries:
+    • List all available weight categories
+    • What are the rates for 5 lb packages?
+    • Show rates for packages between 10 and 20 lbs
+    • What are the rates for 10 lb packages?
+    • Show all rates for 25 lbs
+
+  Service-tier Comparisons:
+    • Compare FedEx 2Day rates across all zones for 10 lbs
+    • Show FedEx Priority Overnight rates for Zone 5
+    • What's the cheapest service for Zone 6, 15 lbs?
+    • Show FedEx Express Saver rates for all zones at 20 lbs
+    • Compare overnight services for Zone 3
+
+  Rate Analysis:
+    • Show average rates by zone for FedEx 2Day service
+    • Find the most expensive rates for each zone
+    • Show rates between $20 and $40 for Zone 2
+    • What are the average rates for each zone?
+    • Show the cheapest rate for each zone at 15 lbs
+
+  Complex Multi-condition:
+    • Show all rates for Zone 4, 25 lbs
+    • Find the top 3 cheapest 2Day rates across all zones
+    • Show rate differences between Priority Overnight and 2Day for Zone 7
+    • Compare all service rates for Zone 5, 50 lbs
+    • Show all rates for 10 lbs in Zone 2
+
+  Additional Examples:
+    • How many total records are in the database?
+    • Show me the first 5 records
+    • What's the FedEx 2Day rate for a 10 lb package in Zone 2?
+    • Find the cheapest Express Saver rate for Zone 3
+    • What's the most expensive rate in the entire database?
+"""
+
+
+@cache
+def _vanna_qdrant_ollama() -> type:
+    """Build the Qdrant + Ollama Vanna class (imports vanna on first call)."""
+    from vanna.ollama import Ollama
+    from vanna.qdrant import Qdrant_VectorStore
+
+    class VannaQdrantOllama(Qdrant_VectorStore, Ollama):
+        """
+        Custom Vanna class combining Qdrant vector store with Ollama LLM.
+        This provides both embedding storage and local LLM inference.
+        """
+        def __init__(self, config: dict = None):
+            """Initialize with Qdrant and Ollama configurations."""
+            Qdrant_VectorStore.__init__(self, config=config)
+            Ollama.__init__(self, config=config)
+
+    return VannaQdrantOllama
 
 
 class VannaFedExRates:
@@ -38,36 +270,96 @@ class VannaFedExRates:
     def __init__(
         self, 
         db_path: Path, 
-        model: str = "qwen2.5:3b",
+        model: str = "qwen2.5:3b-instruct-q4_K_M",
         ollama_host: str = "http://localhost:11434",
         qdrant_host: str = "localhost",
-        qdrant_port: int = 6333
+        qdrant_port: int = 6333,
+        read_only: bool = True,
+        ollama_socket: str | None = None
     ) -> None:
         """
         Initialize Vanna with Qdrant + Ollama backend.
         
         Args:
             db_path: Path to SQLite database
-            model: Ollama model name (qwen2.5:3b, llama3, mistral, etc.)
+            model: Ollama model name (qwen2.5:3b-instruct-q4_K_M, llama3, mistral, etc.)
             ollama_host: Ollama server URL
             qdrant_host: Qdrant server host
             qdrant_port: Qdrant server port
+            read_only: Open the database read-only (set False for scripts
+                that write to it); also immutable when it isn't in WAL mode
+            ollama_socket: Unix socket serving the Ollama API; used instead of
+                TCP to ollama_host when the socket exists
         """
         self.db_path = db_path
         self.model = model
         self.ollama_host = ollama_host
         self.qdrant_host = qdrant_host
         self.qdrant_port = qdrant_port
+        self.read_only = read_only
+        self.immutable = False
+        self.ollama_socket = ollama_socket
         self.conn = None
         self.vn = None
         
+        # Normalized question -> generated SQL, and SELECT -> result rows (only
+        # for immutable connections, where results can't go stale)
+        self._sql_cache = LRUCache(maxsize=512)
+        self._result_cache = LRUCache(maxsize=128)
+        # Normalized question -> generated SQL that failed to execute
+        self._bad_sql_cache = LRUCache(maxsize=100)
+        
         logger.info(f"Initializing Vanna with Ollama model: {model}")
         logger.info(f"Using Qdrant at {qdrant_host}:{qdrant_port}")
         
+    @staticmethod
+    def _is_static_file(db_path: Path) -> bool:
+        """
+        Check whether a database can be opened with immutable=1.
+        
+        Immutable readers never look at the -wal file, so a WAL-mode database
+        (or one with a leftover -wal) would silently read stale pages.
+        
+        Args:
+            db_path: Path to SQLite database
+            
+        Returns:
+            True if the database is not in WAL mode and has no -wal file
+        """
+        if Path(f"{db_path}-wal").exists():
+            return False
+        
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            return conn.execute("PRAGMA journal_mode").fetchone()[0].lower() != "wal"
+        finally:
+            conn.close()
+    
     def connect_database(self) -> None:
         """Connect to SQLite database."""
         try:
-            self.conn = sqlite3.connect(str(self.db_path))
+            # Larger prepared-statement cache so re-asked questions skip recompiling
+            if self.read_only:
+                # immutable=1 (only for files nothing can be writing to): SQLite
+                # skips locking and change detection on every statement
+                self.immutable = self._is_static_file(self.db_path)
+                self.conn = sqlite3.connect(
+                    f"file:{self.db_path}?mode=ro" + ("&immutable=1" if self.immutable else ""),
+                    uri=True,
+                    cached_statements=256
+                )
+            else:
+                self.conn = sqlite3.connect(str(self.db_path), cached_statements=256)
+            
+            # Map the file instead of read() syscalls and keep pages and
+            # sort/temp b-trees in memory; read-only sessions also refuse
+            # generated SQL that would write
+            self.conn.executescript(f"""
+                PRAGMA mmap_size=268435456;
+                PRAGMA cache_size=-262144;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA query_only={"ON" if self.read_only else "OFF"};
+            """)
             logger.success(f"✅ Connected to database: {self.db_path}")
         except sqlite3.Error as e:
             logger.error(f"❌ Failed to connect to database: {e}")
@@ -79,19 +371,44 @@ class VannaFedExRates:
             logger.info(f"Connecting to Ollama at {self.ollama_host}")
             logger.info(f"Connecting to Qdrant at {self.qdrant_host}:{self.qdrant_port}")
             
+            from qdrant_client import models
+            
             # Initialize Vanna with both Qdrant and Ollama
-            self.vn = VannaQdrantOllama(
+            self.vn = _vanna_qdrant_ollama()(
                 config={
                     "model": self.model,
                     "ollama_host": self.ollama_host,
                     "qdrant_location": self.qdrant_host,
                     "qdrant_port": self.qdrant_port,
-                    "qdrant_collection": "fedex_rates_collection"
+                    "qdrant_collection": "fedex_rates_collection",
+                    # int8 scalar quantization (kept in RAM) for the collections
+                    # Vanna creates: 4x smaller vectors for similarity lookups
+                    "collection_params": {
+                        "quantization_config": models.ScalarQuantization(
+                            scalar=models.ScalarQuantizationConfig(
+                                type=models.ScalarType.INT8,
+                                always_ram=True
+                            )
+                        )
+                    },
+                    # SQL answers are short: small context, capped decode budget
+                    "options": {"num_ctx": 2048, "num_predict": 256},
+                    # Keep the weights loaded for the whole session
+                    "keep_alive": -1
                 }
             )
             
-            # Connect Vanna to SQLite
-            self.vn.connect_to_sqlite(str(self.db_path))
+            self._use_ollama_socket()
+            self._warm_up_model()
+            
+            # Point Vanna at the tuned connection from connect_database instead
+            # of letting connect_to_sqlite open a second, untuned one
+            if self.conn is not None:
+                self.vn.dialect = "SQLite"
+                self.vn.run_sql = self._exec_cached
+                self.vn.run_sql_is_set = True
+            else:
+                self.vn.connect_to_sqlite(str(self.db_path))
             
             logger.success("✅ Vanna initialized with Qdrant + Ollama backend")
         except Exception as e:
@@ -100,38 +417,57 @@ class VannaFedExRates:
             logger.info("1. Make sure Ollama is running: ollama serve")
             logger.info("2. Make sure Qdrant is running on port 6333")
             logger.info(f"3. Check model is available: ollama list")
+            logger.info(f"   (pull it if missing: ollama pull {self.model})")
             raise
     
+    def _use_ollama_socket(self) -> None:
+        """Send Ollama requests over the Unix socket if one is configured and present (else keep TCP)."""
+        if not self.ollama_socket or not os.path.exists(self.ollama_socket):
+            return
+        
+        try:
+            import httpx
+            import ollama
+            
+            self.vn.ollama_client = ollama.Client(
+                self.ollama_host,
+                timeout=httpx.Timeout(self.vn.ollama_timeout),
+                transport=httpx.HTTPTransport(uds=self.ollama_socket)
+            )
+            logger.info(f"🔌 Using Ollama socket {self.ollama_socket}")
+        except Exception as e:
+            logger.warning(f"⚠ Ollama socket unavailable, staying on TCP: {e}")
+    
+    def _warm_up_model(self) -> None:
+        """Load the Ollama model now (empty prompt) so the first question doesn't pay the load time."""
+        try:
+            start = time.perf_counter()
+            self.vn.ollama_client.generate(
+                model=self.vn.model,
+                prompt="",
+                keep_alive=-1,
+                options={"num_predict": 1}
+            )
+            logger.info(f"🔥 Model {self.vn.model} loaded in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            logger.warning(f"⚠ Model warm-up failed, first query will load it: {e}")
+    
     def train_on_schema(self) -> None:
         """Train Vanna on database schema."""
         logger.info("\n📚 Training Vanna on database schema...")
         
         try:
-            # Get all tables
-            tables_df = pd.read_sql_query(
-                "SELECT name FROM sqlite_master WHERE type='table';", 
-                self.conn
-            )
+            # Get every table with the CREATE TABLE text SQLite stored for it
+            # (keeps constraints and defaults, one query for all tables)
+            tables = self.conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type='table' AND sql IS NOT NULL;"
+            ).fetchall()
             
-            logger.info(f"Found {len(tables_df)} table(s)")
+            logger.info(f"Found {len(tables)} table(s)")
             
-            for table_name in tables_df['name']:
+            for table_name, ddl in tables:
                 logger.info(f"  Loading schema for table: {table_name}")
                 
-                # Get table schema
-                schema_df = pd.read_sql_query(
-                    f"PRAGMA table_info({table_name});", 
-                    self.conn
-                )
-                
-                # Create DDL statement
-                columns = []
-                for _, row in schema_df.iterrows():
-                    col_def = f"{row['name']} {row['type']}"
-                    columns.append(col_def)
-                
-                ddl = f"CREATE TABLE {table_name} (\n  " + ",\n  ".join(columns) + "\n);"
-                
                 # Train on schema
                 self.vn.train(ddl=ddl)
                 logger.info(f"    ✓ Schema loaded for {table_name}")
@@ -168,210 +504,101 @@ class VannaFedExRates:
         """Train Vanna with comprehensive examples from vanna.md documentation."""
         logger.info("\n📝 Training Vanna with comprehensive example queries...")
         
-        examples = [
-            # Zone-based queries
-            {
-                "question": "Show all available FedEx shipping zones",
-                "sql": "SELECT DISTINCT Zone FROM fedex_rates ORDER BY Zone;"
-            },
-            {
-                "question": "What are all the rates for Zone 2?",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Zone = 2;"
-            },
-            {
-                "question": "Show rates for Zone 3 under 10 lbs",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Zone = 3 AND Weight <= 10;"
-            },
-            {
-                "question": "Show all rates for Zone 4",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Zone = 4 ORDER BY Weight;"
-            },
-            {
-                "question": "List all rates for Zone 8",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Zone = 8 ORDER BY Weight;"
-            },
-            
-            # Weight-based queries
-            {
-                "question": "List all available weight categories",
-                "sql": "SELECT DISTINCT Weight FROM fedex_rates ORDER BY Weight;"
-            },
-            {
-                "question": "What are the rates for 5 lb packages?",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Weight = 5;"
-            },
-            {
-                "question": "Show rates for packages between 10 and 20 lbs",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Weight BETWEEN 10 AND 20;"
-            },
-            {
-                "question": "What are the rates for 10 lb packages?",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Weight = 10 ORDER BY Zone;"
-            },
-            {
-                "question": "Show all rates for 25 lbs",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Weight = 25 ORDER BY Zone;"
-            },
-            
-            # Service-tier comparisons
-            {
-                "question": "Compare FedEx 2Day rates across all zones for 10 lbs",
-                "sql": "SELECT Zone, Weight, FedEx_2Day FROM fedex_rates WHERE Weight = 10 ORDER BY Zone;"
-            },
-            {
-                "question": "Show FedEx Priority Overnight rates for Zone 5",
-                "sql": "SELECT Zone, Weight, FedEx_Priority_Overnight FROM fedex_rates WHERE Zone = 5 ORDER BY Weight;"
-            },
-            {
-                "question": "What's the cheapest service for Zone 6, 15 lbs?",
-                "sql": "SELECT Zone, Weight, MIN(FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver) as Cheapest_Rate FROM fedex_rates WHERE Zone = 6 AND Weight = 15;"
-            },
-            {
-                "question": "Show FedEx Express Saver rates for all zones at 20 lbs",
-                "sql": "SELECT Zone, Weight, FedEx_Express_Saver FROM fedex_rates WHERE Weight = 20 ORDER BY Zone;"
-            },
-            {
-                "question": "Compare overnight services for Zone 3",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight FROM fedex_rates WHERE Zone = 3 ORDER BY Weight;"
-            },
-            
-            # Rate analysis queries
-            {
-                "question": "Show average rates by zone for FedEx 2Day service",
-                "sql": "SELECT Zone, AVG(FedEx_2Day) as Avg_Rate FROM fedex_rates GROUP BY Zone ORDER BY Zone;"
-            },
-            {
-                "question": "Find the most expensive rates for each zone",
-                "sql": "SELECT Zone, MAX(FedEx_First_Overnight) as Max_First_Overnight, MAX(FedEx_Priority_Overnight) as Max_Priority_Overnight, MAX(FedEx_Standard_Overnight) as Max_Standard_Overnight, MAX(FedEx_2Day_AM) as Max_2Day_AM, MAX(FedEx_2Day) as Max_2Day, MAX(FedEx_Express_Saver) as Max_Express_Saver FROM fedex_rates GROUP BY Zone;"
-            },
-            {
-                "question": "Show rates between $20 and $40 for Zone 2",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Zone = 2 AND (FedEx_First_Overnight BETWEEN 20 AND 40 OR FedEx_Priority_Overnight BETWEEN 20 AND 40 OR FedEx_Standard_Overnight BETWEEN 20 AND 40 OR FedEx_2Day_AM BETWEEN 20 AND 40 OR FedEx_2Day BETWEEN 20 AND 40 OR FedEx_Express_Saver BETWEEN 20 AND 40);"
-            },
-            {
-                "question": "What are the average rates for each zone?",
-                "sql": "SELECT Zone, ROUND(AVG(FedEx_2Day), 2) as avg_2day_rate, ROUND(AVG(FedEx_Express_Saver), 2) as avg_express_saver FROM fedex_rates GROUP BY Zone ORDER BY Zone;"
-            },
-            {
-                "question": "Show the cheapest rate for each zone at 15 lbs",
-                "sql": "SELECT Zone, Weight, MIN(FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver) as Cheapest_Rate FROM fedex_rates WHERE Weight = 15 GROUP BY Zone ORDER BY Zone;"
-            },
-            
-            # Complex multi-condition queries
-            {
-                "question": "Show all rates for Zone 4, 25 lbs",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight as 'First Overnight', FedEx_Priority_Overnight as 'Priority Overnight', FedEx_Standard_Overnight as 'Standard Overnight', FedEx_2Day_AM as '2Day AM', FedEx_2Day as '2Day', FedEx_Express_Saver as 'Express Saver' FROM fedex_rates WHERE Zone = 4 AND Weight = 25;"
-            },
-            {
-                "question": "Find the top 3 cheapest 2Day rates across all zones",
-                "sql": "SELECT Zone, Weight, FedEx_2Day FROM fedex_rates ORDER BY FedEx_2Day ASC LIMIT 3;"
-            },
-            {
-                "question": "Show rate differences between Priority Overnight and 2Day for Zone 7",
-                "sql": "SELECT Zone, Weight, FedEx_Priority_Overnight, FedEx_2Day, (FedEx_Priority_Overnight - FedEx_2Day) as Price_Difference FROM fedex_rates WHERE Zone = 7 ORDER BY Weight;"
-            },
-            {
-                "question": "Compare all service rates for Zone 5, 50 lbs",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Zone = 5 AND Weight = 50;"
-            },
-            {
-                "question": "Show all rates for 10 lbs in Zone 2",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight, FedEx_Priority_Overnight, FedEx_Standard_Overnight, FedEx_2Day_AM, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Zone = 2 AND Weight = 10;"
-            },
+        self._batch_train_examples(_TRAIN_QUESTIONS, _TRAIN_SQLS)
+        self.clear_cache()
+        
+        logger.success(f"✅ Trained on {len(_TRAIN_QUESTIONS)} comprehensive example queries")
+        
+        # Save training data for reuse
+        self._save_training_data(_TRAIN_QUESTIONS, _TRAIN_SQLS)
+    
+    def _batch_train_examples(self, questions: Sequence[str], sqls: Sequence[str]) -> None:
+        """
+        Store question/SQL examples with batched embeddings and streamed Qdrant upserts.
+        
+        Embeddings are consumed as fastembed produces them and sent in chunks
+        with wait=False, so Qdrant indexes one chunk while the next is embedded.
+        Points match what vn.train(question=..., sql=...) would write (same
+        text, deterministic id and payload), so retraining still deduplicates.
+        Falls back to training example by example if the batch path fails.
+        
+        Args:
+            questions: Example questions
+            sqls: SQL for each question (same order)
+        """
+        texts = [f"Question: {question}\n\nSQL: {sql}" for question, sql in zip(questions, sqls)]
+        
+        try:
+            from qdrant_client import models
+            from vanna.utils import deterministic_uuid
             
-            # Additional comprehensive examples
-            {
-                "question": "How many total records are in the database?",
-                "sql": "SELECT COUNT(*) as total_records FROM fedex_rates;"
-            },
-            {
-                "question": "Show me the first 5 records",
-                "sql": "SELECT * FROM fedex_rates LIMIT 5;"
-            },
-            {
-                "question": "What's the FedEx 2Day rate for a 10 lb package in Zone 2?",
-                "sql": "SELECT Zone, Weight, FedEx_2Day FROM fedex_rates WHERE Zone = 2 AND Weight = 10;"
-            },
-            {
-                "question": "Find the cheapest Express Saver rate for Zone 3",
-                "sql": "SELECT MIN(FedEx_Express_Saver) as cheapest_rate FROM fedex_rates WHERE Zone = 3;"
-            },
-            {
-                "question": "How many weight options are available per zone?",
-                "sql": "SELECT Zone, COUNT(DISTINCT Weight) as weight_options FROM fedex_rates GROUP BY Zone;"
-            },
-            {
-                "question": "What's the most expensive rate in the entire database?",
-                "sql": "SELECT Zone, Weight, FedEx_First_Overnight as highest_rate FROM fedex_rates ORDER BY FedEx_First_Overnight DESC LIMIT 1;"
-            },
-            {
-                "question": "Show rates for all zones at 25 pounds",
-                "sql": "SELECT Zone, Weight, FedEx_2Day, FedEx_Express_Saver FROM fedex_rates WHERE Weight = 25 ORDER BY Zone;"
-            },
-            {
-                "question": "FedEx Priority Overnight rates for Zone 2",
-                "sql": "SELECT FedEx_Priority_Overnight FROM fedex_rates WHERE Zone = 2 ORDER BY Weight;"
-            },
-            {
-                "question": "What is the cheapest rate for Zone 3?",
-                "sql": "SELECT MIN(FedEx_Express_Saver) FROM fedex_rates WHERE Zone = 3;"
-            },
-            {
-                "question": "What is rate for 4 lbs package to zone 6 that delivers next day 9 am?",
-                "sql": "SELECT FedEx_First_Overnight FROM fedex_rates WHERE Zone = 6 AND Weight = 4 AND FedEx_First_Overnight IS NOT NULL;"
-            },
-        ]
+            embedding_model = self.vn._client._get_or_init_model(model_name=self.vn.fastembed_model)
+            vectors = embedding_model.embed(texts, batch_size=_UPSERT_CHUNK)
+            points = (
+                models.PointStruct(
+                    id=deterministic_uuid(text),
+                    vector=vector.tolist(),
+                    payload={"question": question, "sql": sql}
+                )
+                for text, vector, question, sql in zip(texts, vectors, questions, sqls)
+            )
+            for chunk in batched(points, _UPSERT_CHUNK):
+                self.vn._client.upsert(self.vn.sql_collection_name, points=list(chunk), wait=False)
+            logger.info(f"  ✓ Trained {len(texts)} examples in batches of {_UPSERT_CHUNK}")
+            return
+        except Exception as e:
+            logger.warning(f"  ⚠ Batch training failed, training examples one by one: {e}")
         
-        for idx, example in enumerate(examples, 1):
+        for idx, (question, sql) in enumerate(zip(questions, sqls), 1):
             try:
-                self.vn.train(
-                    question=example["question"],
-                    sql=example["sql"]
-                )
-                logger.info(f"  ✓ Example {idx}/{len(examples)}: {example['question'][:60]}...")
+                self.vn.train(question=question, sql=sql)
+                logger.info(f"  ✓ Example {idx}/{len(texts)}: {question[:60]}...")
             except Exception as e:
                 logger.warning(f"  ⚠ Failed to train example {idx}: {e}")
-        
-        logger.success(f"✅ Trained on {len(examples)} comprehensive example queries")
-        
-        # Save training data for reuse
-        self._save_training_data(examples)
     
-    def _save_training_data(self, examples: list) -> None:
-        """Save training examples to JSON file for reuse."""
+    @staticmethod
+    def training_file() -> Path | None:
+        """Saved training data in the project root (.json.gz preferred over legacy .json), if any."""
+        project_root = Path(__file__).parent.parent
+        for name in ("fedex_training.json.gz", "fedex_training.json"):
+            if (project_root / name).exists():
+                return project_root / name
+        return None
+    
+    def _save_training_data(self, questions: Sequence[str], sqls: Sequence[str]) -> None:
+        """Save training examples to gzipped compact JSON for reuse."""
         try:
-            import json
-            training_data = [(ex["question"], ex["sql"]) for ex in examples]
+            training_data = list(zip(questions, sqls))
             
             # Save to project root
             project_root = Path(__file__).parent.parent
-            training_file = project_root / "fedex_training.json"
+            training_file = project_root / "fedex_training.json.gz"
             
-            with open(training_file, "w") as f:
-                json.dump(training_data, f, indent=2)
+            with gzip.open(training_file, "wt", encoding="utf-8") as f:
+                json.dump(training_data, f, separators=(",", ":"))
             
             logger.info(f"💾 Training data saved to {training_file}")
         except Exception as e:
             logger.warning(f"⚠ Failed to save training data: {e}")
     
     def load_training_data(self) -> None:
-        """Load training data from JSON file."""
+        """Load training data from the saved .json.gz (or legacy .json) file."""
         try:
-            import json
-            project_root = Path(__file__).parent.parent
-            training_file = project_root / "fedex_training.json"
+            training_file = self.training_file()
             
-            if not training_file.exists():
+            if training_file is None:
                 logger.warning("⚠ Training data file not found, skipping load")
                 return
             
-            with open(training_file, "r") as f:
+            opener = gzip.open if training_file.suffix == ".gz" else open
+            with opener(training_file, "rt", encoding="utf-8") as f:
                 training_data = json.load(f)
             
             logger.info(f"📂 Loading {len(training_data)} training examples from file...")
             
-            for question, sql in training_data:
-                self.vn.train(question=question, sql=sql)
+            questions, sqls = zip(*training_data) if training_data else ((), ())
+            self._batch_train_examples(questions, sqls)
+            self.clear_cache()
             
             logger.success(f"✅ Loaded {len(training_data)} training examples from file")
         except Exception as e:
@@ -387,23 +614,95 @@ class VannaFedExRates:
         Returns:
             DataFrame with results or None if error
         """
+        logger.info(f"\n💭 Question: {question}")
+        
+        # Questions whose SQL already failed aren't sent to the LLM again
+        norm_q = self._normalize_question(question)
+        bad_sql = self._bad_sql_cache.get(norm_q)
+        if bad_sql is not None:
+            logger.warning(f"⚠ This question produced SQL that failed before:\n{bad_sql}")
+            logger.info("Try rephrasing it, or type 'help' for example questions")
+            return None
+        
         try:
-            logger.info(f"\n💭 Question: {question}")
-            
             # Generate SQL
-            sql = self.vn.generate_sql(question)
+            sql = self._generate_sql(question)
             logger.info(f"🧠 Generated SQL:\n{sql}")
-            
-            # Execute query
-            df = pd.read_sql_query(sql, self.conn)
+        except Exception as e:
+            logger.error(f"❌ Query failed: {e}")
+            return None
+        
+        try:
+            # Execute query (repeated SELECTs are served from the result cache)
+            is_select = self.immutable and sql.strip().lower().startswith("select")
+            df = self._result_cache.get(sql) if is_select else None
+            if df is None:
+                df = self._exec_cached(sql)
+                if is_select:
+                    self._result_cache[sql] = df
             
             logger.success("✅ Query executed successfully")
-            return df
+            return df.copy()
             
         except Exception as e:
+            self._bad_sql_cache[norm_q] = sql
             logger.error(f"❌ Query failed: {e}")
             return None
     
+    def _exec_cached(self, sql: str, conn: sqlite3.Connection | None = None) -> pd.DataFrame:
+        """
+        Run SQL through the connection's prepared-statement cache into a DataFrame.
+        
+        Args:
+            sql: SQL to execute
+            conn: Connection to use (default: self.conn)
+            
+        Returns:
+            DataFrame of the result rows
+        """
+        import pandas as pd
+        
+        cursor = (conn or self.conn).execute(sql)
+        columns = [d[0] for d in cursor.description] if cursor.description else []
+        df = pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+        
+        dtypes = {column: dtype for column, dtype in _SCHEMA_DTYPES.items() if column in df.columns}
+        if dtypes:
+            try:
+                df = df.astype(dtypes)
+            except (ValueError, TypeError):
+                pass  # e.g. NULL Zone/Weight: keep the inferred types
+        return df
+    
+    def _generate_sql(self, question: str) -> str:
+        """Generate SQL for a question, reusing earlier SQL for the same normalized question."""
+        norm_q = self._normalize_question(question)
+        sql = self._sql_cache.get(norm_q)
+        if sql is None:
+            sql = self.vn.generate_sql(question)
+            self._sql_cache[norm_q] = sql
+        return sql
+    
+    @staticmethod
+    def _normalize_question(question: str) -> str:
+        """Cache key for a question: lowercased, whitespace collapsed."""
+        return " ".join(question.lower().split())
+    
+    def clear_cache(self) -> None:
+        """Forget cached SQL, query results and known-bad SQL (call after retraining)."""
+        self._sql_cache.clear()
+        self._result_cache.clear()
+        self._bad_sql_cache.clear()
+    
+    @staticmethod
+    def _stream_df(df: pd.DataFrame, out=None) -> None:
+        """Write a DataFrame as tab-separated lines, row by row, without rendering it to one string."""
+        out = out or sys.stdout
+        out.write("\t".join(map(str, df.columns)) + "\n")
+        for row in df.itertuples(index=False, name=None):
+            out.write("\t".join(f"{v:.2f}" if isinstance(v, float) else str(v) for v in row) + "\n")
+        out.flush()
+    
     def interactive_loop(self) -> None:
         """Run interactive text-to-SQL loop."""
         logger.info("\n" + "="*70)
@@ -434,7 +733,7 @@ class VannaFedExRates:
                 
                 if df is not None:
                     print("\n📦 Results:")
-                    print(df.to_string(index=False))
+                    self._stream_df(df)
                     print(f"\nRows returned: {len(df)}")
                     
             except KeyboardInterrupt:
@@ -445,55 +744,19 @@ class VannaFedExRates:
     
     def _show_help(self) -> None:
         """Display comprehensive example questions from vanna.md training."""
-        print("\n📚 Comprehensive Example Questions:")
-        print("\n  Zone-based Queries:")
-        print("    • Show all available FedEx shipping zones")
-        print("    • What are all the rates for Zone 2?")
-        print("    • Show rates for Zone 3 under 10 lbs")
-        print("    • Show all rates for Zone 4")
-        print("    • List all rates for Zone 8")
-        print("\n  Weight-based Queries:")
-        print("    • List all available weight categories")
-        print("    • What are the rates for 5 lb packages?")
-        print("    • Show rates for packages between 10 and 20 lbs")
-        print("    • What are the rates for 10 lb packages?")
-        print("    • Show all rates for 25 lbs")
-        print("\n  Service-tier Comparisons:")
-        print("    • Compare FedEx 2Day rates across all zones for 10 lbs")
-        print("    • Show FedEx Priority Overnight rates for Zone 5")
-        print("    • What's the cheapest service for Zone 6, 15 lbs?")
-        print("    • Show FedEx Express Saver rates for all zones at 20 lbs")
-        print("    • Compare overnight services for Zone 3")
-        print("\n  Rate Analysis:")
-        print("    • Show average rates by zone for FedEx 2Day service")
-        print("    • Find the most expensive rates for each zone")
-        print("    • Show rates between $20 and $40 for Zone 2")
-        print("    • What are the average rates for each zone?")
-        print("    • Show the cheapest rate for each zone at 15 lbs")
-        print("\n  Complex Multi-condition:")
-        print("    • Show all rates for Zone 4, 25 lbs")
-        print("    • Find the top 3 cheapest 2Day rates across all zones")
-        print("    • Show rate differences between Priority Overnight and 2Day for Zone 7")
-        print("    • Compare all service rates for Zone 5, 50 lbs")
-        print("    • Show all rates for 10 lbs in Zone 2")
-        print("\n  Additional Examples:")
-        print("    • How many total records are in the database?")
-        print("    • Show me the first 5 records")
-        print("    • What's the FedEx 2Day rate for a 10 lb package in Zone 2?")
-        print("    • Find the cheapest Express Saver rate for Zone 3")
-        print("    • What's the most expensive rate in the entire database?")
+        sys.stdout.write(_HELP_TEXT)
     
     def test_query(self, question: str) -> None:
         """Test a query and display results."""
         logger.info(f"\n🔍 Testing: {question}")
         try:
-            sql = self.vn.generate_sql(question)
+            sql = self._generate_sql(question)
             logger.info(f"🧠 Generated SQL: {sql}")
             
             result = self.query(question)
             if result is not None:
                 logger.info("📊 Query Results:")
-                print(result.to_string(index=False))
+                self._stream_df(result)
             else:
                 logger.error("❌ Query failed")
                 
@@ -511,9 +774,34 @@ class VannaFedExRates:
             "Find the cheapest rate for Zone 3, 15 lbs"
         ]
         
-        for query in test_queries:
-            self.test_query(query)
-            print()  # Add spacing between tests
+        # Pipeline the two stages: one worker generates SQL for query N+1
+        # while another runs query N on its own read-only connection
+        ro_conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro" + ("&immutable=1" if self.immutable else ""),
+            uri=True,
+            check_same_thread=False
+        )
+        
+        def execute(sql_future: Future) -> pd.DataFrame:
+            return self._exec_cached(sql_future.result(), ro_conn)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=1) as llm_pool, ThreadPoolExecutor(max_workers=1) as sql_pool:
+                sql_futures = [llm_pool.submit(self._generate_sql, query) for query in test_queries]
+                result_futures = [sql_pool.submit(execute, future) for future in sql_futures]
+                
+                for query, sql_future, result_future in zip(test_queries, sql_futures, result_futures):
+                    logger.info(f"\n🔍 Testing: {query}")
+                    try:
+                        logger.info(f"🧠 Generated SQL: {sql_future.result()}")
+                        result = result_future.result()
+                        logger.info("📊 Query Results:")
+                        self._stream_df(result)
+                    except Exception as e:
+                        logger.error(f"❌ Error: {e}")
+                    print()  # Add spacing between tests
+        finally:
+            ro_conn.close()
     
     def close(self) -> None:
         """Close database connection."""
@@ -542,10 +830,11 @@ def main() -> None:
         # Initialize Vanna
         vanna = VannaFedExRates(
             db_path=db_path,
-            model="qwen2.5:3b",  # Using qwen3 as requested
+            model="qwen2.5:3b-instruct-q4_K_M",  # 4-bit quantized for faster decoding
             ollama_host="http://localhost:11434",
             qdrant_host="localhost",
-            qdrant_port=6333
+            qdrant_port=6333,
+            ollama_socket=os.getenv("OLLAMA_SOCKET")
         )
         
         # Step 1: Connect to database
@@ -565,10 +854,7 @@ def main() -> None:
         
         # Step 4: Train on examples (or load existing)
         logger.info("STEP 4: Training on example queries")
-        project_root = Path(__file__).parent.parent
-        training_file = project_root / "fedex_training.json"
-        
-        if training_file.exists():
+        if VannaFedExRates.training_file() is not None:
             logger.info("📂 Found existing training data, loading from file...")
             vanna.load_training_data()
         else:
@@ -596,7 +882,7 @@ def main() -> None:
         logger.error(f"\n❌ Fatal error: {e}")
         logger.info("\nTroubleshooting:")
         logger.info("1. Make sure Ollama is running: ollama serve")
-        logger.info("2. Check model is available: ollama pull qwen2.5:3b")
+        logger.info("2. Check model is available: ollama pull qwen2.5:3b-instruct-q4_K_M")
         logger.info("3. Make sure Qdrant is running: docker run -p 6333:6333 qdrant/qdrant")
         raise
 